@@ -1,8 +1,78 @@
 """Authenticates to Flume API, returns a list of devices and allows you to pull the latest sensor results over a period of time."""
 
-from .auth import FlumeAuth  # noqa: WPS300, F401
-from .data import FlumeData  # noqa: WPS300, F401
-from .devices import FlumeDeviceList  # noqa: WPS300, F401
-from .leak import FlumeLeakList  # noqa: WPS300, F401
-from .notifications import FlumeNotificationList  # noqa: WPS300, F401
-from .usage import FlumeUsageAlertList  # noqa: WPS300, F401
+import importlib
+
+# Submodules are imported on first attribute access so `import pyflume` does
+# not pay for requests and pyjwt until they are needed.
+_LAZY_ATTRIBUTES = {  # noqa: WPS407
+    "FlumeAuth": "auth",
+    "FlumeData": "data",
+    "FlumeDeviceList": "devices",
+    "FlumeLeakList": "leak",
+    "FlumeNotificationList": "notifications",
+    "FlumeUsageAlertList": "usage",
+    "FlumeEventStream": "events",
+    "FlumeLeakDetector": "detector",
+    "DeviceRecord": "records",
+    "LeakRecord": "records",
+    "NotificationRecord": "records",
+    "UsageAlertRecord": "records",
+    "FlumeAlertStore": "store",
+    "FlumeTimeSeriesStore": "timeseries",
+    "CoalescingSession": "coalesce",
+    "CircuitBreakerSession": "breaker",
+    "LeanSession": "lean",
+    "Deadline": "deadline",
+    "Urllib3Transport": "transport",
+    "HttpxTransport": "transport",
+    "MemoryTransport": "transport",
+    "create_transport": "transport",
+    "CassetteRecorder": "cassette",
+    "ReplayTransport": "cassette",
+    "RateBudget": "budget",
+    "plan_polling": "budget",
+    "FlumeLocationData": "location",
+    "FlumeCache": "server",
+    "FlumeSharedCache": "sharedcache",
+    "save_snapshot": "snapshot",
+    "load_snapshot": "snapshot",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)  # noqa: WPS410
+
+
+def __getattr__(name):  # noqa: WPS413
+    """Import public classes and submodules on first access.
+
+    Args:
+        name: Attribute name.
+
+    Returns:
+        The class or submodule.
+
+    Raises:
+        AttributeError: If no such class or submodule exists.
+        ModuleNotFoundError: If a dependency of the submodule is missing.
+    """
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is not None:
+        attribute = getattr(importlib.import_module(f".{module_name}", __name__), name)
+        globals()[name] = attribute  # noqa: WPS421
+        return attribute
+    try:
+        return importlib.import_module(f".{name}", __name__)
+    except ModuleNotFoundError as error:
+        if error.name != f"{__name__}.{name}":
+            raise
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}",
+        ) from None
+
+
+def __dir__():  # noqa: WPS413
+    """Return module attributes including lazily imported classes.
+
+    Returns:
+        Sorted attribute names.
+    """
+    return sorted(set(globals()) | set(__all__))  # noqa: WPS421
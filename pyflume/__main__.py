@@ -0,0 +1,7 @@
+"""Run the pyflume command with python -m pyflume."""
+
+import sys
+
+from .cli import main  # noqa: WPS300
+
+sys.exit(main())
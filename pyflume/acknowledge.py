@@ -0,0 +1,179 @@
+"""Mark notifications and alerts as read in concurrent batches."""
+
+from functools import partial
+
+from requests import RequestException
+
+from .constants import DEFAULT_TIMEOUT  # noqa: WPS300
+from .deadline import request_timeout  # noqa: WPS300
+from .pages import DEFAULT_WORKERS, ordered_map, take_call  # noqa: WPS300
+from .records import FlumeRecord, as_json  # noqa: WPS300
+from .utils import (  # noqa: WPS300
+    FlumeResponseError,
+    configure_logger,
+    flume_response_error,
+)
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+ACKNOWLEDGE_BATCH_SIZE = 25
+
+
+def item_ids(entries):
+    """Return the ids of items, accepting ids as well.
+
+    Args:
+        entries: Iterable of JSON dicts, records or ids.
+
+    Returns:
+        List of ids.
+    """
+    return [
+        entry["id"] if isinstance(entry, (dict, FlumeRecord)) else entry
+        for entry in entries
+    ]
+
+
+def _patch_read(  # noqa: WPS211
+    http_session,
+    flume_auth,
+    api_url,
+    timeout,
+    rate_budget,
+    item_id,
+):
+    """Mark a single item as read.
+
+    Args:
+        http_session: Requests Session().
+        flume_auth: Authentication object.
+        api_url: URL of the collection holding the item.
+        timeout: Requests timeout.
+        rate_budget: RateBudget the request is taken from, or None.
+        item_id: Id of the item.
+
+    Returns:
+        Tuple of the id of the item and the error raised, None on success.
+    """
+    take_call(rate_budget)
+    try:
+        response = http_session.request(
+            "PATCH",
+            f"{api_url}/{item_id}",
+            headers=flume_auth.authorization_header,
+            json={"read": True},
+            timeout=request_timeout(timeout),
+        )
+    except RequestException as request_error:
+        return item_id, request_error
+    LOGGER.debug(f"_patch_read Response: {response.text}")
+
+    # Check for response errors.
+    try:
+        flume_response_error(
+            "Impossible to acknowledge {0}".format(item_id),
+            response,
+        )
+    except FlumeResponseError as response_error:
+        return item_id, response_error
+    return item_id, None
+
+
+def _acknowledge_batch(patch_read, batch_ids, workers):
+    """Mark a batch of items as read concurrently.
+
+    Args:
+        patch_read: Callable marking one item as read, see _patch_read.
+        batch_ids: List of item ids of the batch.
+        workers: Number of concurrent requests.
+
+    Returns:
+        Tuple of the acknowledged ids and the first error, None on success.
+    """
+    outcomes = list(ordered_map(patch_read, batch_ids, workers))
+    errors = [error for _, error in outcomes if error is not None]
+    acknowledged = [item_id for item_id, error in outcomes if error is None]
+    return acknowledged, next(iter(errors), None)
+
+
+def acknowledge(  # noqa: WPS211
+    http_session,
+    flume_auth,
+    api_url,
+    ids,
+    on_batch,
+    timeout=DEFAULT_TIMEOUT,
+    batch_size=ACKNOWLEDGE_BATCH_SIZE,
+    workers=DEFAULT_WORKERS,
+    rate_budget=None,
+):  # noqa: DAR401 - the first error of the workers is re-raised
+    """Mark items as read, batch after batch.
+
+    The requests of a batch run concurrently, and on_batch receives the ids
+    of each batch once its requests are done. If a request fails, the ids
+    acknowledged so far, including those of the failing batch, are reported
+    before the error is raised.
+
+    Args:
+        http_session: Requests Session().
+        flume_auth: Authentication object.
+        api_url: URL of the collection holding the items.
+        ids: List of item ids.
+        on_batch: Callable receiving the list of ids of every batch.
+        timeout: Requests timeout.
+        batch_size: Number of items acknowledged per batch.
+        workers: Number of concurrent requests.
+        rate_budget: RateBudget every request is taken from, default none.
+
+    Returns:
+        List of acknowledged ids.
+
+    Raises:
+        FlumeResponseError: If an item could not be acknowledged.
+        RequestException: If a request failed.
+    """  # noqa: DAR402 - raised by the workers
+    patch_read = partial(
+        _patch_read,
+        http_session,
+        flume_auth,
+        api_url,
+        timeout,
+        rate_budget,
+    )
+    acknowledged = []
+    for start in range(0, len(ids), batch_size):
+        batch, error = _acknowledge_batch(
+            patch_read,
+            ids[start:start + batch_size],
+            workers,
+        )
+        on_batch(batch)
+        acknowledged.extend(batch)
+        if error is not None:
+            raise error
+    return acknowledged
+
+
+def mark_read(entries, ids, drop):
+    """Return items with the acknowledged ones marked read.
+
+    Args:
+        entries: List of JSON dicts or records.
+        ids: Acknowledged ids.
+        drop: Remove acknowledged items instead, for lists of unread items.
+
+    Returns:
+        New list of items.
+    """
+    acknowledged = set(ids)
+    updated = []
+    for entry in entries:
+        if entry["id"] not in acknowledged:
+            updated.append(entry)
+        elif not drop:
+            item_json = dict(as_json(entry), read=True)
+            if isinstance(entry, FlumeRecord):
+                item_json = type(entry).from_json(item_json)
+            updated.append(item_json)
+    return updated
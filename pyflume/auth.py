@@ -2,19 +2,35 @@
 
 from datetime import datetime, timedelta
 import json
+import threading
+from typing import Any, Dict, NamedTuple
 
-import jwt  # install pyjwt
 from requests import Session
 
 from .constants import DEFAULT_TIMEOUT, URL_OAUTH_TOKEN  # noqa: WPS300
+from .deadline import request_timeout  # noqa: WPS300
 from .utils import configure_logger, flume_response_error  # noqa: WPS300
 
 # Configure logging
 LOGGER = configure_logger(__name__)
 
 
+class _TokenState(NamedTuple):
+    """Token and the values derived from it, replaced as a whole."""
+
+    token: Dict[str, Any]
+    decoded_token: Dict[str, Any]
+    user_id: Any
+    authorization_header: Dict[str, str]
+
+
 class FlumeAuth:  # noqa: WPS214
-    """Interact with API Authentication."""
+    """Interact with API Authentication.
+
+    Instances are thread safe: token changes are serialised and replace the
+    token state in a single assignment, so readers never see a token with
+    the header of another one.
+    """
 
     def __init__(  # noqa: WPS211
         self,
@@ -25,6 +41,7 @@ class FlumeAuth:  # noqa: WPS214
         flume_token=None,
         http_session=None,
         timeout=DEFAULT_TIMEOUT,
+        authenticate_on_init=True,
     ):
         """
 
@@ -38,6 +55,7 @@ class FlumeAuth:  # noqa: WPS214
             flume_token: Pass flume token to variable.
             http_session: Requests Session()
             timeout: Requests timeout for throttling.
+            authenticate_on_init: get the token on init, else on first use.
 
         """
 
@@ -54,13 +72,62 @@ class FlumeAuth:  # noqa: WPS214
             self._http_session = http_session
 
         self._timeout = timeout
-        self._token = None
-        self._decoded_token = None
-        self.user_id = None
-        self.authorization_header = None
+        self._flume_token = flume_token
+        self._lock = threading.RLock()
+        self._state = None
+
+        if authenticate_on_init:
+            self.authenticate()
+
+    @property
+    def user_id(self):
+        """
+            Return user id of the token, authenticating first if needed.
+
+        Returns:
+            Returns the Flume user id.
 
-        self._load_token(flume_token)
-        self._verify_token()
+        """
+        return self._current_state().user_id
+
+    @property
+    def authorization_header(self):
+        """
+            Return authorization header, authenticating first if needed.
+
+        Returns:
+            Returns the bearer authorization header.
+
+        """
+        return self._current_state().authorization_header
+
+    @user_id.setter
+    def user_id(self, user_id):
+        """
+            Override the user id until the next token is loaded.
+
+        Args:
+            user_id: Flume user id.
+
+        """
+        self._override(user_id=user_id)
+
+    @authorization_header.setter
+    def authorization_header(self, authorization_header):
+        """
+            Override the authorization header until the next token is loaded.
+
+        Args:
+            authorization_header: Headers authorizing the API requests.
+
+        """
+        self._override(authorization_header=authorization_header)
+
+    def authenticate(self):
+        """Load the initial token, or fetch one, and refresh it if expiring."""
+        with self._lock:
+            self._load_token(self._flume_token)
+            self._verify_token()
 
     @property
     def token(self):
@@ -71,53 +138,84 @@ class FlumeAuth:  # noqa: WPS214
             Returns the current JWT token.
 
         """
-        return self._token
+        state = self._state
+        return None if state is None else state.token
 
     def refresh_token(self):
         """Refresh authorization token for session."""
+        with self._lock:
+            payload = {
+                "grant_type": "refresh_token",
+                "refresh_token": self._current_state().token["refresh_token"],
+                "client_id": self._creds["client_id"],
+                "client_secret": self._creds["client_secret"],
+            }
 
-        payload = {
-            "grant_type": "refresh_token",
-            "refresh_token": self._token["refresh_token"],
-            "client_id": self._creds["client_id"],
-            "client_secret": self._creds["client_secret"],
-        }
-
-        self._load_token(self._request_token(payload))
+            self._load_token(self._request_token(payload))
 
     def retrieve_token(self):
         """Return authorization token for session."""
+        with self._lock:
+            payload = dict({"grant_type": "password"}, **self._creds)
+            self._load_token(self._request_token(payload))
+
+    def _current_state(self):
+        """Return the token state, authenticating first if needed.
 
-        payload = dict({"grant_type": "password"}, **self._creds)
-        self._load_token(self._request_token(payload))
+        Returns:
+            _TokenState
+        """
+        state = self._state
+        if state is None:
+            with self._lock:
+                if self._state is None:
+                    self.authenticate()
+                state = self._state
+        return state
+
+    def _override(self, **fields):
+        """Replace fields of the token state, authenticating first if needed.
+
+        Args:
+            fields: _TokenState fields to replace.
+        """
+        with self._lock:
+            self._state = self._current_state()._replace(**fields)  # noqa: WPS437
 
     def _load_token(self, token):
         """
-        Update _token, decode token, user_id and auth header.
+        Replace the token state, decoding user_id and the auth header.
 
         Args:
             token: Authentication bearer token to be decoded.
 
         """
+        # Imported on first use to keep `import pyflume` fast.
+        import jwt  # noqa: WPS433
+
         jwt_options = {"verify_signature": False}
-        self._token = token
         try:
-            self._decoded_token = jwt.decode(
-                self._token["access_token"],
+            decoded_token = jwt.decode(
+                token["access_token"],
                 options=jwt_options,
             )
         except jwt.exceptions.DecodeError:
             LOGGER.debug("Poorly formatted Access Token, fetching token using _creds")
             self.retrieve_token()
+            return
         except TypeError:
             LOGGER.debug("Token TypeError, fetching token using _creds")
             self.retrieve_token()
-
-        self.user_id = self._decoded_token["user_id"]
-
-        self.authorization_header = {
-            "authorization": "Bearer {0}".format(self._token.get("access_token")),
-        }
+            return
+
+        self._state = _TokenState(
+            token=token,
+            decoded_token=decoded_token,
+            user_id=decoded_token["user_id"],
+            authorization_header={
+                "authorization": "Bearer {0}".format(token.get("access_token")),
+            },
+        )
 
     def _request_token(self, payload):
         """
@@ -138,7 +236,7 @@ class FlumeAuth:  # noqa: WPS214
             URL_OAUTH_TOKEN,
             json=payload,
             headers=headers,
-            timeout=self._timeout,
+            timeout=request_timeout(self._timeout),
         )
 
         LOGGER.debug("Token Payload: %s", payload)  # noqa: WPS323
@@ -154,7 +252,7 @@ class FlumeAuth:  # noqa: WPS214
 
     def _verify_token(self):
         """Check to see if token is expiring in 12 hours."""
-        token_expiration = datetime.fromtimestamp(self._decoded_token["exp"])
+        token_expiration = datetime.fromtimestamp(self._state.decoded_token["exp"])
         time_difference = datetime.now() + timedelta(hours=12)  # noqa: WPS432
         LOGGER.debug("Token expiration time: %s", token_expiration)  # noqa: WPS323
         LOGGER.debug("Token comparison time: %s", time_difference)  # noqa: WPS323
@@ -0,0 +1,317 @@
+"""Fail fast on a degraded Flume API and hedge slow requests."""
+
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    wait,
+)
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+from .session import SessionWrapper  # noqa: WPS300
+from .utils import FlumeCircuitOpenError, configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_ID_SEGMENT = re.compile("/[0-9]+(?=/|$)")
+
+
+class _Circuit:
+    """Breaker state and latency samples of one endpoint."""
+
+    __slots__ = ("state", "failures", "opened_at", "probing", "latencies")
+
+    def __init__(self, samples):
+        """Initialize a closed circuit.
+
+        Args:
+            samples: Number of latency samples to keep.
+        """
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.probing = False
+        self.latencies = deque(maxlen=samples)
+
+
+def _close_response(future):
+    """Release the connection of a response that lost a hedge race.
+
+    Args:
+        future: Completed request future.
+    """
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _first_success(futures):
+    """Return the response of the first request future to succeed.
+
+    Responses of the requests still running are closed when they complete.
+
+    Args:
+        futures: Set of request futures.
+
+    Returns:
+        The first successful response. If every request fails, the error of
+        the first one to fail is raised.
+    """
+    pending = futures
+    failed = []
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        succeeded = [future for future in done if future.exception() is None]
+        if succeeded:
+            for loser in pending:
+                loser.add_done_callback(_close_response)
+            return succeeded[0].result()
+        failed.extend(done)
+    return failed[0].result()
+
+
+class CircuitBreakerSession(SessionWrapper):  # noqa: WPS214, WPS230
+    """Requests Session wrapper with a circuit breaker per endpoint.
+
+    Endpoints are the method and URL path, with numeric user and device ids
+    replaced, so one failing endpoint does not block the others. After
+    `failure_threshold` consecutive timeouts, connection errors or 5xx
+    responses the circuit opens and requests fail immediately with
+    FlumeCircuitOpenError. After `recovery_timeout` seconds a single probe
+    request is let through; its success closes the circuit again.
+
+    With `hedge=True`, a GET still running after the `hedge_quantile` latency
+    of its endpoint is sent a second time and the first response wins.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        http_session=None,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        hedge_methods=("GET",),
+    ) -> None:
+        """
+        Initialize the wrapper.
+
+        Args:
+            http_session: Requests Session() performing the calls.
+            failure_threshold: Consecutive failures opening the circuit.
+            recovery_timeout: Seconds before an open circuit is probed.
+            hedge: Send a second request when the first one is slow.
+            hedge_quantile: Latency quantile after which a request is hedged.
+            hedge_min_samples: Latency samples needed before hedging.
+            hedge_methods: Idempotent methods that may be hedged.
+        """
+        super().__init__(http_session)
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._hedge = hedge
+        self._hedge_quantile = hedge_quantile
+        self._hedge_min_samples = hedge_min_samples
+        self._hedge_methods = {method.upper() for method in hedge_methods}
+        self._lock = threading.Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hedged = 0
+
+    def state(self, method: str, url: str) -> str:
+        """Return the circuit state of the endpoint of a request.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+
+        Returns:
+            closed, open or half_open.
+        """
+        return self._circuit(self._endpoint(method, url)).state
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """Perform a request unless the circuit of its endpoint is open.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response.
+
+        Raises:
+            FlumeCircuitOpenError: If the circuit of the endpoint is open.
+            Timeout: If the request timed out, counted as a failure.
+            RequestsConnectionError: If the connection failed, counted as a failure.
+            BaseException: Any other error of the request.
+        """
+        endpoint = self._endpoint(method, url)
+        circuit = self._circuit(endpoint)
+        if not self._allow(circuit):
+            raise FlumeCircuitOpenError(
+                "Circuit open for {0}, not sending request.".format(endpoint),
+            )
+
+        started = time.monotonic()
+        try:
+            if self._hedge and method.upper() in self._hedge_methods:
+                response = self._hedged_request(circuit, method, url, kwargs)
+            else:
+                response = self._http_session.request(method, url, **kwargs)
+        except (Timeout, RequestsConnectionError):
+            self._record(circuit, endpoint, success=False, latency=0)
+            raise
+        except BaseException:  # noqa: B902, WPS424
+            with self._lock:
+                circuit.probing = False
+            raise
+
+        self._record(
+            circuit,
+            endpoint,
+            response.status_code < 500,  # noqa: WPS432
+            time.monotonic() - started,
+        )
+        return response
+
+    def close(self) -> None:
+        """Stop hedging threads and close the wrapped session."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        super().close()
+
+    def _endpoint(self, method, url):
+        """Return the endpoint key of a request.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+
+        Returns:
+            Method and path with numeric ids replaced.
+        """
+        return "{0} {1}".format(
+            method.upper(),
+            _ID_SEGMENT.sub("/{id}", urlsplit(url).path),
+        )
+
+    def _circuit(self, endpoint):
+        """Return the circuit of an endpoint, creating it when needed.
+
+        Args:
+            endpoint: Endpoint key.
+
+        Returns:
+            The circuit.
+        """
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                circuit = _Circuit(max(self._hedge_min_samples, 100))  # noqa: WPS432
+                self._circuits[endpoint] = circuit
+            return circuit
+
+    def _allow(self, circuit):
+        """Return True if a request may be sent through the circuit.
+
+        Args:
+            circuit: Circuit of the endpoint.
+
+        Returns:
+            Boolean: False when the circuit is open or already probing.
+        """
+        with self._lock:
+            if circuit.state == STATE_OPEN:
+                if time.monotonic() - circuit.opened_at < self._recovery_timeout:
+                    return False
+                circuit.state = STATE_HALF_OPEN
+                circuit.probing = False
+            if circuit.state == STATE_HALF_OPEN:
+                if circuit.probing:
+                    return False
+                circuit.probing = True
+            return True
+
+    def _record(self, circuit, endpoint, success, latency):  # noqa: WPS211
+        """Update the circuit with the outcome of a request.
+
+        Args:
+            circuit: Circuit of the endpoint.
+            endpoint: Endpoint key.
+            success: False for timeouts, connection errors and 5xx responses.
+            latency: Seconds the request took.
+        """
+        with self._lock:
+            circuit.probing = False
+            if success:
+                circuit.failures = 0
+                circuit.state = STATE_CLOSED
+                circuit.latencies.append(latency)
+                return
+            circuit.failures += 1
+            probe_failed = circuit.state == STATE_HALF_OPEN
+            if probe_failed or circuit.failures >= self._failure_threshold:
+                if circuit.state != STATE_OPEN:
+                    LOGGER.warning("Circuit opened for %s", endpoint)  # noqa: WPS323
+                circuit.state = STATE_OPEN
+                circuit.opened_at = time.monotonic()
+
+    def _hedge_delay(self, circuit):
+        """Return the latency after which a request is hedged.
+
+        Args:
+            circuit: Circuit of the endpoint.
+
+        Returns:
+            Seconds, None while there are too few samples.
+        """
+        with self._lock:
+            latencies = sorted(circuit.latencies)
+        if len(latencies) < self._hedge_min_samples:
+            return None
+        return latencies[int(self._hedge_quantile * (len(latencies) - 1))]
+
+    def _hedged_request(self, circuit, method, url, kwargs):
+        """Send a request and a second copy if the first one is slow.
+
+        Args:
+            circuit: Circuit of the endpoint.
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The first successful response. If both requests fail, the error
+            of the first one to fail is raised.
+        """
+        delay = self._hedge_delay(circuit)
+        if delay is None:
+            return self._http_session.request(method, url, **kwargs)
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="pyflume-hedge")
+        send = self._http_session.request
+        primary = self._executor.submit(send, method, url, **kwargs)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            LOGGER.debug("Hedging %s after %.3fs", url, delay)  # noqa: WPS323
+        self.hedged += 1
+
+        return _first_success(
+            {primary, self._executor.submit(send, method, url, **kwargs)},
+        )
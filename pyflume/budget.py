@@ -0,0 +1,365 @@
+"""Track the API call limits of each account and plan polling workloads."""
+
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import timedelta
+import math
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from .constants import (  # noqa: WPS300
+    API_LIMIT,
+    API_LIMIT_CALLS,
+    MAX_QUERIES_PER_REQUEST,
+)
+from .deadline import current_deadline  # noqa: WPS300
+from .utils import FlumeDeadlineError, configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+_DEFERRED_BUDGET: ContextVar[Optional["RateBudget"]] = ContextVar(
+    "pyflume_deferred_budget",
+    default=None,
+)
+
+# Queries generated by FlumeData for each update.
+DEFAULT_QUERIES = 7
+SECONDS_PER_HOUR = 3600
+
+
+class BudgetStatus(NamedTuple):
+    """State of a rate budget at one point in time."""
+
+    calls: int
+    period: float
+    remaining: int
+    next_free_in: float
+    queue_depth: int
+    total_calls: int
+    total_wait: float
+
+
+class RateBudget:  # noqa: WPS214
+    """Sliding window of the query requests allowed per period.
+
+    acquire takes a call from the budget, waiting for the next free slot when
+    the window is used up. The remaining calls, the wait until the next free
+    slot and the number of waiting threads can be read at any time. A 429
+    response can push the next free slot back with backoff.
+    """
+
+    def __init__(self, calls: int = API_LIMIT_CALLS, period: float = API_LIMIT) -> None:
+        """
+        Initialize an unused budget.
+
+        Args:
+            calls: Requests allowed per period.
+            period: Length of the window in seconds.
+        """
+        self.calls = calls
+        self.period = period
+        self._condition = threading.Condition()
+        self._call_times = deque()
+        self._blocked_until = 0
+        self._waiting = 0
+        self.total_calls = 0
+        self.total_wait: float = 0
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take a call from the budget.
+
+        Args:
+            blocking: Wait for the next free slot instead of returning False.
+
+        Waiting raises FlumeDeadlineError if the active Deadline ends before
+        the next slot.
+
+        Returns:
+            True once the call is taken, False if the budget is used up and
+            blocking is False.
+        """
+        with self._condition:
+            started = time.monotonic()
+            wait = self._wait_time(started)
+            if wait > 0 and not blocking:
+                return False
+            now = self._wait_for_slot(started, wait)
+            self._call_times.append(now)
+            self.total_calls += 1
+            self.total_wait += now - started
+            return True
+
+    def backoff(self, seconds: float) -> None:
+        """Allow no call for a while, ex: after a 429 response.
+
+        Args:
+            seconds: Time before the next call.
+        """
+        with self._condition:
+            self._blocked_until = max(
+                self._blocked_until,
+                time.monotonic() + seconds,
+            )
+
+    def remaining(self) -> int:
+        """Return the calls available now.
+
+        Returns:
+            Number of calls.
+        """
+        with self._condition:
+            return self._remaining(time.monotonic())
+
+    def next_free_in(self) -> float:
+        """Return the time until a call is available.
+
+        Returns:
+            Seconds, 0 if a call is available now.
+        """
+        with self._condition:
+            return self._wait_time(time.monotonic())
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of threads waiting for a call.
+
+        Returns:
+            Number of threads.
+        """
+        return self._waiting
+
+    def status(self) -> BudgetStatus:
+        """Return the state of the budget.
+
+        Returns:
+            BudgetStatus
+        """
+        with self._condition:
+            now = time.monotonic()
+            return BudgetStatus(
+                calls=self.calls,
+                period=self.period,
+                remaining=self._remaining(now),
+                next_free_in=self._wait_time(now),
+                queue_depth=self._waiting,
+                total_calls=self.total_calls,
+                total_wait=self.total_wait,
+            )
+
+    def _wait_for_slot(self, now, wait):
+        """Wait for the next free slot, called with the lock held.
+
+        Args:
+            now: Monotonic time the wait was computed at.
+            wait: Seconds before the next free slot.
+
+        Returns:
+            Monotonic time the slot is free at.
+
+        Raises:
+            FlumeDeadlineError: If the active Deadline ends before the slot.
+        """
+        while wait > 0:
+            deadline = current_deadline()
+            if deadline is not None and deadline.remaining() < wait:
+                raise FlumeDeadlineError(
+                    "API call limits allow no request before the deadline.",
+                )
+            LOGGER.debug(
+                "Waiting %.1fs for the API call limits",  # noqa: WPS323
+                wait,
+            )
+            self._waiting += 1
+            self._condition.wait(wait)
+            self._waiting -= 1
+            now = time.monotonic()
+            wait = self._wait_time(now)
+        return now
+
+    def _expire(self, now):
+        """Drop calls that left the window, called with the lock held.
+
+        Args:
+            now: Monotonic time.
+        """
+        while self._call_times and self._call_times[0] <= now - self.period:
+            self._call_times.popleft()
+
+    def _remaining(self, now):
+        """Return the calls available, called with the lock held.
+
+        Args:
+            now: Monotonic time.
+
+        Returns:
+            Number of calls.
+        """
+        self._expire(now)
+        if self._blocked_until > now:
+            return 0
+        return self.calls - len(self._call_times)
+
+    def _wait_time(self, now):
+        """Return the wait before the next call, called with the lock held.
+
+        Args:
+            now: Monotonic time.
+
+        Returns:
+            Seconds.
+        """
+        self._expire(now)
+        wait = max(self._blocked_until - now, 0)
+        if len(self._call_times) >= self.calls:
+            wait = max(wait, self._call_times[0] + self.period - now)
+        return wait
+
+
+_BUDGETS: Dict[Any, RateBudget] = {}  # noqa: WPS407
+_BUDGETS_LOCK = threading.Lock()
+
+
+def account_budget(account: Any) -> RateBudget:
+    """Return the budget shared by every object of an account.
+
+    Args:
+        account: Account key, the user id.
+
+    Returns:
+        RateBudget of the account, created on first use.
+    """
+    with _BUDGETS_LOCK:
+        if account not in _BUDGETS:
+            _BUDGETS[account] = RateBudget()
+        return _BUDGETS[account]
+
+
+@contextmanager
+def defer_call(rate_budget: RateBudget):
+    """Take a call from rate_budget only when a request is actually sent.
+
+    Within the with statement, a session that sends requests on behalf of
+    several callers, such as CoalescingSession, calls take_deferred_call
+    right before sending, so callers served by a request already in flight
+    take no call.
+
+    Args:
+        rate_budget: RateBudget the request is taken from.
+
+    Yields:
+        None
+    """
+    token = _DEFERRED_BUDGET.set(rate_budget)
+    try:
+        yield
+    finally:
+        _DEFERRED_BUDGET.reset(token)
+
+
+def session_call(rate_budget: RateBudget, http_session: Any):
+    """Take a call from rate_budget for the next request of http_session.
+
+    With a coalescing session the call is deferred until the request is
+    sent, so callers served by an identical request in flight take none.
+
+    Args:
+        rate_budget: RateBudget the request is taken from.
+        http_session: Session sending the request.
+
+    Returns:
+        Context manager to send the request in.
+    """
+    if getattr(http_session, "coalesces", False):
+        return defer_call(rate_budget)
+    rate_budget.acquire()
+    return nullcontext()
+
+
+def take_deferred_call() -> None:
+    """Take the call deferred by defer_call, at most once.
+
+    Waiting for the call raises FlumeDeadlineError if the active Deadline
+    ends before the next slot.
+    """
+    rate_budget = _DEFERRED_BUDGET.get()
+    if rate_budget is not None:
+        _DEFERRED_BUDGET.set(None)
+        rate_budget.acquire()
+
+
+class PollPlan(NamedTuple):
+    """Estimated cost of a polling configuration."""
+
+    requests_per_poll: int
+    requests_per_hour: float
+    capacity_per_hour: float
+    utilization: float
+    throttled: bool
+    cycle_wait: float
+    effective_interval: timedelta
+    worst_staleness: timedelta
+
+
+def _hourly_load(requests_per_cycle, interval, calls, period):
+    """Return the requests sent and allowed per hour when polling.
+
+    Args:
+        requests_per_cycle: Requests sent once per interval.
+        interval: Seconds between cycles.
+        calls: Requests allowed per period.
+        period: Length of the window in seconds.
+
+    Returns:
+        Dict of the PollPlan load fields.
+    """
+    requests_per_hour = requests_per_cycle * SECONDS_PER_HOUR / interval
+    capacity_per_hour = calls * SECONDS_PER_HOUR / period
+    return {
+        "requests_per_hour": requests_per_hour,
+        "capacity_per_hour": capacity_per_hour,
+        "utilization": requests_per_hour / capacity_per_hour,
+        "throttled": requests_per_hour > capacity_per_hour,
+    }
+
+
+def plan_polling(
+    devices: int,
+    scan_interval: timedelta,
+    queries: int = DEFAULT_QUERIES,
+    calls: int = API_LIMIT_CALLS,
+    period: float = API_LIMIT,
+) -> PollPlan:
+    """Estimate API calls and freshness of polling devices, without calling the API.
+
+    Every device is assumed to update once per scan_interval, with its
+    queries sent MAX_QUERIES_PER_REQUEST per request, and all devices to
+    start their cycle together as FlumeCache does.
+
+    Args:
+        devices: Number of devices polled on the account.
+        scan_interval: Time between updates of a device.
+        queries: Queries per update, 7 for the default FlumeData payload.
+        calls: Requests allowed per period.
+        period: Length of the window in seconds.
+
+    Returns:
+        PollPlan where utilization above 1 means the budget throttles polling,
+        cycle_wait is the wait of the last request of a cycle, effective_interval
+        the update interval actually achieved per device and worst_staleness
+        the oldest data can get.
+    """
+    requests_per_poll = math.ceil(queries / MAX_QUERIES_PER_REQUEST)
+    requests_per_cycle = devices * requests_per_poll
+    interval = scan_interval.total_seconds()
+    cycle_wait = max(requests_per_cycle - 1, 0) // calls * period
+    effective_interval = max(interval, requests_per_cycle * period / calls)
+    return PollPlan(
+        requests_per_poll=requests_per_poll,
+        cycle_wait=cycle_wait,
+        effective_interval=timedelta(seconds=effective_interval),
+        worst_staleness=timedelta(seconds=effective_interval + cycle_wait),
+        **_hourly_load(requests_per_cycle, interval, calls, period),
+    )
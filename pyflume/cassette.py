@@ -0,0 +1,282 @@
+"""Record HTTP exchanges to a cassette file and replay them without network."""
+
+import base64
+from collections import deque
+import gzip
+import io
+import json
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, ReadTimeout
+
+from .session import SessionWrapper  # noqa: WPS300
+from .transport import Transport, build_response, split_timeout  # noqa: WPS300
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+CASSETTE_VERSION = 1
+# Bodies are stored decoded, so the headers describing the wire encoding go.
+_DROPPED_HEADERS = frozenset(
+    ("content-encoding", "content-length", "transfer-encoding"),
+)
+
+
+class Exchange(NamedTuple):
+    """Recorded request and response."""
+
+    method: str
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    elapsed: float
+
+
+def _exchange_json(exchange):
+    """Return the JSON line of an exchange.
+
+    Args:
+        exchange: Exchange to serialise.
+
+    Returns:
+        JSON serialisable dict.
+    """
+    exchange_json = exchange._asdict()  # noqa: WPS437
+    body = exchange_json.pop("body")
+    try:
+        exchange_json["text"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        exchange_json["base64"] = base64.b64encode(body).decode("ascii")
+    return exchange_json
+
+
+def _exchange_from_json(exchange_json):
+    """Return the exchange of a JSON line.
+
+    Args:
+        exchange_json: Dict written by _exchange_json.
+
+    Returns:
+        Exchange
+    """
+    if "base64" in exchange_json:
+        body = base64.b64decode(exchange_json.pop("base64"))
+    else:
+        body = exchange_json.pop("text").encode("utf-8")
+    return Exchange(body=body, **exchange_json)
+
+
+def save_cassette(path: str, exchanges: List[Exchange]) -> None:
+    """Write exchanges to a gzip compressed JSON lines cassette.
+
+    Args:
+        path: Cassette file.
+        exchanges: Exchanges in recording order.
+    """
+    with gzip.open(path, "wt", encoding="utf-8") as cassette:
+        cassette.write(json.dumps({"version": CASSETTE_VERSION}))
+        cassette.write("\n")
+        for exchange in exchanges:
+            cassette.write(json.dumps(_exchange_json(exchange)))
+            cassette.write("\n")
+    LOGGER.debug("Saved %s exchanges to %s", len(exchanges), path)  # noqa: WPS323
+
+
+def load_cassette(path: str) -> List[Exchange]:
+    """Read the exchanges of a cassette.
+
+    Args:
+        path: Cassette file.
+
+    Returns:
+        Exchanges in recording order.
+
+    Raises:
+        ValueError: If the cassette version is not supported.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as cassette:
+        header = json.loads(cassette.readline())
+        if header.get("version") != CASSETTE_VERSION:
+            raise ValueError(
+                "Unsupported cassette version {0}".format(header.get("version")),
+            )
+        return [_exchange_from_json(json.loads(line)) for line in cassette if line]
+
+
+class CassetteRecorder(SessionWrapper):
+    """Requests Session wrapper recording every exchange.
+
+    Responses are recorded decoded, with the time the call took. Request
+    bodies and headers are not recorded, but responses are, including OAuth
+    tokens: treat cassettes as credentials.
+    """
+
+    def __init__(self, http_session=None, path=None) -> None:
+        """
+        Initialize the recorder.
+
+        Args:
+            http_session: Requests Session() performing the calls.
+            path: Cassette file written by save and close.
+        """
+        super().__init__(http_session)
+        self._path = path
+        self._lock = threading.Lock()
+        self._exchanges = []
+
+    @property
+    def exchanges(self) -> List[Exchange]:
+        """Return the exchanges recorded so far.
+
+        Returns:
+            List of Exchange.
+        """
+        with self._lock:
+            return list(self._exchanges)
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """Perform a request and record it.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response, with its body read.
+        """
+        started = time.monotonic()
+        response = self._http_session.request(method, url, **kwargs)
+        exchange = Exchange(
+            method=method.upper(),
+            url=response.request.url if response.request is not None else url,
+            status_code=response.status_code,
+            headers={
+                name: header_value
+                for name, header_value in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+            body=response.content,
+            elapsed=round(time.monotonic() - started, 6),
+        )
+        with self._lock:
+            self._exchanges.append(exchange)
+        return response
+
+    def save(self, path=None) -> None:
+        """Write the recorded exchanges to a cassette.
+
+        Args:
+            path: Cassette file, defaults to the path of the recorder.
+
+        Raises:
+            ValueError: If no path is given.
+        """
+        path = path or self._path
+        if path is None:
+            raise ValueError("No cassette path given.")
+        save_cassette(path, self.exchanges)
+
+    def close(self) -> None:
+        """Save the cassette if a path was given, and close the session."""
+        if self._path is not None:
+            self.save()
+        super().close()
+
+    def __enter__(self) -> "CassetteRecorder":
+        """Return the recorder.
+
+        Returns:
+            The recorder.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Save the cassette and close the session.
+
+        Args:
+            exc_info: Exception information.
+        """
+        self.close()
+
+
+class ReplayTransport(Transport):
+    """Backend answering requests from a cassette, without network.
+
+    Requests are matched on method and URL, including the query string, and
+    each recording is answered once in recording order. The recorded call
+    time is waited for, divided by speed, and a read timeout shorter than
+    that raises ReadTimeout as it would have live.
+    """
+
+    def __init__(
+        self,
+        cassette,
+        speed: float = 1,
+        loop: bool = False,
+    ) -> None:
+        """
+        Initialize the replay.
+
+        Args:
+            cassette: Cassette file or list of Exchange.
+            speed: Replay speed, 1 for recorded timing, 0 for no delay.
+            loop: Answer again from the start once a request's recordings ran out.
+        """
+        super().__init__()
+        if isinstance(cassette, str):
+            cassette = load_cassette(cassette)
+        self.speed = speed
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._recorded = {}
+        for exchange in cassette:
+            key = (exchange.method, exchange.url)
+            self._recorded.setdefault(key, []).append(exchange)
+        self._pending = {
+            key: deque(exchanges) for key, exchanges in self._recorded.items()
+        }
+
+    def send(self, prepared, timeout=None, stream=False):
+        """Answer a prepared request with its next recording.
+
+        Args:
+            prepared: The request.
+            timeout: Seconds or (connect, read) tuple.
+            stream: Ignored.
+
+        Returns:
+            The response.
+
+        Raises:
+            RequestsConnectionError: If no recording is left for the request.
+            ReadTimeout: If the recorded call is slower than the read timeout.
+        """
+        key = (prepared.method, prepared.url)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None and not pending and self._loop:
+                pending.extend(self._recorded[key])
+            exchange = pending.popleft() if pending else None
+        if exchange is None:
+            raise RequestsConnectionError(
+                "No recording left for {0} {1}".format(*key),
+            )
+
+        delay = exchange.elapsed / self.speed if self.speed else 0
+        read_timeout = split_timeout(timeout)[1]
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise ReadTimeout("Replayed call took {0:.3f}s".format(delay))
+        if delay:
+            time.sleep(delay)
+        return build_response(
+            prepared,
+            exchange.status_code,
+            exchange.headers,
+            raw=io.BytesIO(exchange.body),
+        )
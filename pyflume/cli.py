@@ -0,0 +1,368 @@
+"""Command line interface, ex: pyflume export usage --since 2024-01-01."""
+
+import argparse
+import contextlib
+from datetime import datetime, timedelta
+import json
+import os
+import sys
+
+from . import (  # noqa: WPS300
+    FlumeAuth,
+    FlumeDeviceList,
+    FlumeNotificationList,
+    FlumeUsageAlertList,
+)
+from .budget import DEFAULT_QUERIES, plan_polling  # noqa: WPS300
+from .export import (  # noqa: WPS300
+    DEVICE_COLUMNS,
+    FORMAT_CSV,
+    FORMAT_NDJSON,
+    FORMAT_PARQUET,
+    FORMATS,
+    LEAK_COLUMNS,
+    NOTIFICATION_COLUMNS,
+    QUERY_WINDOWS,
+    USAGE_ALERT_COLUMNS,
+    USAGE_COLUMNS,
+    iter_leaks,
+    iter_usage,
+    open_writer,
+)
+from .server import (  # noqa: WPS300
+    DEFAULT_LIST_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    FlumeCache,
+    serve,
+)
+from .transport import (  # noqa: WPS300
+    TRANSPORT_HTTPX,
+    TRANSPORT_REQUESTS,
+    TRANSPORT_URLLIB3,
+    create_transport,
+)
+
+EXPORT_DEVICES = "devices"
+EXPORT_USAGE = "usage"
+EXPORT_LEAKS = "leaks"
+EXPORT_NOTIFICATIONS = "notifications"
+EXPORT_USAGE_ALERTS = "usage-alerts"
+EXPORTS = (  # noqa: WPS317
+    EXPORT_DEVICES,
+    EXPORT_USAGE,
+    EXPORT_LEAKS,
+    EXPORT_NOTIFICATIONS,
+    EXPORT_USAGE_ALERTS,
+)
+EXPORT_COLUMNS = {  # noqa: WPS407
+    EXPORT_DEVICES: DEVICE_COLUMNS,
+    EXPORT_USAGE: USAGE_COLUMNS,
+    EXPORT_LEAKS: LEAK_COLUMNS,
+    EXPORT_NOTIFICATIONS: NOTIFICATION_COLUMNS,
+    EXPORT_USAGE_ALERTS: USAGE_ALERT_COLUMNS,
+}
+
+# Credentials default to these environment variables.
+CREDENTIAL_VARIABLES = {  # noqa: WPS407
+    "username": "FLUME_USERNAME",
+    "password": "FLUME_PASSWORD",  # noqa: S105
+    "client_id": "FLUME_CLIENT_ID",
+    "client_secret": "FLUME_CLIENT_SECRET",  # noqa: S105
+}
+
+
+def build_parser():  # noqa: WPS213
+    """Return the argument parser of the pyflume command.
+
+    Returns:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="pyflume", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export Flume data to a file.")
+    export_parser.add_argument("dataset", choices=EXPORTS)
+    _add_credentials(export_parser)
+    _add_transport(export_parser)
+    export_parser.add_argument("--format", choices=FORMATS, default=FORMAT_NDJSON)
+    export_parser.add_argument(
+        "--output",
+        default="-",
+        help="Output file, - for standard output.",
+    )
+    export_parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Concurrent requests, within the API limits.",
+    )
+    export_parser.add_argument(
+        "--device",
+        action="append",
+        help="Only export this device id, may be repeated.",
+    )
+    export_parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Start of usage, in the device time zone.",
+    )
+    export_parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        default=None,
+        help="End of usage, in the device time zone, defaults to now.",
+    )
+    export_parser.add_argument("--bucket", choices=list(QUERY_WINDOWS), default="HR")
+    export_parser.add_argument(
+        "--read",
+        choices=("true", "false"),
+        default="false",
+        help="Read state of the exported notifications and alerts.",
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve cached Flume data to local clients.",
+    )
+    _add_credentials(serve_parser)
+    _add_transport(serve_parser)
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)  # noqa: WPS432
+    serve_parser.add_argument(
+        "--socket",
+        help="Listen on this Unix socket instead of TCP.",
+    )
+    serve_parser.add_argument(
+        "--scan-interval",
+        type=float,
+        default=DEFAULT_SCAN_INTERVAL.total_seconds(),
+        help="Seconds between device value updates.",
+    )
+    serve_parser.add_argument(
+        "--list-interval",
+        type=float,
+        default=DEFAULT_LIST_INTERVAL.total_seconds(),
+        help="Seconds between device, leak and alert list updates.",
+    )
+
+    plan_parser = subparsers.add_parser(
+        "plan",
+        help="Estimate the API calls of polling devices, without calling the API.",
+    )
+    plan_parser.add_argument("--devices", type=int, default=1)
+    plan_parser.add_argument(
+        "--scan-interval",
+        type=float,
+        default=DEFAULT_SCAN_INTERVAL.total_seconds(),
+        help="Seconds between device value updates.",
+    )
+    plan_parser.add_argument(
+        "--queries",
+        type=int,
+        default=DEFAULT_QUERIES,
+        help="Queries per device update.",
+    )
+    return parser
+
+
+def _add_credentials(parser):
+    """Add the credential arguments to a sub command.
+
+    Args:
+        parser: Sub command parser.
+    """
+    for name, env_name in CREDENTIAL_VARIABLES.items():
+        parser.add_argument(
+            "--{0}".format(name.replace("_", "-")),
+            dest=name,
+            default=os.environ.get(env_name),
+            help="Defaults to ${0}.".format(env_name),
+        )
+
+
+def _add_transport(parser):
+    """Add the HTTP backend argument to a sub command.
+
+    Args:
+        parser: Sub command parser.
+    """
+    parser.add_argument(
+        "--transport",
+        choices=(TRANSPORT_REQUESTS, TRANSPORT_URLLIB3, TRANSPORT_HTTPX),
+        default=TRANSPORT_REQUESTS,
+        help="HTTP client performing the requests.",
+    )
+
+
+def _authenticate(args, http_session):
+    """Return the authentication object of the credential arguments.
+
+    Args:
+        args: Parsed arguments.
+        http_session: Requests Session()
+
+    Returns:
+        FlumeAuth
+    """
+    return FlumeAuth(
+        args.username,
+        args.password,
+        args.client_id,
+        args.client_secret,
+        http_session=http_session,
+    )
+
+
+def iter_rows(args, flume_auth, http_session):
+    """Yield the rows of the requested dataset.
+
+    Args:
+        args: Parsed export arguments.
+        flume_auth: Authentication object.
+        http_session: Requests Session()
+
+    Returns:
+        Iterator of dicts.
+    """
+    if args.dataset == EXPORT_NOTIFICATIONS:
+        return FlumeNotificationList(
+            flume_auth,
+            http_session=http_session,
+            read=args.read,
+            stream=True,
+            update_on_init=False,
+        ).iter_notifications()
+    if args.dataset == EXPORT_USAGE_ALERTS:
+        return FlumeUsageAlertList(
+            flume_auth,
+            http_session=http_session,
+            read=args.read,
+            stream=True,
+            update_on_init=False,
+        ).iter_usage_alerts()
+
+    devices = FlumeDeviceList(
+        flume_auth,
+        http_session=http_session,
+        stream=True,
+    ).device_list
+    if args.device:
+        devices = [device for device in devices if device["id"] in args.device]
+    if args.dataset == EXPORT_LEAKS:
+        return iter_leaks(flume_auth, devices, args.workers, http_session)
+    if args.dataset == EXPORT_USAGE:
+        return iter_usage(
+            flume_auth,
+            devices,
+            args.since,
+            args.until,
+            args.bucket,
+            args.workers,
+            http_session,
+        )
+    return iter(devices)
+
+
+def _open_output(args):
+    """Open the output file of the export.
+
+    Args:
+        args: Parsed export arguments.
+
+    Returns:
+        Context manager of the file object, standard output is not closed.
+    """
+    if args.format == FORMAT_PARQUET:
+        if args.output == "-":
+            return contextlib.nullcontext(sys.stdout.buffer)
+        return open(args.output, "wb")  # noqa: WPS515
+    newline = "" if args.format == FORMAT_CSV else None
+    if args.output == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(args.output, "w", encoding="utf-8", newline=newline)  # noqa: WPS515
+
+
+def export(args):
+    """Run the export command.
+
+    Args:
+        args: Parsed export arguments.
+
+    Returns:
+        Number of exported rows.
+    """
+    http_session = create_transport(args.transport)
+    count = 0
+    with _open_output(args) as output:
+        with contextlib.closing(
+            open_writer(args.format, output, EXPORT_COLUMNS[args.dataset]),
+        ) as writer:
+            for row in iter_rows(args, _authenticate(args, http_session), http_session):
+                writer.write(row)
+                count += 1
+    return count
+
+
+def run_server(args):
+    """Run the serve command until interrupted.
+
+    Args:
+        args: Parsed serve arguments.
+    """
+    http_session = create_transport(args.transport)
+    cache = FlumeCache(
+        _authenticate(args, http_session),
+        http_session=http_session,
+        scan_interval=timedelta(seconds=args.scan_interval),
+        list_interval=timedelta(seconds=args.list_interval),
+    )
+    serve(cache, args.host, args.port, args.socket)
+
+
+def plan(args):
+    """Run the plan command.
+
+    Args:
+        args: Parsed plan arguments.
+
+    Returns:
+        JSON serialisable dict of the PollPlan, durations in seconds.
+    """
+    poll_plan = plan_polling(
+        args.devices,
+        timedelta(seconds=args.scan_interval),
+        args.queries,
+    )
+    return {
+        name: plan_value.total_seconds()
+        if isinstance(plan_value, timedelta)
+        else plan_value
+        for name, plan_value in poll_plan._asdict().items()  # noqa: WPS437
+    }
+
+
+def main(argv=None):
+    """Run the pyflume command.
+
+    Args:
+        argv: Arguments, defaults to sys.argv.
+
+    Returns:
+        Exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "plan":
+        print(json.dumps(plan(args), indent=2))  # noqa: WPS421
+        return 0
+    missing = [name for name in CREDENTIAL_VARIABLES if getattr(args, name) is None]
+    if missing:
+        parser.error("missing credentials: {0}".format(", ".join(missing)))
+    if args.command == "serve":
+        run_server(args)
+    elif args.command == "export":
+        if args.dataset == EXPORT_USAGE and args.since is None:
+            parser.error("--since is required to export usage")
+        count = export(args)
+        print("Exported {0} rows".format(count), file=sys.stderr)  # noqa: WPS421
+    return 0
@@ -0,0 +1,128 @@
+"""Share one HTTP call between identical concurrent requests."""
+
+from concurrent.futures import Future
+import json
+import threading
+from typing import Any, Dict, Tuple
+
+from .budget import take_deferred_call  # noqa: WPS300
+from .session import SessionWrapper  # noqa: WPS300
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+
+def _normalize(payload):
+    """Return a hashable canonical form of a request payload.
+
+    Args:
+        payload: JSON body, query string or headers.
+
+    Returns:
+        Canonical JSON string.
+    """
+    return json.dumps(payload, sort_keys=True, default=str)
+
+
+class CoalescingSession(SessionWrapper):
+    """Requests Session wrapper running identical concurrent requests once.
+
+    Requests are keyed by method, URL (which holds the endpoint, user id and
+    device id), normalised query string, JSON payload and authorization
+    header. While a request is in flight, identical requests from other
+    threads wait for it and receive the same response object. Streamed
+    requests are never coalesced because their body can only be read once.
+
+    A call deferred with pyflume.budget.defer_call is taken from the rate
+    budget only by the request that is sent, callers served by it take none.
+    """
+
+    coalesces = True
+
+    def __init__(self, http_session=None) -> None:
+        """
+        Initialize the wrapper.
+
+        Args:
+            http_session: Requests Session() performing the calls.
+        """
+        super().__init__(http_session)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple, Future] = {}
+        self.coalesced = 0
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """Perform a request, or wait for an identical one already in flight.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response.
+
+        Raises:
+            BaseException: The error of the request, in every waiting caller.
+        """
+        if kwargs.get("stream"):
+            take_deferred_call()
+            return self._http_session.request(method, url, **kwargs)
+
+        key = (
+            method.upper(),
+            url,
+            _normalize(kwargs.get("params")),
+            _normalize(kwargs.get("json")),
+            _normalize(kwargs.get("data")),
+            _normalize(kwargs.get("headers")),
+        )
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            LOGGER.debug("Coalesced %s %s", method, url)  # noqa: WPS323
+            return future.result()
+
+        try:
+            response = self._send(method, url, **kwargs)
+        except BaseException as exc:  # noqa: B902, WPS424
+            self._finish(key)
+            future.set_exception(exc)
+            raise
+        self._finish(key)
+        future.set_result(response)
+        return response
+
+    def _send(self, method, url, **kwargs):
+        """Perform the request and read its body.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response.
+        """
+        take_deferred_call()
+        response = self._http_session.request(method, url, **kwargs)
+        # Read the body now so every waiting caller can use it.
+        response.content  # noqa: WPS428
+        return response
+
+    def _finish(self, key):
+        """Stop sharing the request of key with new callers.
+
+        Args:
+            key: Request key.
+        """
+        with self._lock:
+            self._in_flight.pop(key, None)
@@ -0,0 +1,219 @@
+"""Convert query responses to Arrow tables or pandas DataFrames.
+
+pyarrow and pandas are optional, each is imported by the functions using it.
+"""
+
+from typing import Any, List, NamedTuple, Optional
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+QUERY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # noqa: WPS323
+UTC = "UTC"
+
+
+class _Columns(NamedTuple):
+    """Query responses split into columns, one row per bucket."""
+
+    request_ids: List[str]
+    counts: List[int]
+    datetimes: List[Optional[str]]
+    readings: List[Any]
+
+
+def _columns(responses):
+    """Split query responses into request_id, datetime and value columns.
+
+    Args:
+        responses: Dict of request_id to the list of buckets returned by the API.
+
+    Returns:
+        _Columns with the buckets of every request_id in order.
+    """
+    columns = _Columns([], [], [], [])
+    for request_id, buckets in responses.items():
+        columns.request_ids.append(request_id)
+        columns.counts.append(len(buckets))
+        columns.datetimes.extend([bucket.get("datetime") for bucket in buckets])
+        columns.readings.extend([bucket["value"] for bucket in buckets])
+    return columns
+
+
+def _repeat_codes(pyarrow, counts):
+    """Return dictionary codes repeating each code count times.
+
+    Args:
+        pyarrow: The pyarrow module.
+        counts: Number of rows of each code.
+
+    Returns:
+        pyarrow.Int32Array
+    """
+    return pyarrow.concat_arrays(
+        [pyarrow.array([], pyarrow.int32())]
+        + [
+            pyarrow.repeat(pyarrow.scalar(code, pyarrow.int32()), count)
+            for code, count in enumerate(counts)
+        ],
+    )
+
+
+def to_arrow(responses, device_id=None, time_zone=None):
+    """Return query responses as an Arrow table.
+
+    The table has a dictionary encoded request_id column, a datetime
+    timestamp column and a float64 value column, plus a dictionary encoded
+    device_id column when device_id is given. Buckets without a datetime,
+    ex: current_interval, have a null datetime.
+
+    Args:
+        responses: Dict of request_id to the API buckets, ex: FlumeData.query().
+        device_id: Flume device id added as a column.
+        time_zone: Time zone of the device, makes datetime aware, else naive local.
+
+    Returns:
+        pyarrow.Table
+    """
+    import pyarrow.compute  # noqa: WPS301,WPS433,WPS458
+
+    parsed = _columns(responses)
+    timestamps = pyarrow.compute.strptime(
+        pyarrow.array(parsed.datetimes, pyarrow.string()),
+        format=QUERY_TIME_FORMAT,
+        unit="s",
+    )
+    if time_zone is not None:
+        timestamps = pyarrow.compute.assume_timezone(
+            timestamps,
+            timezone=time_zone,
+            ambiguous="earliest",
+            nonexistent="earliest",
+        )
+
+    columns = {
+        "request_id": pyarrow.DictionaryArray.from_arrays(
+            _repeat_codes(pyarrow, parsed.counts),
+            pyarrow.array(parsed.request_ids, pyarrow.string()),
+        ),
+        "datetime": timestamps,
+        "value": pyarrow.array(parsed.readings, pyarrow.float64()),
+    }
+    if device_id is not None:
+        columns = {
+            "device_id": pyarrow.DictionaryArray.from_arrays(
+                _repeat_codes(pyarrow, [len(parsed.readings)]),
+                pyarrow.array([str(device_id)]),
+            ),
+            **columns,
+        }
+    return pyarrow.table(columns)
+
+
+def to_pandas(responses, device_id=None, time_zone=None):
+    """Return query responses as a pandas DataFrame.
+
+    The DataFrame has the columns of to_arrow, with a categorical request_id,
+    a datetime64 datetime and a float64 value. pyarrow is not required.
+
+    Args:
+        responses: Dict of request_id to the list of buckets returned by the API.
+        device_id: Flume device id added as a column.
+        time_zone: Time zone of the device, makes datetime time zone aware.
+
+    Returns:
+        pandas.DataFrame
+    """
+    import numpy  # noqa: WPS433
+    import pandas  # noqa: WPS433
+
+    parsed = _columns(responses)
+    timestamps = pandas.to_datetime(
+        pandas.Series(parsed.datetimes, dtype=object),
+        format=QUERY_TIME_FORMAT,
+    )
+    if time_zone is not None:
+        timestamps = timestamps.dt.tz_localize(
+            time_zone,
+            ambiguous=numpy.ones(len(timestamps), dtype=bool),
+            nonexistent="shift_forward",
+        )
+
+    columns = {
+        "request_id": pandas.Categorical.from_codes(
+            numpy.repeat(
+                numpy.arange(len(parsed.counts), dtype=numpy.int32),
+                parsed.counts,
+            ),
+            categories=parsed.request_ids,
+        ),
+        "datetime": timestamps,
+        "value": numpy.asarray(parsed.readings, dtype=numpy.float64),
+    }
+    if device_id is not None:
+        columns = {
+            "device_id": pandas.Categorical.from_codes(
+                numpy.zeros(len(parsed.readings), dtype=numpy.int32),
+                categories=[str(device_id)],
+            ),
+            **columns,
+        }
+    return pandas.DataFrame(columns)
+
+
+def devices_to_arrow(devices):
+    """Return the responses of several devices as a single Arrow table.
+
+    Datetimes are converted to UTC so devices in different time zones share
+    the datetime column.
+
+    Args:
+        devices: FlumeData objects, their latest responses are used.
+
+    Returns:
+        pyarrow.Table with a device_id column.
+    """
+    import pyarrow  # noqa: WPS433
+
+    tables = []
+    for flume_data in devices:
+        table = to_arrow(
+            flume_data.responses,
+            flume_data.device_id,
+            flume_data.device_tz,
+        )
+        tables.append(
+            table.set_column(
+                table.schema.get_field_index("datetime"),
+                "datetime",
+                table["datetime"].cast(pyarrow.timestamp("s", tz=UTC)),
+            ),
+        )
+    return pyarrow.concat_tables(tables)
+
+
+def devices_to_pandas(devices):
+    """Return the responses of several devices as a single DataFrame.
+
+    Args:
+        devices: FlumeData objects, their latest responses are used.
+
+    Returns:
+        pandas.DataFrame with a device_id column and UTC datetimes.
+    """
+    import pandas  # noqa: WPS433
+
+    frames = []
+    for flume_data in devices:
+        frame = to_pandas(
+            flume_data.responses,
+            flume_data.device_id,
+            flume_data.device_tz,
+        )
+        frame["datetime"] = frame["datetime"].dt.tz_convert(UTC)
+        frames.append(frame)
+    frame = pandas.concat(frames, ignore_index=True)
+    for column in ("device_id", "request_id"):
+        frame[column] = frame[column].astype("category")
+    return frame
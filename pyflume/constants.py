@@ -1,13 +1,29 @@
 """Constants to support PyFlume."""
 
+from datetime import timedelta
+
 # Time-related constants
 API_LIMIT = 60
+# Query requests allowed per API_LIMIT seconds.
+API_LIMIT_CALLS = 2
 DEFAULT_TIMEOUT = 30
 
 # Operation constants
 CONST_OPERATION = "SUM"
 CONST_UNIT_OF_MEASUREMENT = "GALLONS"
 
+# Query constants
+# Query ranges include until_datetime, stop one step before the next window.
+QUERY_STEP = timedelta(minutes=1)
+MAX_QUERIES_PER_REQUEST = 10
+# Time range of a single query, keeping each within the API bucket limits.
+QUERY_WINDOWS = {  # noqa: WPS407
+    "MIN": timedelta(hours=12),  # noqa: WPS432
+    "HR": timedelta(days=14),  # noqa: WPS432
+    "DAY": timedelta(days=365),  # noqa: WPS432
+    "MON": timedelta(days=3650),  # noqa: WPS432
+}
+
 # Base URL
 API_BASE_URL = "https://api.flumetech.com"
 
@@ -1,16 +1,29 @@
 """Retrieve data from Flume API."""
 
 from datetime import datetime, timedelta, timezone
+import functools
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
 
-from ratelimit import limits, sleep_and_retry
 from requests import Session
 
+from .budget import account_budget, session_call  # noqa: WPS300
 from .constants import (  # noqa: WPS300
     API_LIMIT,
     API_QUERY_URL,
     CONST_OPERATION,
     CONST_UNIT_OF_MEASUREMENT,
     DEFAULT_TIMEOUT,
+    MAX_QUERIES_PER_REQUEST,
+    QUERY_STEP,
+    QUERY_WINDOWS,
+)
+from .deadline import request_timeout  # noqa: WPS300
+from .units import (  # noqa: WPS300
+    conversion_factor,
+    convert_buckets,
+    convert_values,
+    query_units,
 )
 from .utils import (  # noqa: WPS300
     configure_logger,
@@ -29,9 +42,92 @@ except ImportError:  # Python < 3.9
 # Configure logging
 LOGGER = configure_logger(__name__)
 
+HTTP_TOO_MANY_REQUESTS = 429
+# Minutes of current_interval, queried for the time series store only.
+MINUTES_REQUEST_ID = "current_interval_minutes"
+# Gaps closer than this are fetched by fill_gaps with one query.
+GAP_MERGE_WITHIN = timedelta(minutes=5)
+# Buckets returned by the API for a query.
+Buckets = List[Dict[str, Any]]
+
+
+def _retry_after(response, default):
+    """Return the Retry-After delay of a response.
+
+    Args:
+        response: Response of the API.
+        default: Seconds returned without a numeric Retry-After header.
+
+    Returns:
+        Seconds.
+    """
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return default
+
+
+def _gap_windows(gaps):
+    """Split gaps into query windows, at most as many as a request holds.
+
+    Args:
+        gaps: List of (start, end) epoch seconds ranges.
+
+    Returns:
+        List of (start, end) epoch seconds query windows.
+    """
+    window = int(QUERY_WINDOWS["MIN"].total_seconds())
+    windows = []
+    for gap_start, gap_end in gaps:
+        windows.extend(
+            (start, min(start + window, gap_end))
+            for start in range(gap_start, gap_end, window)
+        )
+    return windows[:MAX_QUERIES_PER_REQUEST]
+
+
+def _gap_queries(windows, device_tz):
+    """Return the minute queries of query windows.
+
+    Args:
+        windows: List of (start, end) epoch seconds query windows.
+        device_tz: ZoneInfo of the device.
 
-class FlumeData:
-    """Get the latest data and update the states."""
+    Returns:
+        List of query dicts.
+    """
+    return [
+        {
+            "request_id": "gap_{0}".format(index),
+            "bucket": "MIN",
+            "since_datetime": format_time(datetime.fromtimestamp(start, device_tz)),
+            "until_datetime": format_time(
+                datetime.fromtimestamp(end, device_tz) - QUERY_STEP,
+            ),
+            "units": CONST_UNIT_OF_MEASUREMENT,
+        }
+        for index, (start, end) in enumerate(windows)
+    ]
+
+
+class FlumeDataState(NamedTuple):
+    """Immutable result of an update, replaced as a whole."""
+
+    values: Dict[str, Any]  # noqa: WPS110
+    responses: Dict[str, Buckets]
+    query_payload: Dict[str, Any]
+    anomalies: List[Any]
+    last_updated: Optional[float]
+    unit_values: Dict[str, Dict[str, Any]]
+
+
+class FlumeData:  # noqa: WPS214
+    """Get the latest data and update the states.
+
+    Instances are thread safe: updates are serialised and publish a new
+    FlumeDataState in a single assignment, so readers never lock and always
+    see values, responses and last_updated of the same update.
+    """
 
     def __init__(  # noqa: WPS211
         self,
@@ -43,6 +139,13 @@ class FlumeData:
         http_session=None,
         timeout=DEFAULT_TIMEOUT,
         query_payload=None,
+        event_stream=None,
+        leak_detector=None,
+        timeseries_store=None,
+        shared_cache=None,
+        query_keys=None,
+        units=None,
+        rate_budget=None,
     ):
         """
 
@@ -57,6 +160,13 @@ class FlumeData:
             http_session: Requests Session()
             timeout: Requests timeout for throttling.
             query_payload: Specific query_payload to request for device.
+            event_stream: FlumeEventStream notified when values change.
+            leak_detector: FlumeLeakDetector fed with each minute of current_interval.
+            timeseries_store: FlumeTimeSeriesStore receiving current_interval flow.
+            shared_cache: FlumeSharedCache sharing updates with other processes.
+            query_keys: Only query these request ids, ex: ["today"].
+            units: Also convert values to these units after each update.
+            rate_budget: RateBudget of the query requests, default the account's.
 
         """
         self._timeout = timeout
@@ -64,93 +174,565 @@ class FlumeData:
         self._scan_interval = scan_interval
         self.device_id = device_id
         self.device_tz = device_tz
-        self.values = {}  # noqa: WPS110
+        self._event_stream = event_stream
+        self._leak_detector = leak_detector
+        self._timeseries_store = timeseries_store
+        self._shared_cache = shared_cache
+        self._lock = threading.RLock()
+        self._query_keys_filter = None if query_keys is None else set(query_keys)
+        self._units = tuple(units or ())
+        self._rate_budget = rate_budget
+        for unit in self._units:
+            conversion_factor(CONST_UNIT_OF_MEASUREMENT, unit)
         if query_payload is None:
-            self.query_payload = self._generate_api_query_payload(
+            query_payload = self._generate_api_query_payload(
                 self._scan_interval,
                 device_tz,
             )
-        else:
-            self.query_payload = query_payload
+        self.state = FlumeDataState(
+            values={},
+            responses={},
+            query_payload=query_payload,
+            anomalies=[],
+            last_updated=None,
+            unit_values={},
+        )
         if http_session is None:
             self._http_session = Session()
         else:
             self._http_session = http_session
         self._query_keys = [
-            query["request_id"] for query in self.query_payload["queries"]
+            query["request_id"] for query in query_payload["queries"]
         ]
         if update_on_init:
             self.update()
 
-    @sleep_and_retry
-    @limits(calls=2, period=API_LIMIT)
-    def update(self):
+    @property
+    def values(self):  # noqa: WPS110
+        """Return the values of the latest update.
+
+        Returns:
+            Dict of request_id to value.
+        """
+        return self.state.values
+
+    @values.setter
+    def values(self, values_dict):  # noqa: WPS110
+        """Replace the values, with their conversions to other units.
+
+        Args:
+            values_dict: Dict of request_id to value.
+        """
+        with self._lock:
+            self._publish(
+                values=values_dict,
+                unit_values=self._convert(values_dict, self.state.query_payload),
+            )
+
+    @property
+    def responses(self):
+        """Return the buckets of the latest update.
+
+        Returns:
+            Dict of request_id to the list of buckets.
+        """
+        return self.state.responses
+
+    @property
+    def query_payload(self):
+        """Return the query payload of the latest update.
+
+        Returns:
+            Dict with the list of queries.
+        """
+        return self.state.query_payload
+
+    @query_payload.setter
+    def query_payload(self, query_payload):
+        """Replace the query payload, converting the values from its units.
+
+        Args:
+            query_payload: Dict with the list of queries.
+        """
+        with self._lock:
+            self._publish(
+                query_payload=query_payload,
+                unit_values=self._convert(self.state.values, query_payload),
+            )
+
+    @property
+    def anomalies(self):
+        """Return the anomalies detected by the latest update.
+
+        Returns:
+            List of FlowAnomaly.
+        """
+        return self.state.anomalies
+
+    @property
+    def last_updated(self):
+        """Return the epoch time of the latest update.
+
+        Returns:
+            Epoch seconds, None before the first update.
+        """
+        return self.state.last_updated
+
+    @property
+    def rate_budget(self):
+        """Return the budget of the query requests.
+
+        Returns:
+            RateBudget, shared by the objects of the account by default.
+        """
+        if self._rate_budget is None:
+            self._rate_budget = account_budget(self._flume_auth.user_id)
+        return self._rate_budget
+
+    @property
+    def unit_values(self):
+        """Return the values of the latest update in the units of the object.
+
+        Returns:
+            Dict of unit to a dict of request_id to value.
+        """
+        return self.state.unit_values
+
+    def values_in(self, unit):
+        """Return the values of the latest update in a unit.
+
+        Args:
+            unit: One of pyflume.units.UNITS, ex: "LITERS".
+
+        Returns:
+            Dict of request_id to value.
+        """
+        state = self.state
+        unit_values = state.unit_values.get(unit)
+        if unit_values is not None:
+            return unit_values
+        return convert_values(
+            state.values,
+            [unit],
+            query_units(state.query_payload),
+        )[unit]
+
+    def responses_in(self, unit):
+        """Return the buckets of the latest update in a unit.
+
+        Args:
+            unit: One of pyflume.units.UNITS, ex: "LITERS".
+
+        Returns:
+            Dict of request_id to the list of buckets.
+        """
+        state = self.state
+        from_units = query_units(state.query_payload)
+        return {
+            key: convert_buckets(
+                buckets,
+                conversion_factor(
+                    from_units.get(key, CONST_UNIT_OF_MEASUREMENT),
+                    unit,
+                ),
+            )
+            for key, buckets in state.responses.items()
+        }
+
+    def update(self, until=None):
         """
         Return updated value for session.
 
+        Args:
+            until: Time zone aware end of the queries, defaults to now. Objects
+                updated with the same until return values of the same period.
+
         Returns:
             Returns status of update
 
         """
-        return self.update_force()
+        if self._shared_cache is not None:
+            return self._shared_cache.sync(
+                "data:{0}".format(self.device_id),
+                self,
+                functools.partial(self._update_limited, until),
+            )
+        return self._update_limited(until)
+
+    def query(self, queries):
+        """Return the results of custom queries for the device.
 
-    def update_force(self):
-        """Return updated value for session without auto retry or limits."""
-        self.query_payload = self._generate_api_query_payload(
+        Adheres to API call limits, shared with update.
+
+        Args:
+            queries: List of query dicts, each with a unique request_id.
+
+        Returns:
+            Dict of request_id to the list of buckets returned by the API.
+        """
+        with session_call(self.rate_budget, self._http_session):
+            return self._post_query({"queries": queries})
+
+    def fill_gaps(
+        self,
+        since,
+        until=None,
+        merge_within=GAP_MERGE_WITHIN,
+        wait=False,
+    ):
+        """Fetch the minutes missing from the time series store.
+
+        The ranges the store has not recorded as fetched are merged, split
+        into query windows, and up to MAX_QUERIES_PER_REQUEST of them are
+        fetched in a single request. Without wait, nothing is fetched unless
+        the API call limits have a request to spare.
+
+        Args:
+            since: Time zone aware start of the history to repair.
+            until: Time zone aware end, defaults to the current minute.
+            merge_within: Fetch gaps closer than this with one query.
+            wait: Wait for the API call limits instead of skipping.
+
+        Returns:
+            List of (start, end) epoch seconds ranges that were filled.
+
+        Raises:
+            ValueError: If the object has no time series store.
+        """
+        if self._timeseries_store is None:
+            raise ValueError("fill_gaps requires a timeseries_store.")
+        if until is None:
+            until = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        windows = _gap_windows(
+            self._timeseries_store.gaps(self.device_id, since, until, merge_within),
+        )
+        if not windows:
+            return []
+        if not self.rate_budget.acquire(blocking=wait):
+            LOGGER.debug(
+                "No spare API calls to fill %s gaps",  # noqa: WPS323
+                len(windows),
+            )
+            return []
+
+        queries = _gap_queries(windows, ZoneInfo(self.device_tz))
+        responses = self._post_query({"queries": queries})
+        for query in queries:
+            self._store_minutes(responses.get(query["request_id"], []))
+        return windows
+
+    def update_force(self, until=None):
+        """Return updated value for session without auto retry or limits.
+
+        Args:
+            until: Time zone aware end of the queries, defaults to now.
+        """
+        with self._lock:
+            self._update_state(until)
+
+    def snapshot(self):
+        """Return the state of the object, see pyflume.snapshot.
+
+        Returns:
+            JSON serialisable state.
+        """
+        state = self.state
+        return {
+            "device_id": self.device_id,
+            "values": state.values,
+            "query_payload": state.query_payload,
+            "last_updated": state.last_updated,
+        }
+
+    def restore(self, state):
+        """Restore a state returned by snapshot.
+
+        Args:
+            state: State returned by snapshot.
+
+        Raises:
+            ValueError: If the state belongs to another device.
+        """
+        if state["device_id"] != self.device_id:
+            raise ValueError(
+                "Snapshot of device {0} can't be restored to {1}".format(
+                    state["device_id"],
+                    self.device_id,
+                ),
+            )
+        self._publish(
+            values=state["values"],
+            query_payload=state["query_payload"],
+            last_updated=state["last_updated"],
+            unit_values=self._convert(state["values"], state["query_payload"]),
+        )
+
+    def _update_limited(self, until=None):
+        """Update within the API call limits.
+
+        Args:
+            until: Time zone aware end of the queries, defaults to now.
+
+        Returns:
+            Returns status of update
+        """
+        with session_call(self.rate_budget, self._http_session):
+            return self.update_force(until)
+
+    def _update_state(self, until=None):
+        """Query the API and publish the new state, called with the lock held.
+
+        Args:
+            until: Time zone aware end of the queries, defaults to now.
+        """
+        query_payload = self._generate_api_query_payload(
             self._scan_interval,
             self.device_tz,
+            until,
         )
 
+        responses, minutes = self._query_with_minutes(query_payload)
+
+        # Step 1: Initialize an empty dictionary
+        values_dict = {}
+
+        # Step 2: Loop through each key in self._query_keys
+        for key in self._query_keys:
+            # Step 3: Check the length of the responses for the current key
+            if len(responses[key]) == 1:
+                # Step 4: Assign the value to the dictionary if the condition is met
+                values_dict[key] = responses[key][0]["value"]
+            else:
+                # Step 5: Assign None to the dictionary if the condition is not met
+                values_dict[key] = None
+
+        # Step 6: Assign the result to self.values
+        self.state = FlumeDataState(
+            values=values_dict,
+            responses=responses,
+            query_payload=query_payload,
+            anomalies=self._process_current_interval(
+                values_dict,
+                query_payload,
+                minutes,
+            ),
+            last_updated=datetime.now(timezone.utc).timestamp(),
+            unit_values=self._convert(values_dict, query_payload),
+        )
+
+        if self._event_stream is not None:
+            self._event_stream.publish_values(self.device_id, values_dict)
+            self._event_stream.publish(self.state.anomalies)
+
+    def _post_query(self, query_payload):
+        """Post a query payload for the device.
+
+        Args:
+            query_payload: Dict with the list of queries.
+
+        Returns:
+            Dict of request_id to the list of buckets returned by the API.
+        """
         url = API_QUERY_URL.format(
             user_id=self._flume_auth.user_id,
             device_id=self.device_id,
         )
-        response = self._http_session.post(
+        response = self._http_session.request(
+            "POST",
             url,
-            json=self.query_payload,
+            json=query_payload,
             headers=self._flume_auth.authorization_header,
-            timeout=self._timeout,
+            timeout=request_timeout(self._timeout),
         )
 
         LOGGER.debug("Update URL: %s", url)  # noqa: WPS323
-        LOGGER.debug("Update query_payload: %s", self.query_payload)  # noqa: WPS323
+        LOGGER.debug("Update query_payload: %s", query_payload)  # noqa: WPS323
         LOGGER.debug("Update Response: %s", response.text)  # noqa: WPS323
 
+        if response.status_code == HTTP_TOO_MANY_REQUESTS:
+            self.rate_budget.backoff(_retry_after(response, API_LIMIT))
+
         # Check for response errors.
         flume_response_error(
             "Can't update flume data for user id {0}".format(self._flume_auth.user_id),
             response,
         )
 
-        responses = response.json()["data"][0]
+        return response.json()["data"][0]
 
-        # Step 1: Initialize an empty dictionary
-        values_dict = {}
+    def _publish(self, **fields):
+        """Replace fields of state, readers see all of them or none.
 
-        # Step 2: Loop through each key in self._query_keys
-        for key in self._query_keys:
-            # Step 3: Check the length of the responses for the current key
-            if len(responses[key]) == 1:
-                # Step 4: Assign the value to the dictionary if the condition is met
-                values_dict[key] = responses[key][0]["value"]
-            else:
-                # Step 5: Assign None to the dictionary if the condition is not met
-                values_dict[key] = None
+        Args:
+            fields: FlumeDataState fields to replace.
+        """
+        with self._lock:
+            self.state = self.state._replace(**fields)  # noqa: WPS437
 
-        # Step 6: Assign the result to self.values
-        self.values = values_dict  # noqa: WPS110
+    def _convert(self, values_dict, query_payload):
+        """Convert values to the units of the object.
+
+        Args:
+            values_dict: Values returned by an update.
+            query_payload: Query payload of the update.
+
+        Returns:
+            Dict of unit to a dict of request_id to value.
+        """
+        if not self._units:
+            return {}
+        return convert_values(values_dict, self._units, query_units(query_payload))
+
+    def _query_with_minutes(self, query_payload):
+        """Post the update queries, with the minutes of current_interval if needed.
+
+        Args:
+            query_payload: Query payload of the update.
+
+        Returns:
+            Tuple of the responses to query_payload and the minute buckets.
+        """
+        minutes_query = self._minutes_query(query_payload)
+        if minutes_query is None:
+            return self._post_query(query_payload), []
+        responses = self._post_query(
+            {"queries": [*query_payload["queries"], minutes_query]},
+        )
+        minutes = responses.pop(MINUTES_REQUEST_ID, [])
+        if self._timeseries_store is not None:
+            self._store_minutes(minutes)
+        return responses, minutes
+
+    def _minutes_query(self, query_payload):
+        """Return the query of the minutes of current_interval.
+
+        current_interval sums its minutes up to and including until_datetime,
+        so the store and the leak detector get the minutes of the scan
+        interval before it instead.
+
+        Args:
+            query_payload: Query payload of the update.
+
+        Returns:
+            Query dict, None without a time series store and leak detector, or
+            without current_interval.
+        """
+        if self._timeseries_store is None and self._leak_detector is None:
+            return None
+        interval_end = self._current_interval_end(query_payload)
+        if interval_end is None:
+            return None
+        return {
+            "request_id": MINUTES_REQUEST_ID,
+            "bucket": "MIN",
+            "since_datetime": format_time(interval_end - self._scan_interval),
+            "until_datetime": format_time(interval_end - QUERY_STEP),
+            "units": CONST_UNIT_OF_MEASUREMENT,
+        }
+
+    def _store_minutes(self, buckets):
+        """Write minute buckets to the time series store.
+
+        Each bucket is stored at the start of its minute, and only the minutes
+        returned are recorded as fetched.
+
+        Args:
+            buckets: MIN buckets returned by the API, oldest first.
+        """
+        device_tz = ZoneInfo(self.device_tz)
+        readings = [
+            (
+                datetime.strptime(
+                    bucket["datetime"],
+                    "%Y-%m-%d %H:%M:%S",  # noqa: WPS323
+                ).replace(tzinfo=device_tz),
+                bucket["value"],
+            )
+            for bucket in buckets
+            if bucket["value"] is not None
+        ]
+        self._timeseries_store.write_many(self.device_id, readings)
+        fetched = None
+        for minute, _ in readings:
+            if fetched is not None and fetched[1] == minute:
+                fetched = (fetched[0], minute + QUERY_STEP)
+                continue
+            if fetched is not None:
+                self._timeseries_store.mark_fetched(self.device_id, *fetched)
+            fetched = (minute, minute + QUERY_STEP)
+        if fetched is not None:
+            self._timeseries_store.mark_fetched(self.device_id, *fetched)
+
+    def _process_current_interval(self, values_dict, query_payload, minutes):
+        """Feed the flow of each minute of current_interval to the leak detector.
+
+        The current_interval total is used when the API returned no minutes.
+
+        Args:
+            values_dict: Values returned by the latest update.
+            query_payload: Query payload of the latest update.
+            minutes: MIN buckets of current_interval, oldest first.
+
+        Returns:
+            Anomalies found by the leak detector.
+        """
+        interval_end = self._current_interval_end(query_payload)
+        if interval_end is None or self._leak_detector is None:
+            return []
+        if not minutes:
+            return self._leak_detector.observe(
+                self.device_id,
+                values_dict.get("current_interval"),
+                self._scan_interval.total_seconds() / 60,
+                interval_end,
+            )
+        anomalies = []
+        for bucket in minutes:
+            minute = datetime.strptime(
+                bucket["datetime"],
+                "%Y-%m-%d %H:%M:%S",  # noqa: WPS323
+            )
+            anomalies.extend(
+                self._leak_detector.observe(
+                    self.device_id,
+                    bucket["value"],
+                    1,
+                    minute + QUERY_STEP,
+                ),
+            )
+        return anomalies
+
+    def _current_interval_end(self, query_payload):
+        """Return the local end time of the current_interval query.
+
+        Args:
+            query_payload: Query payload of the update.
+
+        Returns:
+            Naive local datetime, None if the payload has no current_interval.
+        """
+        for query in query_payload["queries"]:
+            if query["request_id"] == "current_interval":
+                return datetime.strptime(
+                    query["until_datetime"],
+                    "%Y-%m-%d %H:%M:%S",  # noqa: WPS323
+                )
+        return None
 
-    def _generate_api_query_payload(self, scan_interval, device_tz):
+    def _generate_api_query_payload(self, scan_interval, device_tz, until=None):
         """Generate API Query payload to support getting data from Flume API.
 
         Args:
             scan_interval (_type_): Interval to scan.
             device_tz (_type_): Time Zone of Flume device.
+            until (_type_): Time zone aware end of the queries, defaults to now.
 
         Returns:
             JSON: API Query to retrieve API details.
         """
-        datetime_localtime = datetime.now(timezone.utc).astimezone(ZoneInfo(device_tz))
+        if until is None:
+            until = datetime.now(timezone.utc)
+        datetime_localtime = until.astimezone(ZoneInfo(device_tz))
 
         queries = [
             {
@@ -215,4 +797,10 @@ class FlumeData:
                 "units": CONST_UNIT_OF_MEASUREMENT,
             },
         ]
+        if self._query_keys_filter is not None:
+            queries = [
+                query
+                for query in queries
+                if query["request_id"] in self._query_keys_filter
+            ]
         return {"queries": queries}
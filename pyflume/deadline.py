@@ -0,0 +1,145 @@
+"""Bound the total time of operations spanning several requests."""
+
+from contextvars import ContextVar
+import time
+from typing import Optional, Tuple, Union
+
+from .utils import FlumeDeadlineError  # noqa: WPS300
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+
+_CURRENT_DEADLINE: ContextVar[Optional["Deadline"]] = ContextVar(
+    "pyflume_deadline",
+    default=None,
+)
+
+
+class Deadline:
+    """Time budget shared by every request made within a with statement.
+
+    While the deadline is active, each pyflume request gets a connect and a
+    read timeout derived from the time left, and no request is started once
+    the budget has run out. Nested deadlines never extend the outer one.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    ) -> None:
+        """
+        Initialize the deadline, the budget starts now.
+
+        Args:
+            seconds: Total time allowed.
+            connect_timeout: Maximum time to establish a connection.
+        """
+        self.expires_at = time.monotonic() + seconds
+        self.connect_timeout = connect_timeout
+        self._token = None
+
+    def remaining(self) -> float:
+        """Return the time left.
+
+        Returns:
+            Seconds, 0 once expired.
+        """
+        return max(self.expires_at - time.monotonic(), 0)
+
+    @property
+    def expired(self) -> bool:
+        """Return True once the budget has run out.
+
+        Returns:
+            Boolean
+        """
+        return self.remaining() <= 0
+
+    def check(self) -> None:
+        """Raise if the budget has run out.
+
+        Raises:
+            FlumeDeadlineError: If the deadline has expired.
+        """
+        if self.expired:
+            raise FlumeDeadlineError("Deadline exceeded.")
+
+    def timeout(
+        self,
+        default: Union[float, Tuple[float, float], None] = None,
+    ) -> Tuple[float, float]:
+        """Return the (connect, read) timeout of the next request.
+
+        Args:
+            default: Timeout of the caller, never exceeded.
+
+        Returns:
+            Tuple of connect and read timeouts in seconds.
+        """
+        self.check()
+        remaining = self.remaining()
+        connect_timeout = min(self.connect_timeout, remaining)
+        read_timeout = remaining
+        if isinstance(default, tuple):
+            connect_timeout = min(connect_timeout, default[0])
+            read_timeout = min(read_timeout, default[1])
+        elif default is not None:
+            connect_timeout = min(connect_timeout, default)
+            read_timeout = min(read_timeout, default)
+        return connect_timeout, read_timeout
+
+    def __enter__(self) -> "Deadline":
+        """Make the deadline current, keeping an earlier enclosing one.
+
+        Returns:
+            The deadline.
+        """
+        outer = _CURRENT_DEADLINE.get()
+        if outer is not None and outer.expires_at < self.expires_at:
+            self.expires_at = outer.expires_at
+        self._token = _CURRENT_DEADLINE.set(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Restore the enclosing deadline.
+
+        Args:
+            exc_info: Exception information.
+        """
+        _CURRENT_DEADLINE.reset(self._token)
+        self._token = None
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the current context.
+
+    Returns:
+        Deadline, None if no deadline is active.
+    """
+    return _CURRENT_DEADLINE.get()
+
+
+def check_deadline() -> None:
+    """Raise FlumeDeadlineError if the deadline of the current context has run out.
+
+    Called between the chunks of a streamed body, which a read timeout alone
+    does not bound.
+    """
+    deadline = _CURRENT_DEADLINE.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def request_timeout(default):
+    """Return the timeout of a request, bounded by the current deadline.
+
+    Args:
+        default: Timeout configured on the calling object.
+
+    Returns:
+        default without a deadline, (connect, read) tuple otherwise.
+    """
+    deadline = _CURRENT_DEADLINE.get()
+    if deadline is None:
+        return default
+    return deadline.timeout(default)
@@ -0,0 +1,246 @@
+"""Detect leaks locally from the flow returned by FlumeData."""
+
+from datetime import datetime, timedelta
+import math
+from typing import Dict, List, NamedTuple, Optional
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+ANOMALY_CONTINUOUS_FLOW = "continuous_flow"
+ANOMALY_SPIKE = "spike"
+ANOMALY_OVERNIGHT_USAGE = "overnight_usage"
+
+
+class FlowAnomaly(NamedTuple):
+    """Abnormal flow found by FlumeLeakDetector."""
+
+    device_id: str
+    kind: str
+    timestamp: datetime
+    value: float  # noqa: WPS110
+
+
+class _DeviceState:  # noqa: WPS230
+    """Constant size detector state of a single device."""
+
+    __slots__ = (
+        "continuous_minutes",
+        "continuous_alerted",
+        "mean",
+        "variance",
+        "samples",
+        "spike_alerted",
+        "night",
+        "night_total",
+        "night_alerted",
+    )
+
+    def __init__(self):
+        """Initialize an empty state."""
+        self.continuous_minutes = 0
+        self.continuous_alerted = False
+        self.mean = 0
+        self.variance = 0
+        self.samples = 0
+        self.spike_alerted = False
+        self.night = None
+        self.night_total = 0
+        self.night_alerted = False
+
+
+class FlumeLeakDetector:  # noqa: WPS230
+    """Flag continuous flow, spikes and overnight usage from minute flow."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        min_flow_rate: float = 0.01,
+        continuous_flow_minutes: float = 120,
+        spike_sigma: float = 4,
+        spike_min_rate: float = 1,
+        warmup_samples: int = 30,
+        smoothing: float = 0.05,
+        overnight_hours=(1, 5),
+        overnight_threshold: float = 5,
+    ) -> None:
+        """
+        Initialize the detector.
+
+        Args:
+            min_flow_rate: Gallons per minute counted as flowing water.
+            continuous_flow_minutes: Minutes of uninterrupted flow before alerting.
+            spike_sigma: Standard deviations above the mean counted as a spike.
+            spike_min_rate: Gallons per minute a spike must exceed.
+            warmup_samples: Samples needed before spikes are reported.
+            smoothing: Weight of the newest sample in the moving average.
+            overnight_hours: Local [start, end) hours, spanning midnight if start > end.
+            overnight_threshold: Gallons used overnight before alerting.
+        """
+        self._min_flow_rate = min_flow_rate
+        self._continuous_flow_minutes = continuous_flow_minutes
+        self._spike_sigma = spike_sigma
+        self._spike_min_rate = spike_min_rate
+        self._warmup_samples = warmup_samples
+        self._smoothing = smoothing
+        self._overnight_hours = overnight_hours
+        self._overnight_threshold = overnight_threshold
+        self._states: Dict[str, _DeviceState] = {}
+
+    def observe(
+        self,
+        device_id: str,
+        flow: Optional[float],
+        minutes: float,
+        timestamp: datetime,
+    ) -> List[FlowAnomaly]:
+        """Consume the flow of one poll and return new anomalies.
+
+        Args:
+            device_id: Flume device id.
+            flow: Gallons used during the interval, None when unknown.
+            minutes: Length of the interval in minutes.
+            timestamp: Local end time of the interval.
+
+        Returns:
+            Anomalies that started with this interval.
+        """
+        if flow is None or minutes <= 0:
+            return []
+
+        state = self._states.setdefault(device_id, _DeviceState())
+        rate = flow / minutes
+        anomalies = list(
+            filter(
+                None,
+                (
+                    self._check_continuous(state, rate, minutes),
+                    self._check_spike(state, rate),
+                    self._check_overnight(state, flow, timestamp),
+                ),
+            ),
+        )
+        if anomalies:
+            LOGGER.debug(
+                "Flow anomalies for %s: %s",  # noqa: WPS323
+                device_id,
+                anomalies,
+            )
+        return [
+            FlowAnomaly(device_id, kind, timestamp, anomaly_value)
+            for kind, anomaly_value in anomalies
+        ]
+
+    def reset(self, device_id: str) -> None:
+        """Forget the state of a device.
+
+        Args:
+            device_id: Flume device id.
+        """
+        self._states.pop(device_id, None)
+
+    def _check_continuous(self, state, rate, minutes):
+        """Track uninterrupted flow.
+
+        Args:
+            state: Device state.
+            rate: Gallons per minute.
+            minutes: Length of the interval in minutes.
+
+        Returns:
+            Kind and flowing minutes when the threshold is first reached.
+        """
+        if rate < self._min_flow_rate:
+            state.continuous_minutes = 0
+            state.continuous_alerted = False
+            return None
+
+        state.continuous_minutes += minutes
+        reached = state.continuous_minutes >= self._continuous_flow_minutes
+        if reached and not state.continuous_alerted:
+            state.continuous_alerted = True
+            return ANOMALY_CONTINUOUS_FLOW, state.continuous_minutes
+        return None
+
+    def _check_spike(self, state, rate):
+        """Compare the rate with an exponentially weighted mean and variance.
+
+        Args:
+            state: Device state.
+            rate: Gallons per minute.
+
+        Returns:
+            Kind and rate when a spike starts.
+        """
+        deviation = rate - state.mean
+        is_spike = (
+            state.samples >= self._warmup_samples
+            and rate >= self._spike_min_rate
+            and deviation > self._spike_sigma * math.sqrt(state.variance)
+        )
+
+        state.samples += 1
+        if state.samples == 1:
+            state.mean = rate
+        else:
+            increment = self._smoothing * deviation
+            state.mean += increment
+            state.variance = (1 - self._smoothing) * (
+                state.variance + deviation * increment
+            )
+
+        if not is_spike:
+            state.spike_alerted = False
+            return None
+        if state.spike_alerted:
+            return None
+        state.spike_alerted = True
+        return ANOMALY_SPIKE, rate
+
+    def _check_overnight(self, state, flow, timestamp):
+        """Accumulate usage inside the overnight window.
+
+        Args:
+            state: Device state.
+            flow: Gallons used during the interval.
+            timestamp: Local end time of the interval.
+
+        Returns:
+            Kind and overnight total when the threshold is first exceeded.
+        """
+        night = self._night(timestamp)
+        if night is None:
+            state.night = None
+            return None
+
+        if state.night != night:
+            state.night = night
+            state.night_total = 0
+            state.night_alerted = False
+
+        state.night_total += flow
+        if state.night_total > self._overnight_threshold and not state.night_alerted:
+            state.night_alerted = True
+            return ANOMALY_OVERNIGHT_USAGE, state.night_total
+        return None
+
+    def _night(self, timestamp):
+        """Return the date the overnight window of timestamp started.
+
+        Args:
+            timestamp: Local time.
+
+        Returns:
+            Date, None if timestamp is outside the overnight window.
+        """
+        start_hour, end_hour = self._overnight_hours
+        if start_hour <= end_hour:
+            if start_hour <= timestamp.hour < end_hour:
+                return timestamp.date()
+            return None
+        if timestamp.hour >= start_hour:
+            return timestamp.date()
+        if timestamp.hour < end_hour:
+            return timestamp.date() - timedelta(days=1)
+        return None
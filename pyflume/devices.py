@@ -1,22 +1,57 @@
 """Retrieve Devices from Flume API."""
 
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional
+
 from requests import Session
 
 from .constants import API_DEVICES_URL, DEFAULT_TIMEOUT  # noqa: WPS300
+from .deadline import request_timeout  # noqa: WPS300
+from .pages import take_call  # noqa: WPS300
+from .records import DeviceRecord, as_json  # noqa: WPS300
+from .stream import JsonDataStream  # noqa: WPS300
 from .utils import configure_logger, flume_response_error  # noqa: WPS300
 
 # Configure logging
 LOGGER = configure_logger(__name__)
 
+SENSOR_DEVICE_TYPE = 2
+
+
+def sensor_devices(devices):
+    """Return the devices reporting usage, excluding bridges.
+
+    Args:
+        devices: Devices in JSON format.
+
+    Returns:
+        List of sensor devices.
+    """
+    return [device for device in devices if device["type"] == SENSOR_DEVICE_TYPE]
+
 
-class FlumeDeviceList:
+class FlumeDeviceListState(NamedTuple):
+    """Immutable devices and update time, replaced as a whole."""
+
+    device_list: List[Any]
+    last_updated: Optional[float]
+
+
+class FlumeDeviceList:  # noqa: WPS214
     """Get Flume Device List from API."""
 
-    def __init__(
+    def __init__(  # noqa: WPS211
         self,
         flume_auth,
         http_session=None,
         timeout=DEFAULT_TIMEOUT,
+        records=False,
+        stream=False,
+        update_on_init=True,
+        user=True,
+        location=True,
+        rate_budget=None,
     ):
         """
 
@@ -26,41 +61,166 @@ class FlumeDeviceList:
             flume_auth: Authentication object.
             http_session: Requests Session()
             timeout: Requests timeout for throttling.
+            records: return DeviceRecord objects instead of JSON dicts.
+            stream: decode devices while the response body arrives.
+            update_on_init: fetch the device list on initialization.
+            user: include the user of each device.
+            location: include the location of each device.
+            rate_budget: RateBudget every request is taken from, default none.
 
         """
         self._timeout = timeout
         self._flume_auth = flume_auth
+        self._records = records
+        self._stream = stream
+        self._expansions = {"user": user, "location": location}
+        self._rate_budget = rate_budget
 
         if http_session is None:
             self._http_session = Session()
         else:
             self._http_session = http_session
 
-        self.device_list = self.get_devices()
+        self._lock = threading.RLock()
+        self.state = FlumeDeviceListState(device_list=[], last_updated=None)
+        if update_on_init:
+            self.update()
+
+    def update(self):
+        """Fetch the device list into device_list."""
+        with self._lock:
+            self.state = FlumeDeviceListState(
+                device_list=self.get_devices(),
+                last_updated=time.time(),
+            )
+
+    @property
+    def device_list(self):
+        """Return the devices of the latest update.
+
+        Returns:
+            List of devices in JSON format, or DeviceRecord objects.
+        """
+        return self.state.device_list
+
+    @device_list.setter
+    def device_list(self, device_list):
+        """Replace the devices.
+
+        Args:
+            device_list: Devices in JSON format, or records.
+        """
+        self._publish(device_list=device_list)
 
-    def get_devices(self):
+    @property
+    def last_updated(self):
+        """Return the epoch time of the latest update.
+
+        Returns:
+            Epoch seconds, None before the first update.
+        """
+        return self.state.last_updated
+
+    @last_updated.setter
+    def last_updated(self, last_updated):
+        """Replace the epoch time of the latest update.
+
+        Args:
+            last_updated: Epoch seconds.
+        """
+        self._publish(last_updated=last_updated)
+
+    def snapshot(self):
+        """Return the state of the object, see pyflume.snapshot.
+
+        Returns:
+            JSON serialisable state.
+        """
+        state = self.state
+        return {
+            "device_list": [as_json(entry) for entry in state.device_list],
+            "last_updated": state.last_updated,
+        }
+
+    def restore(self, state):
+        """Restore a state returned by snapshot.
+
+        Args:
+            state: State returned by snapshot.
+        """
+        entries = state["device_list"]
+        if self._records:
+            entries = [DeviceRecord.from_json(entry) for entry in entries]
+        with self._lock:
+            self.state = FlumeDeviceListState(
+                device_list=entries,
+                last_updated=state["last_updated"],
+            )
+
+    def get_devices(self, user=None, location=None):
         """
         Return all available devices from Flume API.
 
+        Args:
+            user: include the user of each device, defaults to the constructor.
+            location: include the location of each device, defaults to the constructor.
+
         Returns:
             Json device list.
 
         """
 
-        url = API_DEVICES_URL.format(user_id=self._flume_auth.user_id)
-        query_string = {"user": "true", "location": "true"}
-
+        take_call(self._rate_budget)
         response = self._http_session.request(
             "GET",
-            url,
+            API_DEVICES_URL.format(user_id=self._flume_auth.user_id),
             headers=self._flume_auth.authorization_header,
-            params=query_string,
-            timeout=self._timeout,
+            params=self._query_string(user, location),
+            timeout=request_timeout(self._timeout),
+            stream=self._stream,
         )
 
-        LOGGER.debug("get_devices Response: %s", response.text)  # noqa: WPS323
+        if self._stream:
+            LOGGER.debug("get_devices Streaming: %s", response.url)  # noqa: WPS323
+        else:
+            LOGGER.debug("get_devices Response: %s", response.text)  # noqa: WPS323
 
         # Check for response errors.
         flume_response_error("Impossible to retreive devices", response)
 
-        return response.json()["data"]
+        if self._stream:
+            devices = JsonDataStream(response)
+        else:
+            devices = response.json()["data"]
+        if self._records:
+            return [DeviceRecord.from_json(device) for device in devices]
+        return list(devices)
+
+    def _query_string(self, user, location):
+        """Return the expansions query string of a request.
+
+        Args:
+            user: include the user of each device, None for the default.
+            location: include the location of each device, None for the default.
+
+        Returns:
+            Dict of expansion to "true" or "false".
+        """
+        expansions = dict(self._expansions)
+        if user is not None:
+            expansions["user"] = user
+        if location is not None:
+            expansions["location"] = location
+        return {
+            expansion: "true" if enabled else "false"
+            for expansion, enabled in expansions.items()
+        }
+
+    def _publish(self, **fields):
+        """Replace fields of state, readers see all of them or none.
+
+        Args:
+            fields: FlumeDeviceListState fields to replace.
+        """
+        with self._lock:
+            self.state = self.state._replace(**fields)  # noqa: WPS437
@@ -0,0 +1,289 @@
+"""Publish change events for Flume API results."""
+
+import asyncio
+from collections import OrderedDict
+import json
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+NOTIFICATION_HISTORY = 1000
+
+ApiRecord = Dict[str, Any]
+
+
+class ValueChanged(NamedTuple):
+    """A query value of a device changed."""
+
+    device_id: str
+    key: str
+    old_value: Optional[float]
+    new_value: Optional[float]
+
+
+class LeakDetected(NamedTuple):
+    """A leak appeared in the active leak list of a device."""
+
+    device_id: str
+    leak: Dict[str, Any]
+
+
+class LeakCleared(NamedTuple):
+    """A leak disappeared from the active leak list of a device."""
+
+    device_id: str
+    leak: Dict[str, Any]
+
+
+class NotificationReceived(NamedTuple):
+    """A notification not seen before was returned by the API."""
+
+    notification: Dict[str, Any]
+
+
+def _item_key(entry):
+    """Return a stable identity for a leak or notification.
+
+    Args:
+        entry: Leak or notification returned by the API.
+
+    Returns:
+        The entry id, or its canonical JSON when no id is present.
+    """
+    entry_id = entry.get("id")
+    if entry_id is not None:
+        return entry_id
+    return json.dumps(entry, sort_keys=True, default=str)
+
+
+class _EventIterator:
+    """Async iterator over the events of a FlumeEventStream."""
+
+    def __init__(self, event_stream) -> None:
+        """Register the iterator on the running event loop.
+
+        Args:
+            event_stream: FlumeEventStream delivering the events.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self._event_stream = event_stream
+        event_stream._add_subscriber(self)  # noqa: WPS437
+
+    def __aiter__(self):
+        """Return the iterator itself.
+
+        Returns:
+            The iterator.
+        """
+        return self
+
+    async def __anext__(self):
+        """Wait for the next event.
+
+        Returns:
+            The next emitted event.
+        """
+        return await self.queue.get()
+
+    async def aclose(self) -> None:
+        """Stop receiving events."""
+        self._event_stream._remove_subscriber(self)  # noqa: WPS437
+
+
+class FlumeEventStream:  # noqa: WPS214
+    """Emit typed events only when Flume results change."""
+
+    def __init__(self, notification_history: int = NOTIFICATION_HISTORY) -> None:
+        """Initialize the event stream.
+
+        Args:
+            notification_history: Number of notification ids remembered to
+                detect new notifications.
+        """
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[Any], None]] = []
+        self._subscribers: List[_EventIterator] = []
+        self._device_values: Dict[str, ApiRecord] = {}
+        self._leaks: Dict[str, Dict[Any, ApiRecord]] = {}
+        self._notification_ids: OrderedDict = OrderedDict()
+        self._notification_history = notification_history
+
+    def subscribe(self, callback: Callable[[Any], None]) -> Callable[[], None]:
+        """Call `callback` with every event emitted from now on.
+
+        Args:
+            callback: Callable receiving a single event.
+
+        Returns:
+            Callable that removes the subscription.
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback: Callable[[Any], None]) -> None:
+        """Stop calling `callback` for new events.
+
+        Args:
+            callback: Callable previously passed to subscribe.
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def __aiter__(self) -> _EventIterator:
+        """Return an iterator of events, for use with `async for`.
+
+        The iterator receives every event emitted from this call on, and must
+        be created while its event loop is running.
+
+        Returns:
+            Async iterator of events.
+        """
+        return _EventIterator(self)
+
+    def publish(self, events: List[Any]) -> List[Any]:
+        """Emit events produced elsewhere, such as FlumeLeakDetector anomalies.
+
+        Args:
+            events: Events to emit.
+
+        Returns:
+            List of emitted events.
+        """
+        return self._emit(list(events))
+
+    def publish_values(
+        self,
+        device_id: str,
+        values: ApiRecord,  # noqa: WPS110
+    ) -> List[Any]:
+        """Emit a ValueChanged event for every key whose value changed.
+
+        Args:
+            device_id: Flume device id.
+            values: Latest values of FlumeData.
+
+        Returns:
+            List of emitted events.
+        """
+        with self._lock:
+            previous = self._device_values.get(device_id, {})
+            self._device_values[device_id] = dict(values)
+        events = [
+            ValueChanged(device_id, key, previous.get(key), new_value)
+            for key, new_value in values.items()
+            if key not in previous or previous[key] != new_value
+        ]
+        return self._emit(events)
+
+    def publish_leaks(self, device_id: str, leaks: List[Dict[str, Any]]) -> List[Any]:
+        """Emit LeakDetected and LeakCleared events for the active leak list.
+
+        Args:
+            device_id: Flume device id.
+            leaks: Latest active leak list of the device.
+
+        Returns:
+            List of emitted events.
+        """
+        current = {_item_key(leak): leak for leak in leaks}
+        with self._lock:
+            previous = self._leaks.get(device_id, {})
+            self._leaks[device_id] = current
+        events = [
+            LeakDetected(device_id, leak)
+            for key, leak in current.items()
+            if key not in previous
+        ]
+        events.extend(
+            LeakCleared(device_id, leak)
+            for key, leak in previous.items()
+            if key not in current
+        )
+        return self._emit(events)
+
+    def publish_notifications(self, notifications: List[Dict[str, Any]]) -> List[Any]:
+        """Emit a NotificationReceived event for every unseen notification.
+
+        Args:
+            notifications: Page of notifications returned by the API.
+
+        Returns:
+            List of emitted events.
+        """
+        events = []
+        with self._lock:
+            for notification in notifications:
+                key = _item_key(notification)
+                if key in self._notification_ids:
+                    self._notification_ids.move_to_end(key)
+                    continue
+                self._notification_ids[key] = None
+                events.append(NotificationReceived(notification))
+            while len(self._notification_ids) > self._notification_history:
+                self._notification_ids.popitem(last=False)
+        return self._emit(events)
+
+    def _add_subscriber(self, subscriber):
+        """Deliver new events to an async iterator.
+
+        Args:
+            subscriber: _EventIterator to add.
+        """
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+    def _remove_subscriber(self, subscriber):
+        """Stop delivering events to an async iterator.
+
+        Args:
+            subscriber: _EventIterator to remove.
+        """
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def _emit(self, events):
+        """Deliver events to callbacks and async iterators.
+
+        Args:
+            events: Events to deliver.
+
+        Returns:
+            The delivered events.
+        """
+        if not events:
+            return events
+        with self._lock:
+            callbacks = list(self._callbacks)
+            subscribers = list(self._subscribers)
+        for event in events:
+            for callback in callbacks:
+                try:
+                    callback(event)
+                except Exception:  # noqa: B902
+                    LOGGER.exception("Event callback failed for %s", event)  # noqa: WPS323
+            for subscriber in subscribers:
+                self._deliver(subscriber, event)
+        return events
+
+    def _deliver(self, subscriber, event):
+        """Queue an event on the event loop of an async iterator.
+
+        An iterator whose event loop is closed is removed.
+
+        Args:
+            subscriber: _EventIterator receiving the event.
+            event: Event to deliver.
+        """
+        try:
+            subscriber.loop.call_soon_threadsafe(subscriber.queue.put_nowait, event)
+        except RuntimeError:
+            LOGGER.debug("Removing event iterator of a closed event loop")
+            self._remove_subscriber(subscriber)
@@ -0,0 +1,402 @@
+"""Stream Flume API data to NDJSON, CSV or Parquet files."""
+
+import csv
+from datetime import datetime
+import json
+
+from .constants import (  # noqa: WPS300
+    CONST_OPERATION,
+    CONST_UNIT_OF_MEASUREMENT,
+    MAX_QUERIES_PER_REQUEST,
+    QUERY_STEP,
+    QUERY_WINDOWS,
+)
+from .data import FlumeData  # noqa: WPS300
+from .devices import sensor_devices  # noqa: WPS300
+from .leak import FlumeLeakList  # noqa: WPS300
+from .pages import ordered_map  # noqa: WPS300
+from .utils import configure_logger, format_time  # noqa: WPS300
+
+try:
+    from zoneinfo import ZoneInfo  # noqa: WPS433
+except ImportError:  # Python < 3.9
+    from backports.zoneinfo import ZoneInfo  # noqa: WPS433,WPS440
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMATS = (FORMAT_NDJSON, FORMAT_CSV, FORMAT_PARQUET)
+
+# Columns of each dataset as (name, type), nested values are JSON strings.
+COLUMN_STRING = "string"
+COLUMN_INT = "int64"
+COLUMN_FLOAT = "float64"
+COLUMN_BOOL = "bool"
+DEVICE_COLUMNS = (
+    ("id", COLUMN_STRING),
+    ("bridge_id", COLUMN_STRING),
+    ("type", COLUMN_INT),
+    ("user_id", COLUMN_INT),
+    ("name", COLUMN_STRING),
+    ("description", COLUMN_STRING),
+    ("location", COLUMN_STRING),
+    ("user", COLUMN_STRING),
+    ("added_datetime", COLUMN_STRING),
+    ("last_seen", COLUMN_STRING),
+    ("registered", COLUMN_BOOL),
+    ("oriented", COLUMN_BOOL),
+)
+USAGE_COLUMNS = (
+    ("device_id", COLUMN_STRING),
+    ("bucket", COLUMN_STRING),
+    ("datetime", COLUMN_STRING),
+    ("value", COLUMN_FLOAT),
+)
+LEAK_COLUMNS = (
+    ("device_id", COLUMN_STRING),
+    ("active", COLUMN_BOOL),
+)
+NOTIFICATION_COLUMNS = (
+    ("id", COLUMN_INT),
+    ("device_id", COLUMN_STRING),
+    ("user_id", COLUMN_INT),
+    ("type", COLUMN_INT),
+    ("title", COLUMN_STRING),
+    ("message", COLUMN_STRING),
+    ("created_datetime", COLUMN_STRING),
+    ("read", COLUMN_BOOL),
+    ("event_rule", COLUMN_STRING),
+    ("extra", COLUMN_STRING),
+)
+USAGE_ALERT_COLUMNS = (
+    ("id", COLUMN_INT),
+    ("device_id", COLUMN_STRING),
+    ("triggered_datetime", COLUMN_STRING),
+    ("flume_leak", COLUMN_BOOL),
+    ("event_rule_name", COLUMN_STRING),
+    ("query", COLUMN_STRING),
+)
+
+
+def _flatten(row):
+    """Encode nested values of a row as JSON strings.
+
+    Args:
+        row: Dict to flatten.
+
+    Returns:
+        Dict of scalar values.
+    """
+    return {
+        key: json.dumps(row_value) if isinstance(row_value, (dict, list)) else row_value
+        for key, row_value in row.items()
+    }
+
+
+class NdjsonWriter:
+    """Write rows as newline delimited JSON."""
+
+    def __init__(self, output):
+        """
+        Initialize the writer.
+
+        Args:
+            output: Text file object.
+        """
+        self._output = output
+
+    def write(self, row):
+        """Write a row.
+
+        Args:
+            row: JSON serialisable dict.
+        """
+        self._output.write(json.dumps(row, separators=(",", ":")))
+        self._output.write("\n")
+
+    def close(self):
+        """Flush the buffered rows."""
+        self._output.flush()
+
+
+class CsvWriter:
+    """Write rows as CSV, the columns are taken from the first row by default."""
+
+    def __init__(self, output, columns=None):
+        """
+        Initialize the writer.
+
+        Args:
+            output: Text file object opened with newline="".
+            columns: (name, type) of each column, defaults to the first row keys.
+        """
+        self._output = output
+        self._fieldnames = [name for name, _ in columns or ()]
+        self._writer = None
+
+    def write(self, row):
+        """Write a row, nested values are written as JSON.
+
+        Missing columns are written empty, and keys that are not columns are
+        not written, so rows of the same dataset may differ in their keys.
+
+        Args:
+            row: Dict to write.
+        """
+        if self._writer is None:
+            self._writer = csv.DictWriter(
+                self._output,
+                fieldnames=self._fieldnames or list(row),
+                extrasaction="ignore",
+            )
+            self._writer.writeheader()
+        self._writer.writerow(_flatten(row))
+
+    def close(self):
+        """Flush the buffered rows."""
+        self._output.flush()
+
+
+class ParquetWriter:
+    """Write rows to a Parquet file in row groups, requires pyarrow."""
+
+    def __init__(self, output, columns=None, batch_size=10000):
+        """
+        Initialize the writer.
+
+        Args:
+            output: Binary file object or path.
+            columns: (name, type) of each column, defaults to the first row group.
+            batch_size: Rows per row group.
+        """
+        import pyarrow.parquet  # noqa: WPS301,WPS433
+
+        self._pyarrow = pyarrow
+        self._output = output
+        self._batch_size = batch_size
+        self._rows = []
+        self._writer = None
+        self._schema = None
+        if columns:
+            self._schema = pyarrow.schema(
+                [
+                    (name, pyarrow.type_for_alias(type_name))
+                    for name, type_name in columns
+                ],
+            )
+
+    def write(self, row):
+        """Write a row, nested values are written as JSON.
+
+        Args:
+            row: Dict to write.
+        """
+        self._rows.append(_flatten(row))
+        if len(self._rows) >= self._batch_size:
+            self._flush()
+
+    def close(self):
+        """Write the buffered rows and the file footer."""
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+    def _flush(self):
+        """Write the buffered rows as a row group.
+
+        Every row group has the schema of the file, keys that are not columns
+        are not written.
+        """
+        if not self._rows:
+            return
+        if self._schema is None:
+            self._schema = self._pyarrow.Table.from_pylist(self._rows).schema
+        table = self._pyarrow.Table.from_pylist(self._rows, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pyarrow.parquet.ParquetWriter(
+                self._output,
+                self._schema,
+            )
+        self._writer.write_table(table)
+        self._rows = []
+
+
+def open_writer(output_format, output, columns=None):
+    """Return the writer of an output format.
+
+    Args:
+        output_format: ndjson, csv or parquet.
+        output: File object, binary for parquet.
+        columns: (name, type) of each CSV and Parquet column, or inferred.
+
+    Returns:
+        Writer with write and close methods.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if output_format == FORMAT_NDJSON:
+        return NdjsonWriter(output)
+    if output_format == FORMAT_CSV:
+        return CsvWriter(output, columns)
+    if output_format == FORMAT_PARQUET:
+        return ParquetWriter(output, columns)
+    raise ValueError("Unknown export format {0}.".format(output_format))
+
+
+def _usage_windows(since, until, bucket, device_tz):
+    """Yield the consecutive query time ranges covering since to until.
+
+    Args:
+        since: Naive local start datetime.
+        until: Naive local end datetime, None for the current minute.
+        bucket: MIN, HR, DAY or MON.
+        device_tz: Time zone of the device.
+
+    Yields:
+        (since, until) datetimes.
+    """
+    if until is None:
+        until = datetime.now(ZoneInfo(device_tz)).replace(
+            tzinfo=None,
+            second=0,
+            microsecond=0,
+        )
+    window = QUERY_WINDOWS[bucket]
+    start = since
+    while start < until:
+        end = min(start + window, until)
+        yield start, end
+        start = end
+
+
+def _usage_requests(flume_datas, since, until, bucket):
+    """Yield the usage queries of devices in batches.
+
+    Args:
+        flume_datas: FlumeData of each device.
+        since: Naive start datetime in the device time zone.
+        until: Naive end datetime, None for the current minute of each device.
+        bucket: MIN, HR, DAY or MON.
+
+    Yields:
+        (flume_data, queries) with up to MAX_QUERIES_PER_REQUEST queries.
+    """
+    for flume_data in flume_datas:
+        queries = [
+            {
+                "request_id": str(index),
+                "bucket": bucket,
+                "since_datetime": format_time(window[0]),
+                "until_datetime": format_time(window[1] - QUERY_STEP),
+                "operation": CONST_OPERATION,
+                "units": CONST_UNIT_OF_MEASUREMENT,
+            }
+            for index, window in enumerate(
+                _usage_windows(since, until, bucket, flume_data.device_tz),
+            )
+        ]
+        yield from (
+            (flume_data, queries[offset : offset + MAX_QUERIES_PER_REQUEST])
+            for offset in range(0, len(queries), MAX_QUERIES_PER_REQUEST)
+        )
+
+
+def _query_usage(request):
+    """Query a batch of usage windows of a device.
+
+    Args:
+        request: (flume_data, queries) from _usage_requests.
+
+    Returns:
+        Usage rows of every query in order.
+    """
+    flume_data, queries = request
+    responses = flume_data.query(queries)
+    LOGGER.debug(
+        "Fetched %s usage windows of device %s from %s",  # noqa: WPS323
+        len(queries),
+        flume_data.device_id,
+        queries[0]["since_datetime"],
+    )
+    return [
+        {
+            "device_id": flume_data.device_id,
+            "bucket": query["bucket"],
+            "datetime": usage_bucket["datetime"],
+            "value": usage_bucket["value"],
+        }
+        for query in queries
+        for usage_bucket in responses.get(query["request_id"], [])
+    ]
+
+
+def iter_usage(  # noqa: WPS211
+    flume_auth,
+    devices,
+    since,
+    until,
+    bucket="HR",
+    workers=2,
+    http_session=None,
+):
+    """Yield usage buckets of sensor devices from since, until excluded.
+
+    The range is split into query windows, sent up to MAX_QUERIES_PER_REQUEST
+    at a time, with requests running concurrently within the API limits.
+
+    Args:
+        flume_auth: Authentication object.
+        devices: Devices in JSON format, only sensors are queried.
+        since: Naive start datetime in the device time zone.
+        until: Naive end datetime in the device time zone, None for now.
+        bucket: MIN, HR, DAY or MON.
+        workers: Number of concurrent requests.
+        http_session: Requests Session()
+
+    Yields:
+        Dicts with device_id, bucket, datetime and value.
+    """
+    flume_datas = [
+        FlumeData(
+            flume_auth,
+            device["id"],
+            device["location"]["tz"],
+            QUERY_WINDOWS[bucket],
+            update_on_init=False,
+            http_session=http_session,
+        )
+        for device in sensor_devices(devices)
+    ]
+    query_requests = _usage_requests(flume_datas, since, until, bucket)
+    for rows in ordered_map(_query_usage, query_requests, workers):
+        yield from rows
+
+
+def iter_leaks(flume_auth, devices, workers=2, http_session=None):
+    """Yield the leak alerts of sensor devices.
+
+    Args:
+        flume_auth: Authentication object.
+        devices: Devices in JSON format, only sensors are queried.
+        workers: Number of concurrent requests.
+        http_session: Requests Session()
+
+    Yields:
+        Leak alerts in JSON format, with the device_id.
+    """
+
+    def get_leaks(device):  # noqa: WPS430
+        leak_list = FlumeLeakList(
+            flume_auth,
+            device["id"],
+            http_session=http_session,
+            update_on_init=False,
+        )
+        return device["id"], leak_list.get_leaks()
+
+    for device_id, leaks in ordered_map(get_leaks, sensor_devices(devices), workers):
+        yield from (dict(leak, device_id=device_id) for leak in leaks)
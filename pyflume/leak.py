@@ -1,15 +1,34 @@
 """Retrieve leak notifications from Flume API."""
 
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional
+
 from requests import Session
 
 from .constants import API_LEAK_URL, DEFAULT_TIMEOUT  # noqa: WPS300
+from .deadline import request_timeout  # noqa: WPS300
+from .pages import (  # noqa: WPS300
+    DEFAULT_WORKERS,
+    PAGE_LIMIT,
+    fetch_offset_pages,
+    take_call,
+)
+from .records import LeakRecord, as_json  # noqa: WPS300
 from .utils import configure_logger, flume_response_error  # noqa: WPS300
 
 # Configure logging
 LOGGER = configure_logger(__name__)
 
 
-class FlumeLeakList:
+class FlumeLeakListState(NamedTuple):
+    """Immutable leak alerts and update time, replaced as a whole."""
+
+    leak_alert_list: List[Any]
+    last_updated: Optional[float]
+
+
+class FlumeLeakList:  # noqa: WPS214
     """Get Flume Flume Leak Notifications from API."""
 
     def __init__(  # noqa: WPS211
@@ -19,6 +38,10 @@ class FlumeLeakList:
         http_session=None,
         timeout=DEFAULT_TIMEOUT,
         read="false",
+        event_stream=None,
+        records=False,
+        update_on_init=True,
+        rate_budget=None,
     ):
         """
 
@@ -30,19 +53,111 @@ class FlumeLeakList:
             http_session: Requests Session()
             timeout: Requests timeout for throttling.
             read: state of leak notification list, have they been read, not read.
+            event_stream: FlumeEventStream notified when leaks appear or clear.
+            records: return LeakRecord objects instead of JSON dicts.
+            update_on_init: fetch the leak alert list on initialization.
+            rate_budget: RateBudget every request is taken from, default none.
 
         """
         self._timeout = timeout
         self._flume_auth = flume_auth
         self._read = read
         self.device_id = device_id
+        self._event_stream = event_stream
+        self._records = records
+        self._rate_budget = rate_budget
 
         if http_session is None:
             self._http_session = Session()
         else:
             self._http_session = http_session
 
-        self.leak_alert_list = self.get_leaks()
+        self._lock = threading.RLock()
+        self.state = FlumeLeakListState(leak_alert_list=[], last_updated=None)
+        if update_on_init:
+            self.update()
+
+    def update(self):
+        """Fetch the leak alert list into leak_alert_list."""
+        with self._lock:
+            self.state = FlumeLeakListState(
+                leak_alert_list=self.get_leaks(),
+                last_updated=time.time(),
+            )
+
+    @property
+    def leak_alert_list(self):
+        """Return the leak alerts of the latest update.
+
+        Returns:
+            List of leak alerts in JSON format, or LeakRecord objects.
+        """
+        return self.state.leak_alert_list
+
+    @leak_alert_list.setter
+    def leak_alert_list(self, leak_alert_list):
+        """Replace the leak alerts.
+
+        Args:
+            leak_alert_list: Leak alerts in JSON format, or records.
+        """
+        self._publish(leak_alert_list=leak_alert_list)
+
+    @property
+    def last_updated(self):
+        """Return the epoch time of the latest update.
+
+        Returns:
+            Epoch seconds, None before the first update.
+        """
+        return self.state.last_updated
+
+    @last_updated.setter
+    def last_updated(self, last_updated):
+        """Replace the epoch time of the latest update.
+
+        Args:
+            last_updated: Epoch seconds.
+        """
+        self._publish(last_updated=last_updated)
+
+    def snapshot(self):
+        """Return the state of the object, see pyflume.snapshot.
+
+        Returns:
+            JSON serialisable state.
+        """
+        state = self.state
+        return {
+            "device_id": self.device_id,
+            "leak_alert_list": [as_json(entry) for entry in state.leak_alert_list],
+            "last_updated": state.last_updated,
+        }
+
+    def restore(self, state):
+        """Restore a state returned by snapshot.
+
+        Args:
+            state: State returned by snapshot.
+
+        Raises:
+            ValueError: If the state belongs to another device.
+        """
+        if state["device_id"] != self.device_id:
+            raise ValueError(
+                "Snapshot of device {0} can't be restored to {1}".format(
+                    state["device_id"],
+                    self.device_id,
+                ),
+            )
+        entries = state["leak_alert_list"]
+        if self._records:
+            entries = [LeakRecord.from_json(entry) for entry in entries]
+        with self._lock:
+            self.state = FlumeLeakListState(
+                leak_alert_list=entries,
+                last_updated=state["last_updated"],
+            )
 
     def get_leaks(self):
         """Return all leak alerts from devices owned by the user.
@@ -50,29 +165,83 @@ class FlumeLeakList:
         Returns:
             Returns JSON list of leak notifications.
         """
+        leaks = self._request_page(0)["data"]
+        return self._decode_leaks(leaks)
+
+    def get_all_leaks(self, workers=DEFAULT_WORKERS):
+        """Return the leak alerts of every page, fetched concurrently.
+
+        The first page gives the total count, the remaining pages are then
+        requested by offset in parallel and merged back in API order.
+
+        Args:
+            workers: Number of concurrent requests.
+
+        Returns:
+            Returns JSON list of leak notifications.
+        """
+        leaks = fetch_offset_pages(
+            self._request_page,
+            workers=workers,
+        )
+        return self._decode_leaks(leaks)
+
+    def _request_page(self, offset):
+        """Return a page of leak alerts without decoding it.
 
+        Args:
+            offset: Index of the first leak alert.
+
+        Returns:
+            Response in JSON format from API.
+        """
         url = API_LEAK_URL.format(
             user_id=self._flume_auth.user_id,
             device_id=self.device_id,
         )
 
         query_string = {
-            "limit": "50",
-            "offset": "0",
+            "limit": str(PAGE_LIMIT),
+            "offset": str(offset),
             "sort_direction": "ASC",
             "read": self._read,
         }
 
+        take_call(self._rate_budget)
         response = self._http_session.request(
             "GET",
             url,
             headers=self._flume_auth.authorization_header,
             params=query_string,
-            timeout=self._timeout,
+            timeout=request_timeout(self._timeout),
         )
 
         LOGGER.debug(f"get_leaks Response: {response.text}")
 
         # Check for response errors.
         flume_response_error("Impossible to retrieve leak alerts", response)
-        return response.json()["data"]
+        return response.json()
+
+    def _decode_leaks(self, leaks):
+        """Convert leak alerts to records and publish them.
+
+        Args:
+            leaks: List of leak alerts in JSON format.
+
+        Returns:
+            Leak alerts in JSON format, or LeakRecord objects.
+        """
+        if self._records:
+            leaks = [LeakRecord.from_json(leak) for leak in leaks]
+        if self._event_stream is not None:
+            self._event_stream.publish_leaks(self.device_id, leaks)
+        return leaks
+
+    def _publish(self, **fields):
+        """Replace fields of state, readers see all of them or none.
+
+        Args:
+            fields: FlumeLeakListState fields to replace.
+        """
+        with self._lock:
+            self.state = self.state._replace(**fields)  # noqa: WPS437
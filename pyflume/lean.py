@@ -0,0 +1,179 @@
+"""Negotiate compression and measure bytes on the wire per request."""
+
+from collections import deque
+import gzip
+import json
+import threading
+from typing import Any, Callable, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from .session import SessionWrapper  # noqa: WPS300
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+ACCEPT_ENCODING = "gzip, deflate"
+COMPRESS_MIN_SIZE = 1024
+# HTTP/1.1 status or request line and the blank line ending the headers.
+_LINE_OVERHEAD = 16
+
+
+class WireUsage(NamedTuple):
+    """Bytes transferred by a single request."""
+
+    method: str
+    url: str
+    status_code: int
+    bytes_sent: int
+    bytes_received: int
+    content_bytes: Optional[int]
+
+
+def _headers_size(headers):
+    """Return the size of headers on the wire.
+
+    Args:
+        headers: Mapping of header names to values.
+
+    Returns:
+        Size in bytes.
+    """
+    return _LINE_OVERHEAD + sum(
+        len(name) + len(str(header_value)) + 4
+        for name, header_value in headers.items()
+    )
+
+
+def _body_size(body):
+    """Return the size of a prepared request body.
+
+    Args:
+        body: bytes, str or None.
+
+    Returns:
+        Size in bytes.
+    """
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return len(body)
+
+
+def _received_sizes(response, stream):
+    """Return the size of a response body on the wire and once decoded.
+
+    Args:
+        response: The response.
+        stream: True if the body has not been read.
+
+    Returns:
+        Tuple of (wire bytes, decoded bytes or None when streamed).
+    """
+    if stream:
+        return int(response.headers.get("Content-Length", 0)), None
+    content_bytes = len(response.content)
+    raw_tell = getattr(response.raw, "tell", None)
+    if raw_tell is None:
+        return content_bytes, content_bytes
+    return raw_tell() or content_bytes, content_bytes
+
+
+class LeanSession(SessionWrapper):
+    """Requests Session wrapper reducing and reporting bandwidth.
+
+    Compressed responses are always requested. JSON request bodies larger than
+    compress_min_size are sent gzip compressed when compress_requests is set,
+    for gateways that accept them. Every call is measured: bytes sent, bytes
+    received before decompression, and decoded content size.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        http_session=None,
+        compress_requests: bool = False,
+        compress_min_size: int = COMPRESS_MIN_SIZE,
+        history: int = 100,
+        on_call: Optional[Callable[[WireUsage], Any]] = None,
+    ) -> None:
+        """
+        Initialize the wrapper.
+
+        Args:
+            http_session: Requests Session() performing the calls.
+            compress_requests: gzip JSON request bodies.
+            compress_min_size: Smallest JSON body in bytes to compress.
+            history: Number of WireUsage entries kept in calls.
+            on_call: Callable receiving the WireUsage of every call.
+        """
+        super().__init__(http_session)
+        self._compress_requests = compress_requests
+        self._compress_min_size = compress_min_size
+        self._on_call = on_call
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=history)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def calls(self) -> List[WireUsage]:
+        """Return the usage of the latest calls, oldest first.
+
+        Returns:
+            List of WireUsage.
+        """
+        with self._lock:
+            return list(self._calls)
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """Perform a request with compression, and measure it.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+        if self._compress_requests and kwargs.get("json") is not None:
+            body = json.dumps(kwargs["json"]).encode("utf-8")
+            if len(body) >= self._compress_min_size:
+                kwargs.pop("json")
+                kwargs["data"] = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+                headers["Content-Type"] = "application/json"
+
+        response = self._http_session.request(method, url, headers=headers, **kwargs)
+        self._record(method, url, response, kwargs.get("stream", False))
+        return response
+
+    def _record(self, method, url, response, stream):
+        """Measure a response and add it to the totals.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            response: The response.
+            stream: True if the body has not been read.
+        """
+        request = response.request
+        body_bytes, content_bytes = _received_sizes(response, stream)
+        usage = WireUsage(
+            method=method.upper(),
+            url=urlsplit(url).path,
+            status_code=response.status_code,
+            bytes_sent=_headers_size(request.headers) + _body_size(request.body),
+            bytes_received=_headers_size(response.headers) + body_bytes,
+            content_bytes=content_bytes,
+        )
+        LOGGER.debug("Wire usage: %s", usage)  # noqa: WPS323
+        with self._lock:
+            self._calls.append(usage)
+            self.bytes_sent += usage.bytes_sent
+            self.bytes_received += usage.bytes_received
+        if self._on_call is not None:
+            self._on_call(usage)
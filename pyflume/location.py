@@ -0,0 +1,260 @@
+"""Aggregate the data of every device of a location in aligned update cycles."""
+
+from datetime import datetime, timezone
+import functools
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from requests import RequestException
+
+from .constants import DEFAULT_TIMEOUT  # noqa: WPS300
+from .data import FlumeData  # noqa: WPS300
+from .devices import FlumeDeviceList, sensor_devices  # noqa: WPS300
+from .pages import DEFAULT_WORKERS, ordered_map  # noqa: WPS300
+from .units import Volumes  # noqa: WPS300
+from .utils import FlumeResponseError, configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+
+class FlumeLocationState(NamedTuple):
+    """Immutable result of an update cycle, replaced as a whole."""
+
+    values: Dict[Any, Volumes]  # noqa: WPS110
+    device_values: Dict[str, Volumes]
+    failed: Tuple[str, ...]
+    until: Optional[datetime]
+    last_updated: Optional[float]
+
+
+def _add_values(totals, device_values):
+    """Add the values of a device to the totals of its location.
+
+    A key stays None until a device reports a value for it.
+
+    Args:
+        totals: Dict of request_id to total, updated in place.
+        device_values: Dict of request_id to value, or None.
+    """
+    for key, device_value in device_values.items():
+        if device_value is None:
+            totals.setdefault(key, None)
+        else:
+            totals[key] = (totals.get(key) or 0) + device_value
+
+
+class FlumeLocationData:  # noqa: WPS214
+    """Total the values of the sensor devices of each location.
+
+    Every update cycle queries the devices concurrently, all ending at the
+    same instant, so the totals of a location add up values of the same
+    period. Devices keep their own FlumeData, which share the API call limits
+    of the account.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        flume_auth,
+        scan_interval,
+        device_list=None,
+        http_session=None,
+        timeout=DEFAULT_TIMEOUT,
+        query_keys=None,
+        workers=DEFAULT_WORKERS,
+        update_on_init=True,
+    ):
+        """
+        Initialize the location object.
+
+        Args:
+            flume_auth: Authentication object.
+            scan_interval: duration of scan, ex: 60 minutes.
+            device_list: FlumeDeviceList with locations, fetched if not given.
+            http_session: Requests Session()
+            timeout: Requests timeout for throttling.
+            query_keys: Only query these request ids, ex: ["today"].
+            workers: Devices updated concurrently.
+            update_on_init: update on initialization.
+        """
+        self._flume_auth = flume_auth
+        self._scan_interval = scan_interval
+        self._http_session = http_session
+        self._timeout = timeout
+        self._query_keys = query_keys
+        self._workers = workers
+        self._lock = threading.Lock()
+        if device_list is None:
+            device_list = FlumeDeviceList(
+                flume_auth,
+                http_session=http_session,
+                timeout=timeout,
+            )
+        self.device_list = device_list
+        self.data = {}  # noqa: WPS110
+        self.locations = {}
+        self.location_devices = {}
+        self.state = FlumeLocationState(
+            values={},
+            device_values={},
+            failed=(),
+            until=None,
+            last_updated=None,
+        )
+        self.sync_devices()
+        if update_on_init:
+            self.update()
+
+    @property
+    def values(self):  # noqa: WPS110
+        """Return the totals of the latest update.
+
+        Returns:
+            Dict of location id to a dict of request_id to total.
+        """
+        return self.state.values
+
+    @property
+    def last_updated(self):
+        """Return the epoch time of the latest update.
+
+        Returns:
+            Epoch seconds, None before the first update.
+        """
+        return self.state.last_updated
+
+    def sync_devices(self):
+        """Group the sensor devices of the device list by location.
+
+        FlumeData objects are created for new devices, kept for the others and
+        dropped for the devices that left the account.
+        """
+        locations = {}
+        location_devices = {}
+        data = {}  # noqa: WPS110
+        for device in sensor_devices(self.device_list.device_list):
+            location = device["location"]
+            locations[location["id"]] = location
+            location_devices.setdefault(location["id"], []).append(device["id"])
+            data[device["id"]] = self._device_data(device)
+        with self._lock:
+            self.data = data  # noqa: WPS110
+            self.locations = locations
+            self.location_devices = location_devices
+
+    def update(self):
+        """Update every device for the same period and total them by location.
+
+        Devices failing to update are listed in failed and left out of the
+        totals, so totals never mix periods.
+        """
+        with self._lock:
+            until = datetime.now(timezone.utc).replace(microsecond=0)
+            device_ids = self._device_ids()
+            device_values = self._update_devices(until, device_ids)
+            self.state = FlumeLocationState(
+                values=self._totals(device_values),
+                device_values=device_values,
+                failed=tuple(
+                    device_id
+                    for device_id in device_ids
+                    if device_id not in device_values
+                ),
+                until=until,
+                last_updated=datetime.now(timezone.utc).timestamp(),
+            )
+
+    def _device_data(self, device):
+        """Return the FlumeData of a device, created for new devices.
+
+        Args:
+            device: JSON dict of a sensor device.
+
+        Returns:
+            FlumeData
+        """
+        flume_data = self.data.get(device["id"])
+        if flume_data is not None:
+            return flume_data
+        return FlumeData(
+            self._flume_auth,
+            device["id"],
+            device["location"]["tz"],
+            self._scan_interval,
+            update_on_init=False,
+            http_session=self._http_session,
+            timeout=self._timeout,
+            query_keys=self._query_keys,
+        )
+
+    def _device_ids(self):
+        """Return the ids of the devices of every location.
+
+        Returns:
+            List of device ids.
+        """
+        return [
+            device_id
+            for location_device_ids in self.location_devices.values()
+            for device_id in location_device_ids
+        ]
+
+    def _update_devices(self, until, device_ids):
+        """Update devices concurrently for the same period.
+
+        Args:
+            until: Time zone aware end of the queries.
+            device_ids: Devices to update.
+
+        Returns:
+            Dict of device id to its values, for the devices updated.
+        """
+        updates = ordered_map(
+            functools.partial(self._update_device, until),
+            device_ids,
+            self._workers,
+        )
+        return {
+            device_id: update_values
+            for device_id, update_values in zip(device_ids, updates)
+            if update_values is not None
+        }
+
+    def _update_device(self, until, device_id):
+        """Update a device, returning None on API errors.
+
+        Args:
+            until: Time zone aware end of the queries.
+            device_id: Device to update.
+
+        Returns:
+            Dict of request_id to value, None if the update failed.
+        """
+        flume_data = self.data[device_id]
+        try:
+            flume_data.update(until)
+        except (FlumeResponseError, RequestException) as error:
+            LOGGER.warning(
+                "Update of device %s failed: %s",  # noqa: WPS323
+                device_id,
+                error,
+            )
+            return None
+        return flume_data.values
+
+    def _totals(self, device_values):
+        """Return the totals of each location.
+
+        Args:
+            device_values: Dict of device id to its values.
+
+        Returns:
+            Dict of location id to a dict of request_id to total.
+        """
+        totals = {}
+        for location_id, device_ids in self.location_devices.items():
+            location_totals = {}
+            for device_id in device_ids:
+                _add_values(location_totals, device_values.get(device_id, {}))
+            totals[location_id] = location_totals
+        return totals
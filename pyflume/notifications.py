@@ -1,6 +1,8 @@
 """Retrieve notifications from Flume API."""
 
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
 
 from requests import Session
 
@@ -9,13 +11,38 @@ from .constants import (  # noqa: WPS300
     API_NOTIFICATIONS_URL,
     DEFAULT_TIMEOUT,
 )
+from .acknowledge import (  # noqa: WPS300
+    ACKNOWLEDGE_BATCH_SIZE,
+    acknowledge,
+    item_ids,
+    mark_read,
+)
+from .deadline import request_timeout  # noqa: WPS300
+from .pages import (  # noqa: WPS300
+    DEFAULT_WORKERS,
+    PAGE_LIMIT,
+    drain,
+    fetch_offset_pages,
+    take_call,
+)
+from .records import NotificationRecord, as_json  # noqa: WPS300
+from .stream import JsonDataStream  # noqa: WPS300
 from .utils import configure_logger, flume_response_error  # noqa: WPS300
 
 # Configure logging
 LOGGER = configure_logger(__name__)
 
 
-class FlumeNotificationList:
+class FlumeNotificationListState(NamedTuple):
+    """Immutable notifications and pagination, replaced as a whole."""
+
+    notification_list: List[Any]
+    has_next: Optional[bool]
+    next_page: Optional[str]
+    last_updated: Optional[float]
+
+
+class FlumeNotificationList:  # noqa: WPS214
     """Get Flume Notifications list from API."""
 
     def __init__(  # noqa: WPS211
@@ -25,6 +52,11 @@ class FlumeNotificationList:
         timeout: int = DEFAULT_TIMEOUT,
         read: str = "false",
         sort_direction: str = "ASC",
+        event_stream=None,
+        records: bool = False,
+        stream: bool = False,
+        update_on_init: bool = True,
+        rate_budget=None,
     ) -> None:
         """
         Initialize the FlumeNotificationList object.
@@ -35,15 +67,149 @@ class FlumeNotificationList:
             timeout: Requests timeout for throttling, default DEFAULT_TIMEOUT.
             read: state of notification list, default "false".
             sort_direction: Which direction to sort notifications on, default "ASC".
+            event_stream: Optional FlumeEventStream notified of new notifications.
+            records: Return NotificationRecord objects instead of JSON dicts.
+            stream: Decode notifications while the response body arrives.
+            update_on_init: Fetch the first page of notifications on initialization.
+            rate_budget: Optional RateBudget every request is taken from.
         """
         self._timeout = timeout
         self._flume_auth = flume_auth
         self._read = read
         self._sort_direction = sort_direction
         self._http_session = http_session or Session()
-        self.has_next = False
-        self.next_page = None
-        self.notification_list = self.get_notifications()
+        self._event_stream = event_stream
+        self._records = records
+        self._stream = stream
+        self._rate_budget = rate_budget
+        self._lock = threading.RLock()
+        self.state = FlumeNotificationListState(
+            notification_list=[],
+            has_next=False,
+            next_page=None,
+            last_updated=None,
+        )
+        if update_on_init:
+            self.update()
+
+    def update(self) -> None:
+        """Fetch the first page of notifications into notification_list."""
+        with self._lock:
+            notifications, (has_next, next_page) = drain(
+                self._iter_notification_request(
+                    API_NOTIFICATIONS_URL.format(user_id=self._flume_auth.user_id),
+                    self._query_string(0),
+                ),
+            )
+            self.state = FlumeNotificationListState(
+                notification_list=notifications,
+                has_next=has_next,
+                next_page=next_page,
+                last_updated=time.time(),
+            )
+
+    @property
+    def notification_list(self) -> List[Any]:
+        """Return the notifications of the latest update.
+
+        Returns:
+            List of notifications in JSON format, or NotificationRecord objects.
+        """
+        return self.state.notification_list
+
+    @notification_list.setter
+    def notification_list(self, notification_list: List[Any]) -> None:
+        """Replace the notifications.
+
+        Args:
+            notification_list: Notifications in JSON format, or records.
+        """
+        self._publish(notification_list=notification_list)
+
+    @property
+    def last_updated(self) -> Optional[float]:
+        """Return the epoch time of the latest update.
+
+        Returns:
+            Epoch seconds, None before the first update.
+        """
+        return self.state.last_updated
+
+    @last_updated.setter
+    def last_updated(self, last_updated: Optional[float]) -> None:
+        """Replace the epoch time of the latest update.
+
+        Args:
+            last_updated: Epoch seconds.
+        """
+        self._publish(last_updated=last_updated)
+
+    @property
+    def has_next(self) -> Optional[bool]:
+        """Return True if a next page is available.
+
+        Returns:
+            Boolean
+        """
+        return self.state.has_next
+
+    @has_next.setter
+    def has_next(self, has_next: Optional[bool]) -> None:
+        """Replace whether a next page is available.
+
+        Args:
+            has_next: Boolean
+        """
+        self._publish(has_next=has_next)
+
+    @property
+    def next_page(self) -> Optional[str]:
+        """Return the path of the next page.
+
+        Returns:
+            Path of the next page, None if there is none.
+        """
+        return self.state.next_page
+
+    @next_page.setter
+    def next_page(self, next_page: Optional[str]) -> None:
+        """Replace the path of the next page.
+
+        Args:
+            next_page: Path of the next page, None if there is none.
+        """
+        self._publish(next_page=next_page)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the state of the object, see pyflume.snapshot.
+
+        Returns:
+            JSON serialisable state.
+        """
+        state = self.state
+        return {
+            "notification_list": [as_json(entry) for entry in state.notification_list],
+            "has_next": state.has_next,
+            "next_page": state.next_page,
+            "last_updated": state.last_updated,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Restore a state returned by snapshot.
+
+        Args:
+            state: State returned by snapshot.
+        """
+        entries = state["notification_list"]
+        if self._records:
+            entries = [NotificationRecord.from_json(entry) for entry in entries]
+        with self._lock:
+            self.state = FlumeNotificationListState(
+                notification_list=entries,
+                has_next=state["has_next"],
+                next_page=state["next_page"],
+                last_updated=state["last_updated"],
+            )
 
     def get_notifications(self) -> Dict[str, Any]:
         """Return all notifications from devices owned by the user.
@@ -53,15 +219,7 @@ class FlumeNotificationList:
         """
 
         api_url = API_NOTIFICATIONS_URL.format(user_id=self._flume_auth.user_id)
-
-        query_string = {
-            "limit": "50",
-            "offset": "0",
-            "sort_direction": self._sort_direction,
-            "read": self._read,
-        }
-
-        return self._get_notification_request(api_url, query_string)
+        return self._get_notification_request(api_url, self._query_string(0))
 
     def get_next_notifications(self):
         """Return next page of notification from devices owned by the user.
@@ -72,13 +230,155 @@ class FlumeNotificationList:
         Raises:
             ValueError: If no next page is available.
         """
-        if self.has_next:
-            api_url = f"{API_BASE_URL}{self.next_page}"
+        state = self.state
+        if state.has_next:
+            api_url = f"{API_BASE_URL}{state.next_page}"
             query_string = {}
         else:
             raise ValueError("No next page available.")
         return self._get_notification_request(api_url, query_string)
 
+    def iter_notifications(self):
+        """Yield notifications of every page, fetching pages as they are consumed.
+
+        Yields:
+            Notifications in JSON format, or NotificationRecord objects.
+        """
+        api_url = API_NOTIFICATIONS_URL.format(user_id=self._flume_auth.user_id)
+        has_next, next_page = yield from self._iter_notification_request(
+            api_url,
+            self._query_string(0),
+        )
+        self._publish(has_next=has_next, next_page=next_page)
+        while has_next:
+            has_next, next_page = yield from self._iter_notification_request(
+                f"{API_BASE_URL}{next_page}",
+                {},
+            )
+            self._publish(has_next=has_next, next_page=next_page)
+
+    def get_all_notifications(self, workers: int = DEFAULT_WORKERS):
+        """Return the notifications of every page, fetched concurrently.
+
+        The first page gives the total count, the remaining pages are then
+        requested by offset in parallel and merged back in API order.
+
+        Args:
+            workers: Number of concurrent requests.
+
+        Returns:
+            List of notifications in JSON format, or NotificationRecord objects.
+        """
+        api_url = API_NOTIFICATIONS_URL.format(user_id=self._flume_auth.user_id)
+        notifications = fetch_offset_pages(
+            lambda offset: self._request_page(api_url, offset),
+            workers=workers,
+        )
+        self._publish(has_next=False, next_page=None)
+        return list(self._decode_notifications(notifications))
+
+    def acknowledge_notifications(
+        self,
+        notifications=None,
+        batch_size=ACKNOWLEDGE_BATCH_SIZE,
+        workers=DEFAULT_WORKERS,
+    ):
+        """Mark notifications as read, in concurrent batches.
+
+        notification_list is updated after every batch: acknowledged notifications are
+        removed when the list holds unread notifications only, and marked read
+        otherwise.
+
+        Args:
+            notifications: Notifications or ids, default unread notification_list.
+            batch_size: Number of notifications acknowledged per batch.
+            workers: Number of concurrent requests.
+
+        Returns:
+            List of acknowledged notification ids.
+        """
+        if notifications is None:
+            notifications = [
+                notification
+                for notification in self.notification_list
+                if not notification.get("read")
+            ]
+        return acknowledge(
+            self._http_session,
+            self._flume_auth,
+            API_NOTIFICATIONS_URL.format(user_id=self._flume_auth.user_id),
+            item_ids(notifications),
+            self._apply_read,
+            timeout=self._timeout,
+            batch_size=batch_size,
+            workers=workers,
+            rate_budget=self._rate_budget,
+        )
+
+    def _apply_read(self, ids):
+        """Update notification_list once notifications have been acknowledged.
+
+        Args:
+            ids: Acknowledged notification ids.
+        """
+        with self._lock:
+            self._publish(
+                notification_list=mark_read(
+                    self.state.notification_list,
+                    ids,
+                    drop=self._read == "false",
+                ),
+            )
+
+    def _publish(self, **fields):
+        """Replace fields of state, readers see all of them or none.
+
+        Args:
+            fields: FlumeNotificationListState fields to replace.
+        """
+        with self._lock:
+            self.state = self.state._replace(**fields)  # noqa: WPS437
+
+    def _query_string(self, offset):
+        """Return the query string of the page at an offset.
+
+        Args:
+            offset (int): Index of the first notification.
+
+        Returns:
+            object: query string options
+        """
+        return {
+            "limit": str(PAGE_LIMIT),
+            "offset": str(offset),
+            "sort_direction": self._sort_direction,
+            "read": self._read,
+        }
+
+    def _request_page(self, api_url, offset):
+        """Return a page of notifications without decoding it.
+
+        Args:
+            api_url (string): URL for request
+            offset (int): Index of the first notification.
+
+        Returns:
+            object: Reponse in JSON format from API.
+        """
+        take_call(self._rate_budget)
+        response = self._http_session.request(
+            "GET",
+            api_url,
+            headers=self._flume_auth.authorization_header,
+            params=self._query_string(offset),
+            timeout=request_timeout(self._timeout),
+        )
+        LOGGER.debug(f"_request_page Response: {response.url}")
+
+        # Check for response errors.
+        flume_response_error("Impossible to retrieve notifications", response)
+        return response.json()
+
     def _has_next_page(self, response_json):
         """Return True if the next page exists.
 
@@ -107,28 +407,80 @@ class FlumeNotificationList:
             object: Reponse in JSON format from API.
         """
 
+        notifications, (has_next, next_page) = drain(
+            self._iter_notification_request(api_url, query_string),
+        )
+        self._publish(has_next=has_next, next_page=next_page)
+        return notifications
+
+    def _iter_notification_request(self, api_url, query_string):
+        """Yield the notifications of a single page from the Flume API.
+
+        Args:
+            api_url (string): URL for request
+            query_string (object): query string options
+
+        Yields:
+            Notifications in JSON format, or NotificationRecord objects.
+
+        Returns:
+            Tuple of has_next and next_page, once the page has been consumed.
+        """
+
+        take_call(self._rate_budget)
         response = self._http_session.request(
             "GET",
             api_url,
             headers=self._flume_auth.authorization_header,
             params=query_string,
-            timeout=self._timeout,
+            timeout=request_timeout(self._timeout),
+            stream=self._stream,
         )
 
-        LOGGER.debug(f"_get_notification_request Response: {response.text}")
+        if self._stream:
+            LOGGER.debug(f"_get_notification_request Streaming: {response.url}")
+        else:
+            LOGGER.debug(f"_get_notification_request Response: {response.text}")
 
         # Check for response errors.
         flume_response_error("Impossible to retrieve notifications", response)
 
+        if self._stream:
+            response_stream = JsonDataStream(response)
+            yield from self._decode_notifications(response_stream)
+            return self._next_page(response_stream.document)
         response_json = response.json()
+        yield from self._decode_notifications(response_json["data"])
+        return self._next_page(response_json)
+
+    def _next_page(self, response_json):
+        """Return has_next and next_page from the response pagination.
+
+        Args:
+            response_json (Object): Response from API, without data when streamed.
+
+        Returns:
+            Tuple of has_next and the path of the next page.
+        """
         if self._has_next_page(response_json):
-            self.next_page = response_json["pagination"]["next"]
-            self.has_next = True
-            LOGGER.debug(
-                f"Next page for Notification results: {self.next_page}",
-            )
-        else:
-            self.has_next = False
-            self.next_page = None
-            LOGGER.debug("No further pages for Notification results.")
-        return response_json["data"]
+            next_page = response_json["pagination"]["next"]
+            LOGGER.debug(f"Next page for Notification results: {next_page}")
+            return True, next_page
+        LOGGER.debug("No further pages for Notification results.")
+        return False, None
+
+    def _decode_notifications(self, notifications):
+        """Convert notifications to records and publish them.
+
+        Args:
+            notifications: Iterable of notifications in JSON format.
+
+        Yields:
+            Notifications in JSON format, or NotificationRecord objects.
+        """
+        for notification in notifications:
+            if self._records:
+                notification = NotificationRecord.from_json(notification)
+            if self._event_stream is not None:
+                self._event_stream.publish_notifications([notification])
+            yield notification
@@ -0,0 +1,137 @@
+"""Fetch paginated endpoints and run requests concurrently in order."""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+PAGE_LIMIT = 50
+DEFAULT_WORKERS = 4
+
+
+def ordered_map(function, arguments, workers):
+    """Apply function to arguments concurrently, yielding results in order.
+
+    At most twice as many arguments as workers are in flight, so memory does
+    not grow with the number of arguments. Workers run in a copy of the caller
+    context, so an active Deadline also bounds their requests.
+
+    Args:
+        function: Callable of one argument.
+        arguments: Iterable of arguments.
+        workers: Number of threads.
+
+    Yields:
+        Results of function, in the order of arguments.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for argument in arguments:
+            pending.append(
+                executor.submit(contextvars.copy_context().run, function, argument),
+            )
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def drain(page_items):
+    """Return the items of a page generator and the value it returns.
+
+    Args:
+        page_items: Generator yielding the items of a page.
+
+    Returns:
+        Tuple of the list of items and the return value of the generator.
+    """
+    entries = []
+    while True:
+        try:
+            entries.append(next(page_items))
+        except StopIteration as stop:
+            return entries, stop.value
+
+
+def _has_next_page(response_json):
+    """Return True if the response links to a next page.
+
+    Args:
+        response_json: Page returned by the API.
+
+    Returns:
+        Boolean
+    """
+    pagination = response_json.get("pagination")
+    return pagination is not None and pagination.get("next") is not None
+
+
+def _follow_pages(request_page, page, step):
+    """Return the items of the pages after a page, requested one after another.
+
+    Args:
+        request_page: Callable returning the page JSON at an offset.
+        page: Page the following ones are linked from.
+        step: Number of items per page.
+
+    Returns:
+        List of items in JSON format, in API order.
+    """
+    entries = []
+    offset = step
+    while _has_next_page(page) and page["data"]:
+        page = request_page(offset)
+        entries.extend(page["data"])
+        offset += step
+    return entries
+
+
+def take_call(rate_budget):
+    """Take a call from a RateBudget before a request, if one is given.
+
+    Args:
+        rate_budget: RateBudget, or None to send requests without limits.
+    """
+    if rate_budget is not None:
+        rate_budget.acquire()
+
+
+def fetch_offset_pages(
+    request_page,
+    workers=DEFAULT_WORKERS,
+    limit=PAGE_LIMIT,
+):
+    """Return the items of every page of an offset paginated endpoint.
+
+    The first page gives the total count, then the remaining offset windows
+    are fetched concurrently and merged back in order. Without a count, pages
+    are followed one after another.
+
+    Args:
+        request_page: Callable returning the page JSON at an offset.
+        workers: Number of concurrent requests.
+        limit: Requested page size.
+
+    Returns:
+        List of items in JSON format, in API order.
+    """
+    first_page = request_page(0)
+    entries = list(first_page["data"])
+    # The API may return fewer items than requested per page.
+    step = len(entries) or limit
+    if first_page.get("count") is None:
+        return entries + _follow_pages(request_page, first_page, step)
+
+    offsets = range(step, first_page["count"], step)
+    LOGGER.debug(
+        "Fetching %s more pages of %s items",  # noqa: WPS323
+        len(offsets),
+        step,
+    )
+    for page in ordered_map(request_page, offsets, workers):
+        entries.extend(page["data"])
+    return entries
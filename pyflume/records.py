@@ -0,0 +1,191 @@
+"""Compact record types for items returned by the Flume API."""
+
+import sys
+from typing import Any, Dict
+
+from .utils import parse_timestamp  # noqa: WPS300
+
+
+def as_json(entry: Any) -> Dict[str, Any]:
+    """Return the JSON dict of an API item or record.
+
+    Args:
+        entry: JSON dict or FlumeRecord.
+
+    Returns:
+        JSON dict.
+    """
+    if isinstance(entry, FlumeRecord):
+        return entry.as_dict()
+    return entry
+
+
+class FlumeRecord:
+    """Slotted replacement for an API JSON object.
+
+    Known fields are stored in slots, timestamps are parsed once to epoch
+    seconds and enum-like strings are interned. Fields the record does not
+    know about are kept in `unmapped`. Records support item access, so code
+    written against the raw JSON dicts keeps working.
+    """
+
+    __slots__ = ("unmapped",)
+
+    fields = ()
+    timestamp_fields = ()
+    interned_fields = ()
+
+    @classmethod
+    def from_json(cls, json_object: Dict[str, Any]) -> "FlumeRecord":
+        """Build a record from an API JSON object.
+
+        Args:
+            json_object: JSON object returned by the API.
+
+        Returns:
+            The record.
+        """
+        record = cls.__new__(cls)
+        for field in cls.fields:
+            field_value = json_object.get(field)
+            if field in cls.timestamp_fields:
+                field_value = parse_timestamp(field_value)
+            elif field in cls.interned_fields and isinstance(field_value, str):
+                field_value = sys.intern(field_value)
+            setattr(record, field, field_value)
+        unmapped_keys = json_object.keys() - set(cls.fields)
+        unmapped = {key: json_object[key] for key in unmapped_keys}
+        record.unmapped = unmapped or None
+        return record
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the record as a dict, with timestamps as epoch seconds.
+
+        Returns:
+            Dict of all fields.
+        """
+        record_dict = {field: getattr(self, field) for field in self.fields}
+        if self.unmapped:
+            record_dict.update(self.unmapped)
+        return record_dict
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field like dict.get.
+
+        Args:
+            key: Field name.
+            default: Value returned when the field is missing.
+
+        Returns:
+            Field value or default.
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field like a dict.
+
+        Args:
+            key: Field name.
+
+        Returns:
+            Field value.
+
+        Raises:
+            KeyError: If the field does not exist.
+        """
+        if key in self.fields:
+            return getattr(self, key)
+        if self.unmapped and key in self.unmapped:
+            return self.unmapped[key]
+        raise KeyError(key)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare records of the same type field by field.
+
+        Args:
+            other: Object to compare with.
+
+        Returns:
+            True if both records hold the same fields.
+        """
+        if type(other) is not type(self):  # noqa: WPS516
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        """Return the representation of the record.
+
+        Returns:
+            Class name and fields.
+        """
+        return "{0}({1})".format(type(self).__name__, self.as_dict())
+
+
+class LeakRecord(FlumeRecord):
+    """Active leak of a device."""
+
+    fields = ("id", "device_id", "active", "created_datetime", "updated_datetime")
+    timestamp_fields = ("created_datetime", "updated_datetime")
+    interned_fields = ("device_id",)
+    __slots__ = fields
+
+
+class NotificationRecord(FlumeRecord):
+    """Notification sent to the user."""
+
+    fields = (
+        "id",
+        "device_id",
+        "user_id",
+        "type",
+        "message",
+        "created_datetime",
+        "title",
+        "read",
+        "extra",
+        "event_rule",
+    )
+    timestamp_fields = ("created_datetime",)
+    interned_fields = ("device_id", "title", "event_rule")
+    __slots__ = fields
+
+
+class UsageAlertRecord(FlumeRecord):
+    """Usage alert triggered by a device."""
+
+    fields = (
+        "id",
+        "device_id",
+        "triggered_datetime",
+        "flume_leak",
+        "query",
+        "event_rule_name",
+    )
+    timestamp_fields = ("triggered_datetime",)
+    interned_fields = ("device_id", "event_rule_name")
+    __slots__ = fields
+
+
+class DeviceRecord(FlumeRecord):
+    """Flume device or bridge."""
+
+    fields = (
+        "id",
+        "type",
+        "user_id",
+        "bridge_id",
+        "name",
+        "description",
+        "registered",
+        "oriented",
+        "added_datetime",
+        "last_seen",
+        "location",
+        "user",
+    )
+    timestamp_fields = ("added_datetime", "last_seen")
+    interned_fields = ("bridge_id",)
+    __slots__ = fields
@@ -0,0 +1,352 @@
+"""Serve cached Flume data to local clients over HTTP or a Unix socket."""
+
+from datetime import datetime, timedelta
+from http import HTTPStatus, server as http_server
+import json
+import os
+import socketserver
+import threading
+import zlib
+
+from requests import RequestException
+
+from . import (  # noqa: WPS300
+    FlumeData,
+    FlumeLeakList,
+    FlumeNotificationList,
+    FlumeUsageAlertList,
+)
+from .devices import FlumeDeviceList, sensor_devices  # noqa: WPS300
+from .records import as_json  # noqa: WPS300
+from .utils import FlumeResponseError, configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+DEFAULT_SCAN_INTERVAL = timedelta(minutes=1)
+DEFAULT_LIST_INTERVAL = timedelta(minutes=5)
+
+
+class FlumeCache:  # noqa: WPS214, WPS230
+    """Poll the Flume API and keep the latest responses as JSON documents.
+
+    Documents are serialised once per refresh, so serving them costs the same
+    whatever the number of clients.
+    """
+
+    def __init__(
+        self,
+        flume_auth,
+        http_session=None,
+        scan_interval=DEFAULT_SCAN_INTERVAL,
+        list_interval=DEFAULT_LIST_INTERVAL,
+    ):
+        """
+        Initialize the cache, nothing is fetched until refresh.
+
+        Args:
+            flume_auth: Authentication object.
+            http_session: Requests Session()
+            scan_interval: Interval between FlumeData updates.
+            list_interval: Interval between device, leak and alert list updates.
+        """
+        self._flume_auth = flume_auth
+        self._http_session = http_session
+        self.scan_interval = scan_interval
+        self.list_interval = list_interval
+        self._lock = threading.Lock()
+        self._documents = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.device_list = FlumeDeviceList(
+            flume_auth,
+            http_session=http_session,
+            update_on_init=False,
+        )
+        self.notification_list = FlumeNotificationList(
+            flume_auth,
+            http_session=http_session,
+            update_on_init=False,
+        )
+        self.usage_alert_list = FlumeUsageAlertList(
+            flume_auth,
+            http_session=http_session,
+            update_on_init=False,
+        )
+        self.data = {}  # noqa: WPS110
+        self.leak_lists = {}
+
+    def get(self, path):
+        """Return the cached document of a path.
+
+        Args:
+            path: Request path, ex: /devices/<device_id>/values.
+
+        Returns:
+            Tuple of (JSON bytes, ETag), None if the path is not cached.
+        """
+        with self._lock:
+            return self._documents.get(path.rstrip("/") or "/")
+
+    def refresh(self):
+        """Update the objects that are older than their interval."""
+        now = datetime.now().timestamp()
+        if self._is_stale(self.device_list, self.list_interval, now):
+            self._update(self.device_list)
+            self._sync_devices()
+        for flume_list in (self.notification_list, self.usage_alert_list):
+            if self._is_stale(flume_list, self.list_interval, now):
+                self._update(flume_list)
+        for leak_list in list(self.leak_lists.values()):
+            if self._is_stale(leak_list, self.list_interval, now):
+                self._update(leak_list)
+        for flume_data in list(self.data.values()):
+            if self._is_stale(flume_data, self.scan_interval, now):
+                self._update(flume_data)
+        self._publish()
+
+    def start(self):
+        """Refresh the cache in a background thread until stop is called."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._poll,
+            name="pyflume-cache",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self):
+        """Refresh the cache until stopped."""
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(
+                min(self.scan_interval, self.list_interval).total_seconds(),
+            )
+
+    def _is_stale(self, flume_object, interval, now):
+        """Return True if an object must be updated.
+
+        Args:
+            flume_object: Object with a last_updated attribute.
+            interval: Maximum age as timedelta.
+            now: Current epoch time.
+
+        Returns:
+            Boolean
+        """
+        if flume_object.last_updated is None:
+            return True
+        return now - flume_object.last_updated >= interval.total_seconds()
+
+    def _update(self, flume_object):
+        """Update an object, keeping its previous state on API errors.
+
+        Args:
+            flume_object: Object with an update method.
+        """
+        try:
+            flume_object.update()
+        except (FlumeResponseError, RequestException) as error:
+            LOGGER.warning(
+                "Update of %s failed: %s",  # noqa: WPS323
+                type(flume_object).__name__,
+                error,
+            )
+
+    def _sync_devices(self):
+        """Match the data and leak objects to the current sensor devices.
+
+        Objects of devices still listed are kept, new devices get new objects
+        and removed devices are dropped, so they are no longer served.
+        """
+        data = {}  # noqa: WPS110
+        leak_lists = {}
+        for device in sensor_devices(self.device_list.device_list):
+            device_id = device["id"]
+            flume_data = self.data.get(device_id)
+            if flume_data is not None:
+                data[device_id] = flume_data
+                leak_lists[device_id] = self.leak_lists[device_id]
+                continue
+            data[device_id] = FlumeData(
+                self._flume_auth,
+                device_id,
+                device["location"]["tz"],
+                self.scan_interval,
+                update_on_init=False,
+                http_session=self._http_session,
+            )
+            leak_lists[device_id] = FlumeLeakList(
+                self._flume_auth,
+                device_id,
+                http_session=self._http_session,
+                update_on_init=False,
+            )
+        self.data = data  # noqa: WPS110
+        self.leak_lists = leak_lists
+
+    def _publish(self):
+        """Serialise the latest state of every object."""
+        documents = {
+            "/devices": self._document(
+                self.device_list.device_list,
+                self.device_list.last_updated,
+            ),
+            "/notifications": self._document(
+                self.notification_list.notification_list,
+                self.notification_list.last_updated,
+            ),
+            "/usage-alerts": self._document(
+                self.usage_alert_list.usage_alert_list,
+                self.usage_alert_list.last_updated,
+            ),
+        }
+        for device_id, flume_data in self.data.items():
+            documents["/devices/{0}/values".format(device_id)] = self._document(
+                flume_data.values,
+                flume_data.last_updated,
+            )
+            leak_list = self.leak_lists[device_id]
+            documents["/devices/{0}/leaks".format(device_id)] = self._document(
+                leak_list.leak_alert_list,
+                leak_list.last_updated,
+            )
+        with self._lock:
+            self._documents = documents
+
+    def _document(self, payload, last_updated):
+        """Return the serialised document of a cached value.
+
+        Args:
+            payload: JSON serialisable value or list of records.
+            last_updated: Epoch time the value was fetched.
+
+        Returns:
+            Tuple of (JSON bytes, ETag).
+        """
+        if isinstance(payload, list):
+            payload = [as_json(entry) for entry in payload]
+        body = json.dumps(
+            {"data": payload, "last_updated": last_updated},
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return body, '"{0:08x}"'.format(zlib.crc32(body))
+
+
+class FlumeRequestHandler(http_server.BaseHTTPRequestHandler):
+    """Answer GET requests from the FlumeCache of the server."""
+
+    server_version = "pyflume"
+
+    def do_GET(self):  # noqa: N802
+        """Send the cached document of the path."""
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._send(HTTPStatus.OK, b'{"status":"ok"}')
+            return
+        cached = self.server.cache.get(path)
+        if cached is None:
+            self._send(HTTPStatus.NOT_FOUND, b'{"message":"Not found"}')
+            return
+        body, etag = cached
+        if self.headers.get("If-None-Match") == etag:
+            self._send(HTTPStatus.NOT_MODIFIED, b"", etag)
+            return
+        self._send(HTTPStatus.OK, body, etag)
+
+    def log_message(self, format, *args):  # noqa: A002,WPS125
+        """Log requests at debug level.
+
+        Args:
+            format: Message format.
+            args: Message arguments.
+        """
+        LOGGER.debug(format, *args)
+
+    def address_string(self):
+        """Return the client address, Unix socket clients have none.
+
+        Returns:
+            Address string.
+        """
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def _send(self, status, body, etag=None):
+        """Send a JSON response.
+
+        Args:
+            status: HTTP status.
+            body: JSON bytes.
+            etag: ETag of the body.
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server listening on a Unix socket."""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        """Bind the socket, replacing a stale socket file."""
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+
+def create_server(cache, host="127.0.0.1", port=8080, socket_path=None):
+    """Return an HTTP server answering from a cache.
+
+    Args:
+        cache: FlumeCache serving the documents.
+        host: Address to listen on.
+        port: TCP port to listen on, 0 picks a free port.
+        socket_path: Listen on this Unix socket instead of TCP.
+
+    Returns:
+        socketserver.BaseServer, stop it with shutdown.
+    """
+    if socket_path is not None:
+        server = _UnixHTTPServer(socket_path, FlumeRequestHandler)
+    else:
+        server = http_server.ThreadingHTTPServer((host, port), FlumeRequestHandler)
+    server.cache = cache
+    return server
+
+
+def serve(cache, host="127.0.0.1", port=8080, socket_path=None):
+    """Refresh the cache and serve it until interrupted.
+
+    Args:
+        cache: FlumeCache serving the documents.
+        host: Address to listen on.
+        port: TCP port to listen on.
+        socket_path: Listen on this Unix socket instead of TCP.
+    """
+    server = create_server(cache, host, port, socket_path)
+    cache.start()
+    LOGGER.info("Serving Flume data on %s", socket_path or (host, port))  # noqa: WPS323
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        LOGGER.info("Stopping server")
+    finally:
+        cache.stop()
+        server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
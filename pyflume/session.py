@@ -0,0 +1,73 @@
+"""Base class for wrappers around a Requests Session."""
+
+from typing import Any
+
+from requests import Session
+
+
+class SessionWrapper:
+    """Session-like object delegating requests to a wrapped session.
+
+    Subclasses override `request`; `get`, `post` and `close` are provided so
+    wrappers can be passed as `http_session` to every pyflume class and can
+    wrap each other.
+    """
+
+    def __init__(self, http_session=None) -> None:
+        """
+        Initialize the wrapper.
+
+        Args:
+            http_session: Requests Session() or wrapper performing the calls.
+        """
+        self._http_session = http_session or Session()
+
+    @property
+    def coalesces(self) -> bool:
+        """Return True if a wrapped session coalesces identical requests.
+
+        Returns:
+            Boolean
+        """
+        return getattr(self._http_session, "coalesces", False)
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        """Perform a request with the wrapped session.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response.
+        """
+        return self._http_session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any):
+        """Perform a GET request.
+
+        Args:
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any):
+        """Perform a POST request.
+
+        Args:
+            url: Request URL.
+            kwargs: Arguments of requests.Session.request.
+
+        Returns:
+            The response.
+        """
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Close the wrapped session."""
+        self._http_session.close()
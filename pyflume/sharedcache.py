@@ -0,0 +1,271 @@
+"""Share fetched state between worker processes through a SQLite file."""
+
+from contextlib import ExitStack, contextmanager
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, NamedTuple, Optional
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+DEFAULT_MAX_AGE = 60
+DEFAULT_LEASE = 30
+POLL_INTERVAL = 0.1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+class SharedResult(NamedTuple):
+    """State stored in the shared cache."""
+
+    state: Any
+    updated: float
+
+    @property
+    def age(self) -> float:
+        """Return the age of the state in seconds.
+
+        Returns:
+            Seconds since the state was stored.
+        """
+        return time.time() - self.updated
+
+
+class FlumeSharedCache:  # noqa: WPS214
+    """Cross-process cache of object snapshots in a WAL mode SQLite file.
+
+    Readers never take a lock: WAL lets them read while a writer commits.
+    Refreshing a key requires a lease, so a single process at a time calls
+    the API for it while the others keep reading the previous state.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age: float = DEFAULT_MAX_AGE,
+        lease: float = DEFAULT_LEASE,
+    ) -> None:
+        """
+        Open or create the cache.
+
+        Args:
+            path: SQLite database file shared by the processes.
+            max_age: Age in seconds after which a reader refreshes the state.
+            lease: Seconds a process holds the refresh of a key before another takes it.
+        """
+        self._path = path
+        self.max_age = max_age
+        self.lease = lease
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[SharedResult]:
+        """Return the state stored for a key.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            SharedResult, None if nothing is stored.
+        """
+        row = self._connection().execute(
+            "SELECT state, updated FROM results WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return SharedResult(json.loads(row[0]), row[1])
+
+    def put(self, key: str, state: Any) -> None:
+        """Store the state of a key.
+
+        Args:
+            key: Cache key.
+            state: JSON serialisable state.
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO results (key, state, updated) VALUES (?, ?, ?)",
+                (key, json.dumps(state, separators=(",", ":")), time.time()),
+            )
+
+    def acquire(self, key: str) -> bool:
+        """Take the refresh lease of a key.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            True if this thread holds the lease.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT owner, expires FROM leases WHERE key = ?",
+                (key,),
+            ).fetchone()
+            held = row is not None and row[0] != self._owner()
+            if held and row[1] > now:
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO leases (key, owner, expires) VALUES (?, ?, ?)",
+                (key, self._owner(), now + self.lease),
+            )
+        return True
+
+    def release(self, key: str) -> None:
+        """Give back the refresh lease of a key.
+
+        Args:
+            key: Cache key.
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?",
+                (key, self._owner()),
+            )
+
+    def sync(self, key: str, flume_object, update) -> bool:
+        """Restore an object from the cache, refreshing the state when too old.
+
+        Fresh state is restored without calling the API. Otherwise the process
+        taking the lease calls update and stores the snapshot of the object,
+        while the others restore the previous state, or wait up to the lease
+        for the first one.
+
+        Args:
+            key: Cache key.
+            flume_object: Object with snapshot and restore methods.
+            update: Callable refreshing flume_object from the API.
+
+        Returns:
+            True if update was called.
+        """
+        cached = self.get(key)
+        if cached is not None and cached.age <= self.max_age:
+            flume_object.restore(cached.state)
+            return False
+
+        if self.acquire(key):
+            with ExitStack() as lease:
+                lease.callback(self.release, key)
+                update()
+                self.put(key, flume_object.snapshot())
+            return True
+
+        if cached is None:
+            cached = self._wait(key)
+        if cached is None:
+            LOGGER.debug("No shared state for %s, updating", key)  # noqa: WPS323
+            update()
+            return True
+        flume_object.restore(cached.state)
+        return False
+
+    def close(self) -> None:
+        """Close the database connections of every thread."""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def __enter__(self) -> "FlumeSharedCache":
+        """Return the cache for use in a with statement.
+
+        Returns:
+            The cache.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the cache.
+
+        Args:
+            exc_info: Exception information.
+        """
+        self.close()
+
+    def _wait(self, key):
+        """Wait for another process to store the state of a key.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            SharedResult, None if nothing was stored within the lease.
+        """
+        deadline = time.monotonic() + self.lease
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+    def _owner(self):
+        """Return the lease owner name of the current thread.
+
+        Returns:
+            Process and thread id.
+        """
+        return "{0}:{1}".format(os.getpid(), threading.get_ident())
+
+    def _connection(self):
+        """Return the database connection of the current thread.
+
+        Returns:
+            sqlite3.Connection in autocommit mode.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path,
+                timeout=self.lease,
+                isolation_level=None,
+                # Used by this thread only, but closed from any thread.
+                check_same_thread=False,
+            )
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Run a write transaction, writers are serialised, readers are not blocked.
+
+        Yields:
+            The connection of the current thread.
+
+        Raises:
+            BaseException: Any error of the transaction, after the rollback.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:  # noqa: B902, WPS424
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
@@ -0,0 +1,112 @@
+"""Save and restore client state for warm restarts."""
+
+import gzip
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(path: str, objects: Dict[str, Any]) -> None:  # noqa: WPS110
+    """Write the state of pyflume objects to a compressed snapshot file.
+
+    The file is replaced atomically, so a crash while saving keeps the
+    previous snapshot.
+
+    Args:
+        path: Snapshot file.
+        objects: Objects with a snapshot method, ex: FlumeData, keyed by a stable name.
+    """
+    document = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time(),
+        "objects": {
+            name: flume_object.snapshot() for name, flume_object in objects.items()
+        },
+    }
+    temporary_path = "{0}.tmp".format(path)
+    with gzip.open(temporary_path, "wt", encoding="utf-8") as snapshot_file:
+        json.dump(document, snapshot_file, separators=(",", ":"))
+    os.replace(temporary_path, path)
+
+
+def load_snapshot(
+    path: str,
+    objects: Dict[str, Any],  # noqa: WPS110
+    max_age: Optional[float] = None,
+) -> Dict[str, Optional[float]]:
+    """Restore the state of pyflume objects from a snapshot file.
+
+    Objects missing from the snapshot, or whose state is older than
+    `max_age`, are left untouched. A missing or unreadable file restores
+    nothing.
+
+    Args:
+        path: Snapshot file.
+        objects: Objects with a restore method, keyed by the names used to save.
+        max_age: Maximum age in seconds of the restored state.
+
+    Returns:
+        Age in seconds of the restored state of each object, None for objects
+        that were not restored. Callers refresh the stale ones, ex: in a
+        background thread, while serving the restored values.
+    """
+    document = _read_document(path)
+    if document is None:
+        return dict.fromkeys(objects)
+
+    states = document.get("objects", {})
+    return {
+        name: _restore(flume_object, states.get(name), document["saved_at"], max_age)
+        for name, flume_object in objects.items()
+    }
+
+
+def _read_document(path):
+    """Read the document of a snapshot file.
+
+    Args:
+        path: Snapshot file.
+
+    Returns:
+        Snapshot dict, None if the file is missing, unreadable or of another
+        version.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as snapshot_file:
+            document = json.load(snapshot_file)
+    except (OSError, EOFError, ValueError) as error:
+        LOGGER.debug("No snapshot restored from %s: %s", path, error)  # noqa: WPS323
+        return None
+    if not isinstance(document, dict) or document.get("version") != SNAPSHOT_VERSION:
+        LOGGER.debug("Ignoring snapshot %s of another version", path)  # noqa: WPS323
+        return None
+    return document
+
+
+def _restore(flume_object, state, saved_at, max_age):
+    """Restore the state of an object unless it is missing or too old.
+
+    Args:
+        flume_object: Object with a restore method.
+        state: Saved state of the object, None if it was not saved.
+        saved_at: Epoch seconds the snapshot was saved at.
+        max_age: Maximum age in seconds of the restored state.
+
+    Returns:
+        Age in seconds of the restored state, None if it was not restored.
+    """
+    if state is None:
+        return None
+    age = time.time() - (state.get("last_updated") or saved_at)
+    if max_age is not None and age > max_age:
+        return None
+    flume_object.restore(state)
+    return age
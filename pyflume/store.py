@@ -0,0 +1,348 @@
+"""Store notifications and usage alerts locally in SQLite."""
+
+from datetime import datetime, timezone
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from .records import NotificationRecord, UsageAlertRecord, as_json  # noqa: WPS300
+from .utils import configure_logger, parse_timestamp  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+SYNC_BATCH_SIZE = 500
+API_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"  # noqa: WPS323
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY,
+    device_id TEXT,
+    type INTEGER,
+    created INTEGER,
+    read INTEGER,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notifications_device
+    ON notifications (device_id, created);
+CREATE INDEX IF NOT EXISTS notifications_type ON notifications (type, created);
+CREATE INDEX IF NOT EXISTS notifications_created ON notifications (created);
+CREATE TABLE IF NOT EXISTS usage_alerts (
+    id INTEGER PRIMARY KEY,
+    device_id TEXT,
+    type TEXT,
+    created INTEGER,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_alerts_device ON usage_alerts (device_id, created);
+CREATE INDEX IF NOT EXISTS usage_alerts_type ON usage_alerts (type, created);
+CREATE INDEX IF NOT EXISTS usage_alerts_created ON usage_alerts (created);
+"""
+
+
+def _as_epoch(timestamp):
+    """Convert a query bound to epoch seconds.
+
+    Args:
+        timestamp: datetime, epoch seconds or None.
+
+    Returns:
+        Epoch seconds or None.
+    """
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    return timestamp
+
+
+def _api_timestamp(timestamp):
+    """Format a timestamp like the API, ex: 2020-01-15T16:33:39.000Z.
+
+    Args:
+        timestamp: API string, epoch seconds, datetime or None.
+
+    Returns:
+        API timestamp string, or the timestamp unchanged if it is not a time.
+    """
+    if isinstance(timestamp, int):
+        timestamp = datetime.fromtimestamp(timestamp, timezone.utc)
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.astimezone(timezone.utc).strftime(API_TIMESTAMP_FORMAT)
+    return timestamp
+
+
+def _body(entry, timestamp_fields):
+    """Return the JSON body of an item, with timestamps formatted like the API.
+
+    Records and JSON dicts of the same item get the same body.
+
+    Args:
+        entry: JSON dict or FlumeRecord.
+        timestamp_fields: Names of the timestamp fields.
+
+    Returns:
+        JSON dict.
+    """
+    body = dict(as_json(entry))
+    for field in body.keys() & set(timestamp_fields):
+        body[field] = _api_timestamp(body[field])
+    return body
+
+
+def _where_clauses(filters, since, until):
+    """Return the WHERE clauses of a query and their arguments.
+
+    Args:
+        filters: Column equality filters, None values are ignored.
+        since: Lower created bound, inclusive.
+        until: Upper created bound, exclusive.
+
+    Returns:
+        Tuple of the list of clauses and the list of their arguments.
+    """
+    clauses = []
+    query_args = []
+    for column, column_value in filters.items():
+        if column_value is not None:
+            clauses.append("{0} = ?".format(column))
+            query_args.append(column_value)
+    if since is not None:
+        clauses.append("created >= ?")
+        query_args.append(_as_epoch(since))
+    if until is not None:
+        clauses.append("created < ?")
+        query_args.append(_as_epoch(until))
+    return clauses, query_args
+
+
+class FlumeAlertStore:  # noqa: WPS214
+    """Indexed local store of notifications and usage alerts."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """
+        Open or create the store.
+
+        Args:
+            path: SQLite database file, kept across restarts. In memory by default.
+        """
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "FlumeAlertStore":
+        """Return the store for use in a with statement.
+
+        Returns:
+            The store.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the store when leaving a with statement.
+
+        Args:
+            exc_info: Exception details, ignored.
+        """
+        self.close()
+
+    def add_notifications(self, notifications: Iterable[Any]) -> int:
+        """Insert or update notifications.
+
+        Args:
+            notifications: Notifications as JSON dicts or NotificationRecord objects.
+
+        Returns:
+            Number of notifications written.
+        """
+        rows = []
+        for entry in notifications:
+            notification = _body(entry, NotificationRecord.timestamp_fields)
+            rows.append(
+                (
+                    notification["id"],
+                    notification.get("device_id"),
+                    notification.get("type"),
+                    parse_timestamp(notification.get("created_datetime")),
+                    notification.get("read"),
+                    json.dumps(notification),
+                ),
+            )
+        return self._write(
+            "INSERT OR REPLACE INTO notifications VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def add_usage_alerts(self, usage_alerts: Iterable[Any]) -> int:
+        """Insert or update usage alerts.
+
+        Args:
+            usage_alerts: Usage alerts as JSON dicts or UsageAlertRecord objects.
+
+        Returns:
+            Number of usage alerts written.
+        """
+        rows = []
+        for entry in usage_alerts:
+            usage_alert = _body(entry, UsageAlertRecord.timestamp_fields)
+            rows.append(
+                (
+                    usage_alert["id"],
+                    usage_alert.get("device_id"),
+                    usage_alert.get("event_rule_name"),
+                    parse_timestamp(usage_alert.get("triggered_datetime")),
+                    json.dumps(usage_alert),
+                ),
+            )
+        return self._write(
+            "INSERT OR REPLACE INTO usage_alerts VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def sync_notifications(self, notification_list) -> int:
+        """Page through a FlumeNotificationList and store every notification.
+
+        Args:
+            notification_list: FlumeNotificationList to read from.
+
+        Returns:
+            Number of notifications written.
+        """
+        return self._sync(
+            notification_list.iter_notifications(),
+            self.add_notifications,
+        )
+
+    def sync_usage_alerts(self, usage_alert_list) -> int:
+        """Page through a FlumeUsageAlertList and store every usage alert.
+
+        Args:
+            usage_alert_list: FlumeUsageAlertList to read from.
+
+        Returns:
+            Number of usage alerts written.
+        """
+        return self._sync(
+            usage_alert_list.iter_usage_alerts(),
+            self.add_usage_alerts,
+        )
+
+    def query_notifications(  # noqa: WPS211
+        self,
+        device_id: Optional[str] = None,
+        notification_type: Optional[int] = None,
+        since=None,
+        until=None,
+        read: Optional[bool] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return stored notifications matching every given filter.
+
+        Args:
+            device_id: Only notifications of this device.
+            notification_type: Only notifications of this type.
+            since: Only notifications created at or after, datetime or epoch.
+            until: Only notifications created before, datetime or epoch.
+            read: Only read or unread notifications.
+            limit: Maximum number of notifications.
+
+        Returns:
+            Notifications in JSON format, oldest first.
+        """
+        filters = {"device_id": device_id, "type": notification_type, "read": read}
+        return self._query("notifications", filters, since, until, limit)
+
+    def query_usage_alerts(  # noqa: WPS211
+        self,
+        device_id: Optional[str] = None,
+        event_rule_name: Optional[str] = None,
+        since=None,
+        until=None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return stored usage alerts matching every given filter.
+
+        Args:
+            device_id: Only usage alerts of this device.
+            event_rule_name: Only usage alerts of this rule, ex: High Flow Alert.
+            since: Only usage alerts triggered at or after, datetime or epoch.
+            until: Only usage alerts triggered before, datetime or epoch.
+            limit: Maximum number of usage alerts.
+
+        Returns:
+            Usage alerts in JSON format, oldest first.
+        """
+        filters = {"device_id": device_id, "type": event_rule_name}
+        return self._query("usage_alerts", filters, since, until, limit)
+
+    def _sync(self, entries, add):
+        """Store items in batches.
+
+        Args:
+            entries: Iterable of items.
+            add: Method storing a batch of items.
+
+        Returns:
+            Number of items written.
+        """
+        written = 0
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= SYNC_BATCH_SIZE:
+                written += add(batch)
+                batch = []
+        written += add(batch)
+        LOGGER.debug("Synchronized %s items", written)  # noqa: WPS323
+        return written
+
+    def _write(self, statement, rows):
+        """Execute a write statement for every row in one transaction.
+
+        Args:
+            statement: SQL statement.
+            rows: Parameters of each row.
+
+        Returns:
+            Number of rows written.
+        """
+        if not rows:
+            return 0
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(statement, rows)
+        return len(rows)
+
+    def _query(self, table, filters, since, until, limit):  # noqa: WPS211
+        """Select bodies from a table.
+
+        Args:
+            table: Table name.
+            filters: Column equality filters, None values are ignored.
+            since: Lower created bound, inclusive.
+            until: Upper created bound, exclusive.
+            limit: Maximum number of rows.
+
+        Returns:
+            Decoded bodies ordered by creation time.
+        """
+        clauses, query_args = _where_clauses(filters, since, until)
+        statement = "SELECT body FROM {0}".format(table)  # noqa: S608
+        if clauses:
+            statement = "{0} WHERE {1}".format(statement, " AND ".join(clauses))
+        statement = "{0} ORDER BY created, id".format(statement)
+        if limit is not None:
+            statement = "{0} LIMIT ?".format(statement)
+            query_args.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(statement, query_args).fetchall()
+        return [json.loads(row[0]) for row in rows]
@@ -0,0 +1,189 @@
+"""Decode the data array of Flume API responses while the body arrives."""
+
+import codecs
+import json
+from typing import Any, Dict, Iterator
+
+from .deadline import check_deadline  # noqa: WPS300
+
+DEFAULT_CHUNK_SIZE = 16384
+NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+class JsonDataStream:  # noqa: WPS214
+    """Iterate over the items of the `data` array of a streamed response.
+
+    The response must be requested with `stream=True`. Items are decoded one
+    at a time from the body chunks, so neither the body text nor the whole
+    document is held in memory. The active Deadline is checked before every
+    chunk. The other top-level fields, such as
+    `pagination` and `count`, are collected in `document` and are complete
+    once iteration finishes.
+    """
+
+    def __init__(self, response, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        Initialize the stream.
+
+        Args:
+            response: Requests response created with stream=True.
+            chunk_size: Bytes read from the body at a time.
+        """
+        self.document: Dict[str, Any] = {}
+        self._chunks = response.iter_content(chunk_size)
+        self._text_decoder = codecs.getincrementaldecoder(
+            response.encoding or "utf-8",
+        )()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield the items of the data array.
+
+        Yields:
+            Decoded items of the data array.
+
+        Raises:
+            ValueError: If the body is not a JSON object.
+        """
+        if self._next_char() != "{":
+            raise ValueError("Response body is not a JSON object.")
+        self._position += 1
+
+        key = self._next_key()
+        while key is not None:
+            if key == "data" and self._next_char() == "[":
+                self._position += 1
+                yield from self._iter_array()
+            else:
+                self.document[key] = self._decode_value()
+            key = self._next_key()
+
+    def _next_key(self):
+        """Consume the next key of the object and the colon after it.
+
+        Returns:
+            The key, None at the end of the object.
+
+        Raises:
+            ValueError: If the key is not followed by a colon.
+        """
+        char = self._next_char()
+        while char == ",":
+            self._position += 1
+            char = self._next_char()
+        if char == "}":
+            return None
+
+        key = self._decode_value()
+        if self._next_char() != ":":
+            raise ValueError("Expected ':' after key {0}.".format(key))
+        self._position += 1
+        return key
+
+    def _iter_array(self):
+        """Yield the items of the array at the current position.
+
+        Yields:
+            Decoded array items.
+        """
+        while True:
+            char = self._next_char()
+            if char == "]":
+                self._position += 1
+                return
+            if char == ",":
+                self._position += 1
+                continue
+            yield self._decode_value()
+
+    def _next_char(self):
+        """Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            The next non whitespace character.
+
+        Raises:
+            ValueError: If the body ends unexpectedly.
+        """
+        while True:
+            while self._position < len(self._buffer):
+                char = self._buffer[self._position]
+                if not char.isspace():
+                    return char
+                self._position += 1
+            if not self._fill():
+                raise ValueError("Unexpected end of response body.")
+
+    def _decode_value(self):
+        """Decode and consume the JSON value at the current position.
+
+        Returns:
+            The decoded value.
+        """
+        self._next_char()
+        json_value, end = self._raw_decode()
+        while self._number_continues(json_value, end) and self._fill():
+            json_value, end = self._raw_decode()
+        self._position = end
+        return json_value
+
+    def _raw_decode(self):
+        """Decode the JSON value at the current position, reading more if needed.
+
+        Returns:
+            Tuple of the decoded value and the buffer position after it.
+
+        Raises:
+            json.JSONDecodeError: If the value is not valid JSON.
+        """
+        while True:
+            try:
+                return self._json_decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def _number_continues(self, json_value, end):
+        """Return True if a decoded number may continue in the next chunk.
+
+        A prefix of a number, such as `1.` of `1.25` or `1.5` of `1.5E3`,
+        decodes as a shorter number, so a number followed only by number
+        characters up to the end of the buffer is incomplete until more of
+        the body is read.
+
+        Args:
+            json_value: Decoded value.
+            end: Buffer position after the decoded value.
+
+        Returns:
+            Boolean
+        """
+        if self._eof or isinstance(json_value, bool):
+            return False
+        if not isinstance(json_value, (int, float)):
+            return False
+        tail = self._buffer[end:]
+        return all(char in NUMBER_CHARS for char in tail)
+
+    def _fill(self):
+        """Append the next body chunk to the buffer.
+
+        Returns:
+            False if the body is exhausted.
+        """
+        if self._eof:
+            return False
+        check_deadline()
+        self._buffer = self._buffer[self._position :]  # noqa: E203
+        self._position = 0
+        for chunk in self._chunks:
+            text = self._text_decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._eof = True
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        return False
@@ -0,0 +1,609 @@
+"""Store flow readings locally with hour and day rollups."""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+RESOLUTION_MINUTE = "minute"
+RESOLUTION_HOUR = "hour"
+RESOLUTION_DAY = "day"
+RESOLUTION_SECONDS = {  # noqa: WPS407
+    RESOLUTION_MINUTE: 60,
+    RESOLUTION_HOUR: 3600,
+    RESOLUTION_DAY: 86400,
+}
+DEFAULT_RETENTION = {  # noqa: WPS407
+    RESOLUTION_MINUTE: timedelta(days=14),  # noqa: WPS432
+    RESOLUTION_HOUR: timedelta(days=400),  # noqa: WPS432
+    RESOLUTION_DAY: None,
+}
+
+NO_MERGE = timedelta(0)
+
+# Epoch seconds and gallons of a single bucket.
+_RECORD = struct.Struct("<qd")
+# Start and end epoch seconds of a fetched range.
+_RANGE = struct.Struct("<qq")
+
+
+def _replace_file(path, payload):
+    """Replace the content of a file through a temporary file.
+
+    Args:
+        path: File to replace.
+        payload: Bytes of the new content.
+    """
+    temporary_path = "{0}.tmp".format(path)
+    with open(temporary_path, "wb") as replacement:
+        replacement.write(payload)
+    os.replace(temporary_path, path)
+
+
+class _SeriesFile:  # noqa: WPS214
+    """Sorted array of fixed size records in a single file."""
+
+    def __init__(self, path):
+        """Initialize the series.
+
+        Args:
+            path: File holding the records.
+        """
+        self.path = path
+
+    def upsert(self, buckets, accumulate):
+        """Write buckets, each starting at its timestamp.
+
+        Records are appended in the common case and existing buckets are
+        updated in place. When older missing buckets are inserted, the whole
+        batch is written to a temporary file that replaces the series, so a
+        failed write never leaves a partly shifted file.
+
+        Args:
+            buckets: Dict of bucket start in epoch seconds to the value to write.
+            accumulate: Add values to existing buckets instead of replacing them.
+
+        Returns:
+            Dict of bucket start to its previous value, for buckets that existed.
+        """
+        if not os.path.exists(self.path):
+            open(self.path, "ab").close()  # noqa: WPS515
+
+        with open(self.path, "r+b") as series:
+            count = os.fstat(series.fileno()).st_size // _RECORD.size
+            located = self._locate(series, count, buckets)
+            if located is not None:
+                self._update(series, buckets, located, accumulate)
+                return {timestamp: located[timestamp][1] for timestamp in located}
+            series.seek(0)
+            records = dict(_RECORD.iter_unpack(series.read()))
+        return self._rewrite(records, buckets, accumulate)
+
+    def read(self, since, until):
+        """Return records with since <= timestamp < until.
+
+        Args:
+            since: Lower bound in epoch seconds, None for no bound.
+            until: Upper bound in epoch seconds, None for no bound.
+
+        Returns:
+            List of (epoch seconds, gallons).
+        """
+        if not self._size():
+            return []
+
+        with open(self.path, "rb") as series:
+            with mmap.mmap(series.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                count = len(mapped) // _RECORD.size
+                start = 0 if since is None else self._bisect(mapped, count, since)
+                end = count if until is None else self._bisect(mapped, count, until)
+                return list(
+                    _RECORD.iter_unpack(
+                        mapped[start * _RECORD.size : end * _RECORD.size],  # noqa: E203
+                    ),
+                )
+
+    def truncate_before(self, timestamp):
+        """Drop records older than timestamp.
+
+        Args:
+            timestamp: Oldest epoch seconds to keep.
+
+        Returns:
+            Number of records dropped.
+        """
+        if not self._size():
+            return 0
+
+        with open(self.path, "rb") as series:
+            with mmap.mmap(series.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                count = len(mapped) // _RECORD.size
+                start = self._bisect(mapped, count, timestamp)
+                if not start:
+                    return 0
+                kept = mapped[start * _RECORD.size :]  # noqa: E203
+
+        _replace_file(self.path, kept)
+        return start
+
+    def _size(self):
+        """Return the size of the series file.
+
+        Returns:
+            Size in bytes, 0 if the file does not exist.
+        """
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def _locate(self, series, count, buckets):
+        """Find the records of the buckets not after the last record.
+
+        Args:
+            series: Series file open for reading.
+            count: Number of records.
+            buckets: Dict of bucket start in epoch seconds to the value to write.
+
+        Returns:
+            Dict of bucket start to (record index, stored value), None if one
+            of the buckets is missing before the last record.
+        """
+        if not count:
+            return {}
+        last_timestamp = self._record_at(series, count - 1)[0]
+
+        located = {}
+        for timestamp in sorted(buckets):
+            if timestamp > last_timestamp:
+                break
+            index = self._bisect(series, count, timestamp)
+            record = self._record_at(series, index)
+            if record[0] != timestamp:
+                return None
+            located[timestamp] = (index, record[1])
+        return located
+
+    def _update(self, series, buckets, located, accumulate):
+        """Update the located records in place and append the other buckets.
+
+        Args:
+            series: Series file open for writing.
+            buckets: Dict of bucket start in epoch seconds to the value to write.
+            located: Dict of bucket start to (record index, stored value).
+            accumulate: Add values to existing buckets instead of replacing them.
+        """
+        for timestamp, (index, stored) in located.items():
+            gallons = buckets[timestamp]
+            if accumulate:
+                gallons += stored
+            series.seek(index * _RECORD.size)
+            series.write(_RECORD.pack(timestamp, gallons))
+        appended = sorted(buckets.keys() - located.keys())
+        series.seek(0, os.SEEK_END)
+        series.write(
+            b"".join(_RECORD.pack(start, buckets[start]) for start in appended),
+        )
+
+    def _rewrite(self, records, buckets, accumulate):
+        """Merge buckets into all the records and replace the series.
+
+        Args:
+            records: Dict of bucket start to the stored value of every record.
+            buckets: Dict of bucket start in epoch seconds to the value to write.
+            accumulate: Add values to existing buckets instead of replacing them.
+
+        Returns:
+            Dict of bucket start to its previous value, for buckets that existed.
+        """
+        previous = {
+            timestamp: records[timestamp]
+            for timestamp in buckets.keys() & records.keys()
+        }
+        if accumulate:
+            buckets = {
+                timestamp: gallons + previous.get(timestamp, 0)
+                for timestamp, gallons in buckets.items()
+            }
+        records.update(buckets)
+        ordered = sorted(records.items())
+        _replace_file(
+            self.path,
+            b"".join(_RECORD.pack(*record) for record in ordered),
+        )
+        return previous
+
+    def _record_at(self, records, index):
+        """Return a record of the series.
+
+        Args:
+            records: Open file or mmap of the series.
+            index: Record index.
+
+        Returns:
+            Tuple of epoch seconds and gallons.
+        """
+        if isinstance(records, mmap.mmap):
+            return _RECORD.unpack_from(records, index * _RECORD.size)
+        records.seek(index * _RECORD.size)
+        return _RECORD.unpack(records.read(_RECORD.size))
+
+    def _bisect(self, records, count, timestamp):
+        """Return the index of the first record with a timestamp >= timestamp.
+
+        Args:
+            records: Open file or mmap of the series.
+            count: Number of records.
+            timestamp: Epoch seconds to search.
+
+        Returns:
+            Record index.
+        """
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record_at(records, middle)[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+class _CoverageFile:
+    """Sorted, merged list of the time ranges fetched for a device."""
+
+    def __init__(self, path):
+        """Initialize the ledger.
+
+        Args:
+            path: File holding the ranges.
+        """
+        self.path = path
+
+    def ranges(self):
+        """Return the fetched ranges.
+
+        Returns:
+            List of (start, end) epoch seconds, end excluded, oldest first.
+        """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as ledger:
+            return list(_RANGE.iter_unpack(ledger.read()))
+
+    def add(self, start, end):
+        """Record a fetched range, merging it with overlapping or adjacent ones.
+
+        Args:
+            start: Range start in epoch seconds.
+            end: Range end in epoch seconds, excluded.
+        """
+        merged = []
+        for range_start, range_end in self.ranges():
+            if range_end < start or range_start > end:
+                merged.append((range_start, range_end))
+            else:
+                start = min(start, range_start)
+                end = max(end, range_end)
+        merged.append((start, end))
+        merged.sort()
+        self._write(merged)
+
+    def truncate_before(self, timestamp):
+        """Forget ranges older than timestamp.
+
+        Args:
+            timestamp: Oldest epoch seconds to keep.
+        """
+        ranges = self.ranges()
+        kept = [
+            (max(start, timestamp), end) for start, end in ranges if end > timestamp
+        ]
+        if kept != ranges:
+            self._write(kept)
+
+    def _write(self, ranges):
+        """Replace the ledger.
+
+        Args:
+            ranges: Sorted list of (start, end) epoch seconds.
+        """
+        _replace_file(
+            self.path,
+            b"".join(_RANGE.pack(*fetched) for fetched in ranges),
+        )
+
+
+def _as_epoch(timestamp):
+    """Convert a read bound to epoch seconds.
+
+    Args:
+        timestamp: datetime, epoch seconds or None.
+
+    Returns:
+        Epoch seconds or None.
+    """
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp())
+    return timestamp
+
+
+def _missing_ranges(fetched, since, until):
+    """Return the parts of a time range not covered by the fetched ranges.
+
+    Args:
+        fetched: Sorted list of fetched (start, end) epoch seconds.
+        since: Range start in epoch seconds.
+        until: Range end in epoch seconds, excluded.
+
+    Returns:
+        List of (start, end) epoch seconds, end excluded, oldest first.
+    """
+    missing = []
+    start = since
+    for range_start, range_end in fetched:
+        if range_end <= start:
+            continue
+        if range_start >= until:
+            break
+        if range_start > start:
+            missing.append((start, range_start))
+        start = max(start, range_end)
+    if start < until:
+        missing.append((start, until))
+    return missing
+
+
+def _merge_ranges(ranges, merge_within):
+    """Merge ranges separated by less than merge_within seconds.
+
+    Args:
+        ranges: Sorted list of (start, end) epoch seconds.
+        merge_within: Largest separation merged, in seconds.
+
+    Returns:
+        List of (start, end) epoch seconds.
+    """
+    merged = []
+    for range_start, range_end in ranges:
+        if merged and range_start - merged[-1][1] < merge_within:
+            merged[-1] = (merged[-1][0], range_end)
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+class FlumeTimeSeriesStore:  # noqa: WPS214
+    """Append-only per device store of flow readings with rollups and retention."""
+
+    def __init__(self, directory: str, retention: Optional[Dict] = None) -> None:
+        """
+        Open or create the store.
+
+        Args:
+            directory: Directory holding one sub directory per device.
+            retention: Maximum age per resolution as timedelta, None keeps forever.
+        """
+        self._directory = directory
+        self._retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, device_id: str, timestamp: datetime, gallons: float) -> None:
+        """Store the gallons used during the minute starting at timestamp.
+
+        Hour and day rollups are updated with the difference, so writing the
+        same minute again does not count it twice. Days start at midnight in
+        the time zone of timestamp.
+
+        Args:
+            device_id: Flume device id.
+            timestamp: Time zone aware start of the minute.
+            gallons: Gallons used during the minute.
+        """
+        self.write_many(device_id, [(timestamp, gallons)])
+
+    def write_many(  # noqa: WPS210
+        self,
+        device_id: str,
+        readings: Iterable[Tuple[datetime, float]],
+    ) -> None:
+        """Store the gallons of several minutes, as write does for one.
+
+        Each series is written once for the whole batch, so older minutes
+        inserted out of order rewrite a series once rather than per minute.
+
+        Args:
+            device_id: Flume device id.
+            readings: (time zone aware start of the minute, gallons) pairs.
+        """
+        minutes = {}
+        for timestamp, gallons in readings:
+            epoch = int(timestamp.timestamp())
+            utc_offset = timestamp.utcoffset() or timedelta(0)
+            local_epoch = epoch + int(utc_offset.total_seconds())
+            minutes[epoch - epoch % RESOLUTION_SECONDS[RESOLUTION_MINUTE]] = (
+                gallons,
+                epoch - local_epoch % RESOLUTION_SECONDS[RESOLUTION_HOUR],
+                epoch - local_epoch % RESOLUTION_SECONDS[RESOLUTION_DAY],
+            )
+        if not minutes:
+            return
+
+        with self._lock:
+            previous = self._series(device_id, RESOLUTION_MINUTE).upsert(
+                {minute: bucket[0] for minute, bucket in minutes.items()},
+                accumulate=False,
+            )
+            hours = defaultdict(float)
+            days = defaultdict(float)
+            for minute, (minute_gallons, hour, day) in minutes.items():
+                difference = minute_gallons - previous.get(minute, 0)
+                hours[hour] += difference
+                days[day] += difference
+            self._series(device_id, RESOLUTION_HOUR).upsert(hours, accumulate=True)
+            previous_days = self._series(device_id, RESOLUTION_DAY).upsert(
+                days,
+                accumulate=True,
+            )
+            if len(previous_days) < len(days):
+                self._apply_device_retention(device_id, max(minutes))
+
+    def read(
+        self,
+        device_id: str,
+        resolution: str = RESOLUTION_MINUTE,
+        since=None,
+        until=None,
+    ) -> List[Tuple[int, float]]:
+        """Return stored buckets of a device.
+
+        Args:
+            device_id: Flume device id.
+            resolution: minute, hour or day.
+            since: Oldest bucket start to return, datetime or epoch seconds.
+            until: Return buckets starting before, datetime or epoch seconds.
+
+        Returns:
+            List of (bucket start in epoch seconds, gallons), oldest first.
+        """
+        with self._lock:
+            return self._series(device_id, resolution).read(
+                _as_epoch(since),
+                _as_epoch(until),
+            )
+
+    def mark_fetched(self, device_id: str, since, until) -> None:
+        """Record that the readings of a time range have been stored.
+
+        FlumeData records the minutes it stores, so missed updates show up as
+        gaps.
+
+        Args:
+            device_id: Flume device id.
+            since: Range start, datetime or epoch seconds.
+            until: Range end, excluded, datetime or epoch seconds.
+        """
+        with self._lock:
+            self._coverage(device_id).add(_as_epoch(since), _as_epoch(until))
+
+    def fetched(self, device_id: str) -> List[Tuple[int, int]]:
+        """Return the time ranges whose readings have been stored.
+
+        Args:
+            device_id: Flume device id.
+
+        Returns:
+            List of (start, end) epoch seconds, end excluded, oldest first.
+        """
+        with self._lock:
+            return self._coverage(device_id).ranges()
+
+    def gaps(
+        self,
+        device_id: str,
+        since,
+        until,
+        merge_within: timedelta = NO_MERGE,
+    ) -> List[Tuple[int, int]]:
+        """Return the time ranges missing between since and until.
+
+        Gaps separated by less than merge_within are returned as one range,
+        so they can be fetched with fewer queries.
+
+        Args:
+            device_id: Flume device id.
+            since: Range start, datetime or epoch seconds.
+            until: Range end, excluded, datetime or epoch seconds.
+            merge_within: Merge gaps closer than this.
+
+        Returns:
+            List of (start, end) epoch seconds, end excluded, oldest first.
+        """
+        missing = _missing_ranges(
+            self.fetched(device_id),
+            _as_epoch(since),
+            _as_epoch(until),
+        )
+        return _merge_ranges(missing, merge_within.total_seconds())
+
+    def apply_retention(self, now: Optional[datetime] = None) -> int:
+        """Drop buckets older than the retention of their resolution.
+
+        Args:
+            now: Reference time, defaults to the current time.
+
+        Returns:
+            Number of buckets dropped.
+        """
+        epoch = int((now or datetime.now(timezone.utc)).timestamp())
+        with self._lock:
+            return sum(
+                self._apply_device_retention(device_id, epoch)
+                for device_id in os.listdir(self._directory)
+            )
+
+    def _apply_device_retention(self, device_id, epoch):
+        """Drop buckets of a device older than their retention.
+
+        Args:
+            device_id: Flume device id.
+            epoch: Reference time in epoch seconds.
+
+        Returns:
+            Number of buckets dropped.
+        """
+        dropped = 0
+        for resolution, retention in self._retention.items():
+            if retention is not None:
+                dropped += self._series(device_id, resolution).truncate_before(
+                    epoch - int(retention.total_seconds()),
+                )
+        minute_retention = self._retention[RESOLUTION_MINUTE]
+        if minute_retention is not None:
+            self._coverage(device_id).truncate_before(
+                epoch - int(minute_retention.total_seconds()),
+            )
+        if dropped:
+            LOGGER.debug("Dropped %s buckets of %s", dropped, device_id)  # noqa: WPS323
+        return dropped
+
+    def _series(self, device_id, resolution):
+        """Return the series file of a device and resolution.
+
+        Args:
+            device_id: Flume device id.
+            resolution: minute, hour or day.
+
+        Returns:
+            The series file.
+
+        Raises:
+            ValueError: If the resolution is unknown.
+        """
+        if resolution not in RESOLUTION_SECONDS:
+            raise ValueError("Unknown resolution {0}.".format(resolution))
+        device_directory = os.path.join(self._directory, str(device_id))
+        os.makedirs(device_directory, exist_ok=True)
+        return _SeriesFile(os.path.join(device_directory, "{0}.bin".format(resolution)))
+
+    def _coverage(self, device_id):
+        """Return the ledger of the ranges fetched for a device.
+
+        Args:
+            device_id: Flume device id.
+
+        Returns:
+            The coverage file.
+        """
+        device_directory = os.path.join(self._directory, str(device_id))
+        os.makedirs(device_directory, exist_ok=True)
+        return _CoverageFile(os.path.join(device_directory, "coverage.bin"))
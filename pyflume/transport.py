@@ -0,0 +1,442 @@
+"""Pluggable HTTP backends performing the requests of pyflume classes."""
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import io
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from requests import (
+    ConnectionError as RequestsConnectionError,
+    ConnectTimeout,
+    PreparedRequest,
+    ReadTimeout,
+    Request,
+    Response,
+    Session,
+)
+from requests.structures import CaseInsensitiveDict
+from requests.utils import default_headers, get_encoding_from_headers
+import urllib3
+
+from .utils import configure_logger  # noqa: WPS300
+
+# Configure logging
+LOGGER = configure_logger(__name__)
+
+TRANSPORT_REQUESTS = "requests"
+TRANSPORT_URLLIB3 = "urllib3"
+TRANSPORT_HTTPX = "httpx"
+TRANSPORT_MEMORY = "memory"
+TRANSPORTS = (  # noqa: WPS317
+    TRANSPORT_REQUESTS,
+    TRANSPORT_URLLIB3,
+    TRANSPORT_HTTPX,
+    TRANSPORT_MEMORY,
+)
+
+
+def build_response(prepared, status_code, headers, reason="", raw=None):
+    """Return a Requests Response for the result of another backend.
+
+    Args:
+        prepared: PreparedRequest that was sent.
+        status_code: HTTP status code.
+        headers: Response headers.
+        reason: HTTP reason phrase.
+        raw: File-like object the body is read from.
+
+    Returns:
+        requests.Response
+    """
+    response = Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.reason = reason
+    response.url = prepared.url
+    response.request = prepared
+    response.raw = raw if raw is not None else io.BytesIO()
+    return response
+
+
+def _decoded_headers(headers):
+    """Return response headers without Content-Encoding, for decoded bodies.
+
+    Args:
+        headers: Response headers.
+
+    Returns:
+        Dict of headers.
+    """
+    return {
+        name: header_value
+        for name, header_value in headers.items()
+        if name.lower() != "content-encoding"
+    }
+
+
+def split_timeout(timeout):
+    """Return the connect and read timeouts of a Requests timeout.
+
+    Args:
+        timeout: None, seconds or (connect, read) tuple.
+
+    Returns:
+        Tuple of connect and read timeouts.
+    """
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+class Transport(ABC):
+    """Session-like HTTP backend.
+
+    Every pyflume class calls `request(method, url, **kwargs)` of its
+    http_session with the arguments of requests.Session.request, and reads a
+    Requests Response. A Requests Session() is the default backend. Subclasses
+    implement `send` with another client and return a Response built with
+    build_response, so decoding, streaming and error handling are unchanged.
+    Timeouts raise requests.exceptions.Timeout and network failures raise
+    requests.exceptions.ConnectionError, whatever the client.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the default headers sent with every request."""
+        self.headers = default_headers()
+
+    def request(  # noqa: WPS211
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,  # noqa: WPS110
+        data: Any = None,  # noqa: WPS110
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,  # noqa: WPS442
+        timeout: Any = None,
+        stream: bool = False,
+    ) -> Response:
+        """Prepare and send a request.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            params: Query string.
+            data: Request body.
+            headers: Headers added to the default headers.
+            json: JSON request body.
+            timeout: Seconds or (connect, read) tuple.
+            stream: Read the body as it is consumed, when the backend supports it.
+
+        Returns:
+            The response.
+        """
+        merged_headers = dict(self.headers)
+        merged_headers.update(headers or {})
+        prepared = Request(
+            method=method.upper(),
+            url=url,
+            headers=merged_headers,
+            params=params,
+            data=data,
+            json=json,
+        ).prepare()
+        return self.send(prepared, timeout=timeout, stream=stream)
+
+    @abstractmethod
+    def send(
+        self,
+        prepared: PreparedRequest,
+        timeout: Any = None,
+        stream: bool = False,
+    ) -> Response:
+        """Send a prepared request, implemented by the backends.
+
+        Args:
+            prepared: The request.
+            timeout: Seconds or (connect, read) tuple.
+            stream: Read the body as it is consumed.
+
+        Returns:
+            The response, built with build_response.
+        """
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        """Perform a GET request.
+
+        Args:
+            url: Request URL.
+            kwargs: Arguments of request.
+
+        Returns:
+            The response.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Response:
+        """Perform a POST request.
+
+        Args:
+            url: Request URL.
+            kwargs: Arguments of request.
+
+        Returns:
+            The response.
+        """
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:  # noqa: B027
+        """Release the connections of the backend."""
+
+
+@contextmanager
+def _urllib3_errors():
+    """Raise urllib3 errors as the matching Requests exceptions.
+
+    Yields:
+        None
+
+    Raises:
+        ConnectTimeout: If the connection timed out.
+        ReadTimeout: If the response timed out.
+        RequestsConnectionError: On other network errors.
+    """
+    try:
+        yield
+    except urllib3.exceptions.ConnectTimeoutError as error:
+        raise ConnectTimeout(error) from error
+    except urllib3.exceptions.ReadTimeoutError as error:
+        raise ReadTimeout(error) from error
+    except urllib3.exceptions.HTTPError as error:
+        raise RequestsConnectionError(error) from error
+
+
+class Urllib3Transport(Transport):
+    """Backend calling a urllib3 connection pool directly.
+
+    It skips the adapter, cookie and redirect handling of Requests, so each
+    call does less work. Streamed bodies are read as they are consumed.
+    """
+
+    def __init__(self, maxsize: int = 10, **pool_kwargs: Any) -> None:
+        """
+        Initialize the connection pools.
+
+        Args:
+            maxsize: Connections kept per host.
+            pool_kwargs: Other arguments of urllib3.PoolManager.
+        """
+        super().__init__()
+        self._pool = urllib3.PoolManager(maxsize=maxsize, **pool_kwargs)
+
+    def send(self, prepared, timeout=None, stream=False):
+        """Send a prepared request with urllib3.
+
+        Args:
+            prepared: The request.
+            timeout: Seconds or (connect, read) tuple.
+            stream: Read the body as it is consumed.
+
+        Returns:
+            The response.
+        """
+        connect_timeout, read_timeout = split_timeout(timeout)
+        with _urllib3_errors():
+            raw = self._pool.urlopen(
+                prepared.method,
+                prepared.url,
+                body=prepared.body,
+                headers=dict(prepared.headers),
+                retries=False,
+                redirect=False,
+                preload_content=False,
+                decode_content=False,
+                timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            )
+        response = build_response(
+            prepared,
+            raw.status,
+            raw.headers,
+            raw.reason,
+            raw,
+        )
+        if not stream:
+            response.content  # noqa: WPS428
+        return response
+
+    def close(self) -> None:
+        """Close the connection pools."""
+        self._pool.clear()
+
+
+class HttpxTransport(Transport):
+    """Backend calling httpx, with optional HTTP/2 multiplexing.
+
+    httpx is an optional dependency, and HTTP/2 requires the h2 package.
+    Response bodies are read in full and decoded before they are returned.
+    """
+
+    def __init__(self, http2: bool = False, **client_kwargs: Any) -> None:
+        """
+        Initialize the httpx client.
+
+        Args:
+            http2: Negotiate HTTP/2, concurrent requests share one connection.
+            client_kwargs: Other arguments of httpx.Client.
+        """
+        import httpx  # noqa: WPS433
+
+        super().__init__()
+        self._httpx = httpx
+        self._client = httpx.Client(http2=http2, **client_kwargs)
+
+    def send(self, prepared, timeout=None, stream=False):
+        """Send a prepared request with httpx.
+
+        Args:
+            prepared: The request.
+            timeout: Seconds or (connect, read) tuple.
+            stream: Ignored, bodies are read in full.
+
+        Returns:
+            The response.
+
+        Raises:
+            ConnectTimeout: If the connection timed out.
+            ReadTimeout: If the response timed out.
+            RequestsConnectionError: On other network errors.
+        """
+        connect_timeout, read_timeout = split_timeout(timeout)
+        httpx = self._httpx
+        try:
+            response = self._client.request(
+                prepared.method,
+                prepared.url,
+                content=prepared.body,
+                headers=dict(prepared.headers),
+                timeout=httpx.Timeout(
+                    read_timeout,
+                    connect=connect_timeout,
+                    pool=connect_timeout,
+                ),
+            )
+        except httpx.ConnectTimeout as error:
+            raise ConnectTimeout(error) from error
+        except httpx.TimeoutException as error:
+            raise ReadTimeout(error) from error
+        except httpx.TransportError as error:
+            raise RequestsConnectionError(error) from error
+        return build_response(
+            prepared,
+            response.status_code,
+            _decoded_headers(response.headers),
+            response.reason_phrase,
+            io.BytesIO(response.content),
+        )
+
+    def close(self) -> None:
+        """Close the httpx client."""
+        self._client.close()
+
+
+class MemoryTransport(Transport):
+    """Backend answering registered responses without network, for tests.
+
+    Responses are matched on the method and the full URL first, then on the
+    URL without its query string. Every request sent is kept in `requests`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty route table."""
+        super().__init__()
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.requests: List[PreparedRequest] = []
+
+    def add(  # noqa: WPS211
+        self,
+        method: str,
+        url: str,
+        payload: Any = None,
+        body: bytes = b"",
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Register the response of a request.
+
+        Args:
+            method: HTTP method.
+            url: Request URL, with or without query string.
+            payload: JSON body of the response, replaces body.
+            body: Body of the response.
+            status_code: HTTP status code.
+            headers: Response headers.
+        """
+        headers = dict(headers or {})
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        with self._lock:
+            self._routes[(method.upper(), url)] = (status_code, headers, body)
+
+    def send(self, prepared, timeout=None, stream=False):
+        """Answer a prepared request with its registered response.
+
+        Args:
+            prepared: The request.
+            timeout: Ignored.
+            stream: Ignored.
+
+        Returns:
+            The response.
+
+        Raises:
+            RequestsConnectionError: If no response is registered.
+        """
+        with self._lock:
+            self.requests.append(prepared)
+            route = self._routes.get((prepared.method, prepared.url))
+            if route is None:
+                base_url = prepared.url.split("?", 1)[0]
+                route = self._routes.get((prepared.method, base_url))
+        if route is None:
+            raise RequestsConnectionError(
+                "No response registered for {0} {1}".format(
+                    prepared.method,
+                    prepared.url,
+                ),
+            )
+        status_code, headers, body = route
+        return build_response(
+            prepared,
+            status_code,
+            headers,
+            raw=io.BytesIO(body),
+        )
+
+
+def create_transport(name: str = TRANSPORT_REQUESTS, **kwargs: Any):
+    """Return a backend usable as http_session by every pyflume class.
+
+    Args:
+        name: One of TRANSPORTS.
+        kwargs: Arguments of the backend.
+
+    Returns:
+        Requests Session() or Transport.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backends = {
+        TRANSPORT_REQUESTS: Session,
+        TRANSPORT_URLLIB3: Urllib3Transport,
+        TRANSPORT_HTTPX: HttpxTransport,
+        TRANSPORT_MEMORY: MemoryTransport,
+    }
+    if name not in backends:
+        raise ValueError("Unknown transport {0}".format(name))
+    LOGGER.debug("Using %s transport", name)  # noqa: WPS323
+    return backends[name](**kwargs)
@@ -0,0 +1,113 @@
+"""Convert volumes returned by the Flume API to other units locally."""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from .constants import CONST_UNIT_OF_MEASUREMENT  # noqa: WPS300
+
+GALLONS = "GALLONS"
+LITERS = "LITERS"
+CUBIC_FEET = "CUBIC_FEET"
+CUBIC_METERS = "CUBIC_METERS"
+
+# Volume of one unit in US gallons.
+UNIT_GALLONS = {  # noqa: WPS407
+    GALLONS: 1,
+    LITERS: 1 / 3.785411784,  # noqa: WPS432
+    CUBIC_FEET: 7.480519480519481,  # noqa: WPS432
+    CUBIC_METERS: 264.17205235814845,  # noqa: WPS432
+}
+UNITS = tuple(UNIT_GALLONS)
+
+# Dict of request_id to volume, or None.
+Volumes = Dict[str, Optional[float]]
+
+
+def conversion_factor(from_unit: str, to_unit: str) -> float:
+    """Return the factor converting a volume between units.
+
+    Args:
+        from_unit: Unit of the volume, one of UNITS.
+        to_unit: Requested unit, one of UNITS.
+
+    Returns:
+        Factor to multiply the volume with.
+
+    Raises:
+        ValueError: If a unit is unknown.
+    """
+    for unit in (from_unit, to_unit):
+        if unit not in UNIT_GALLONS:
+            raise ValueError(
+                "Unknown unit {0}, expected one of {1}".format(
+                    unit,
+                    ", ".join(UNITS),
+                ),
+            )
+    return UNIT_GALLONS[from_unit] / UNIT_GALLONS[to_unit]
+
+
+def query_units(query_payload: Dict[str, Any]) -> Dict[str, str]:
+    """Return the unit of each query of a payload.
+
+    Args:
+        query_payload: Dict with the list of queries.
+
+    Returns:
+        Dict of request_id to unit, GALLONS when the query sets none.
+    """
+    return {
+        query["request_id"]: query.get("units", CONST_UNIT_OF_MEASUREMENT)
+        for query in query_payload["queries"]
+    }
+
+
+def convert_values(
+    values: Volumes,  # noqa: WPS110
+    units: Iterable[str],
+    from_units: Dict[str, str],
+) -> Dict[str, Volumes]:
+    """Return values in each of several units.
+
+    The factors of every value are resolved once, then each unit is a single
+    pass over the values.
+
+    Args:
+        values: Dict of request_id to volume, or None.
+        units: Requested units.
+        from_units: Dict of request_id to the unit of its volume.
+
+    Returns:
+        Dict of unit to a dict of request_id to volume in that unit.
+    """
+    converted = {}
+    for unit in units:
+        factors = {
+            key: conversion_factor(from_units.get(key, GALLONS), unit)
+            for key in values
+        }
+        converted[unit] = {
+            key: None if volume is None else volume * factors[key]
+            for key, volume in values.items()
+        }
+    return converted
+
+
+def convert_buckets(
+    buckets: List[Dict[str, Any]],
+    factor: float,
+) -> List[Dict[str, Any]]:
+    """Return query buckets with their values multiplied by a factor.
+
+    Args:
+        buckets: List of dicts with datetime and value.
+        factor: Factor returned by conversion_factor.
+
+    Returns:
+        New list of buckets.
+    """
+    return [
+        dict(bucket, value=bucket["value"] * factor)
+        if bucket.get("value") is not None
+        else bucket
+        for bucket in buckets
+    ]
@@ -1,23 +1,56 @@
 """Retrieve usage alert notifications from Flume API."""
 
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional
+
 from requests import Session
 
 from .constants import API_BASE_URL, API_USAGE_URL, DEFAULT_TIMEOUT  # noqa: WPS300
+from .acknowledge import (  # noqa: WPS300
+    ACKNOWLEDGE_BATCH_SIZE,
+    acknowledge,
+    item_ids,
+    mark_read,
+)
+from .deadline import request_timeout  # noqa: WPS300
+from .pages import (  # noqa: WPS300
+    DEFAULT_WORKERS,
+    PAGE_LIMIT,
+    drain,
+    fetch_offset_pages,
+    take_call,
+)
+from .records import UsageAlertRecord, as_json  # noqa: WPS300
+from .stream import JsonDataStream  # noqa: WPS300
 from .utils import configure_logger, flume_response_error  # noqa: WPS300
 
 # Configure logging
 LOGGER = configure_logger(__name__)
 
 
-class FlumeUsageAlertList:
+class FlumeUsageAlertListState(NamedTuple):
+    """Immutable usage alerts and pagination, replaced as a whole."""
+
+    usage_alert_list: List[Any]
+    has_next: Optional[bool]
+    next_page: Optional[str]
+    last_updated: Optional[float]
+
+
+class FlumeUsageAlertList:  # noqa: WPS214
     """Get Flume Usage Alert list from API."""
 
-    def __init__(
+    def __init__(  # noqa: WPS211
         self,
         flume_auth,
         http_session=None,
         timeout=DEFAULT_TIMEOUT,
         read="false",
+        records=False,
+        stream=False,
+        update_on_init=True,
+        rate_budget=None,
     ):
         """
 
@@ -28,20 +61,152 @@ class FlumeUsageAlertList:
             http_session: Requests Session()
             timeout: Requests timeout for throttling.
             read: state of usage alert list, have they been read, not read.
+            records: return UsageAlertRecord objects instead of JSON dicts.
+            stream: decode usage alerts while the response body arrives.
+            update_on_init: fetch the first page of usage alerts on initialization.
+            rate_budget: RateBudget every request is taken from, default none.
 
         """
         self._timeout = timeout
         self._flume_auth = flume_auth
         self._read = read
+        self._records = records
+        self._stream = stream
+        self._rate_budget = rate_budget
 
         if http_session is None:
             self._http_session = Session()
         else:
             self._http_session = http_session
 
-        self.has_next = None
-        self.next_page = None
-        self.usage_alert_list = self.get_usage_alerts()
+        self._lock = threading.RLock()
+        self.state = FlumeUsageAlertListState(
+            usage_alert_list=[],
+            has_next=None,
+            next_page=None,
+            last_updated=None,
+        )
+        if update_on_init:
+            self.update()
+
+    def update(self):
+        """Fetch the first page of usage alerts into usage_alert_list."""
+        with self._lock:
+            usage_alerts, (has_next, next_page) = drain(
+                self._iter_usage_request(
+                    API_USAGE_URL.format(user_id=self._flume_auth.user_id),
+                    self._query_string(0),
+                ),
+            )
+            self.state = FlumeUsageAlertListState(
+                usage_alert_list=usage_alerts,
+                has_next=has_next,
+                next_page=next_page,
+                last_updated=time.time(),
+            )
+
+    @property
+    def usage_alert_list(self):
+        """Return the usage alerts of the latest update.
+
+        Returns:
+            List of usage alerts in JSON format, or UsageAlertRecord objects.
+        """
+        return self.state.usage_alert_list
+
+    @usage_alert_list.setter
+    def usage_alert_list(self, usage_alert_list):
+        """Replace the usage alerts.
+
+        Args:
+            usage_alert_list: Usage alerts in JSON format, or records.
+        """
+        self._publish(usage_alert_list=usage_alert_list)
+
+    @property
+    def last_updated(self):
+        """Return the epoch time of the latest update.
+
+        Returns:
+            Epoch seconds, None before the first update.
+        """
+        return self.state.last_updated
+
+    @last_updated.setter
+    def last_updated(self, last_updated):
+        """Replace the epoch time of the latest update.
+
+        Args:
+            last_updated: Epoch seconds.
+        """
+        self._publish(last_updated=last_updated)
+
+    @property
+    def has_next(self):
+        """Return True if a next page is available.
+
+        Returns:
+            Boolean
+        """
+        return self.state.has_next
+
+    @has_next.setter
+    def has_next(self, has_next):
+        """Replace whether a next page is available.
+
+        Args:
+            has_next: Boolean
+        """
+        self._publish(has_next=has_next)
+
+    @property
+    def next_page(self):
+        """Return the path of the next page.
+
+        Returns:
+            Path of the next page, None if there is none.
+        """
+        return self.state.next_page
+
+    @next_page.setter
+    def next_page(self, next_page):
+        """Replace the path of the next page.
+
+        Args:
+            next_page: Path of the next page, None if there is none.
+        """
+        self._publish(next_page=next_page)
+
+    def snapshot(self):
+        """Return the state of the object, see pyflume.snapshot.
+
+        Returns:
+            JSON serialisable state.
+        """
+        state = self.state
+        return {
+            "usage_alert_list": [as_json(entry) for entry in state.usage_alert_list],
+            "has_next": state.has_next,
+            "next_page": state.next_page,
+            "last_updated": state.last_updated,
+        }
+
+    def restore(self, state):
+        """Restore a state returned by snapshot.
+
+        Args:
+            state: State returned by snapshot.
+        """
+        entries = state["usage_alert_list"]
+        if self._records:
+            entries = [UsageAlertRecord.from_json(entry) for entry in entries]
+        with self._lock:
+            self.state = FlumeUsageAlertListState(
+                usage_alert_list=entries,
+                has_next=state["has_next"],
+                next_page=state["next_page"],
+                last_updated=state["last_updated"],
+            )
 
     def get_usage_alerts(self):
         """Return initial page of usage alerts from devices owned by the user.
@@ -51,13 +216,7 @@ class FlumeUsageAlertList:
         """
 
         api_url = API_USAGE_URL.format(user_id=self._flume_auth.user_id)
-        query_string = {
-            "limit": "50",
-            "offset": "0",
-            "sort_direction": "ASC",
-            "read": self._read,
-        }
-        return self._get_usage_request(api_url, query_string)
+        return self._get_usage_request(api_url, self._query_string(0))
 
     def get_next_usage_alerts(self):
         """Return next page of usage alerts from devices owned by the user.
@@ -68,13 +227,155 @@ class FlumeUsageAlertList:
         Raises:
             ValueError: If no next page is available.
         """
-        if self.has_next:
-            api_url = f"{API_BASE_URL}{self.next_page}"
+        state = self.state
+        if state.has_next:
+            api_url = f"{API_BASE_URL}{state.next_page}"
             query_string = {}
         else:
             raise ValueError("No next page available.")
         return self._get_usage_request(api_url, query_string)
 
+    def iter_usage_alerts(self):
+        """Yield usage alerts of every page, fetching pages as they are consumed.
+
+        Yields:
+            Usage alerts in JSON format, or UsageAlertRecord objects.
+        """
+        api_url = API_USAGE_URL.format(user_id=self._flume_auth.user_id)
+        has_next, next_page = yield from self._iter_usage_request(
+            api_url,
+            self._query_string(0),
+        )
+        self._publish(has_next=has_next, next_page=next_page)
+        while has_next:
+            has_next, next_page = yield from self._iter_usage_request(
+                f"{API_BASE_URL}{next_page}",
+                {},
+            )
+            self._publish(has_next=has_next, next_page=next_page)
+
+    def get_all_usage_alerts(self, workers=DEFAULT_WORKERS):
+        """Return the usage alerts of every page, fetched concurrently.
+
+        The first page gives the total count, the remaining pages are then
+        requested by offset in parallel and merged back in API order.
+
+        Args:
+            workers: Number of concurrent requests.
+
+        Returns:
+            List of usage alerts in JSON format, or UsageAlertRecord objects.
+        """
+        api_url = API_USAGE_URL.format(user_id=self._flume_auth.user_id)
+        usage_alerts = fetch_offset_pages(
+            lambda offset: self._request_page(api_url, offset),
+            workers=workers,
+        )
+        self._publish(has_next=False, next_page=None)
+        return list(self._decode_usage_alerts(usage_alerts))
+
+    def acknowledge_usage_alerts(
+        self,
+        usage_alerts=None,
+        batch_size=ACKNOWLEDGE_BATCH_SIZE,
+        workers=DEFAULT_WORKERS,
+    ):
+        """Mark usage alerts as read, in concurrent batches.
+
+        usage_alert_list is updated after every batch: acknowledged usage alerts are
+        removed when the list holds unread usage alerts only, and marked read
+        otherwise.
+
+        Args:
+            usage_alerts: Usage alerts or ids, default unread usage_alert_list.
+            batch_size: Number of usage alerts acknowledged per batch.
+            workers: Number of concurrent requests.
+
+        Returns:
+            List of acknowledged usage alert ids.
+        """
+        if usage_alerts is None:
+            usage_alerts = [
+                usage_alert
+                for usage_alert in self.usage_alert_list
+                if not usage_alert.get("read")
+            ]
+        return acknowledge(
+            self._http_session,
+            self._flume_auth,
+            API_USAGE_URL.format(user_id=self._flume_auth.user_id),
+            item_ids(usage_alerts),
+            self._apply_read,
+            timeout=self._timeout,
+            batch_size=batch_size,
+            workers=workers,
+            rate_budget=self._rate_budget,
+        )
+
+    def _apply_read(self, ids):
+        """Update usage_alert_list once usage alerts have been acknowledged.
+
+        Args:
+            ids: Acknowledged usage alert ids.
+        """
+        with self._lock:
+            self._publish(
+                usage_alert_list=mark_read(
+                    self.state.usage_alert_list,
+                    ids,
+                    drop=self._read == "false",
+                ),
+            )
+
+    def _publish(self, **fields):
+        """Replace fields of state, readers see all of them or none.
+
+        Args:
+            fields: FlumeUsageAlertListState fields to replace.
+        """
+        with self._lock:
+            self.state = self.state._replace(**fields)  # noqa: WPS437
+
+    def _query_string(self, offset):
+        """Return the query string of the page at an offset.
+
+        Args:
+            offset (int): Index of the first usage alert.
+
+        Returns:
+            object: query string options
+        """
+        return {
+            "limit": str(PAGE_LIMIT),
+            "offset": str(offset),
+            "sort_direction": "ASC",
+            "read": self._read,
+        }
+
+    def _request_page(self, api_url, offset):
+        """Return a page of usage alerts without decoding it.
+
+        Args:
+            api_url (string): URL for request
+            offset (int): Index of the first usage alert.
+
+        Returns:
+            object: Reponse in JSON format from API.
+        """
+        take_call(self._rate_budget)
+        response = self._http_session.request(
+            "GET",
+            api_url,
+            headers=self._flume_auth.authorization_header,
+            params=self._query_string(offset),
+            timeout=request_timeout(self._timeout),
+        )
+        LOGGER.debug(f"_request_page Response: {response.url}")
+
+        # Check for response errors.
+        flume_response_error("Impossible to retrieve usage alert", response)
+        return response.json()
+
     def _has_next_page(self, response_json):
         """Return True if the next page exists.
 
@@ -103,28 +404,80 @@ class FlumeUsageAlertList:
             object: Reponse in JSON format from API.
         """
 
+        usage_alerts, (has_next, next_page) = drain(
+            self._iter_usage_request(api_url, query_string),
+        )
+        self._publish(has_next=has_next, next_page=next_page)
+        return usage_alerts
+
+    def _iter_usage_request(self, api_url, query_string):
+        """Yield the usage alerts of a single page from the Flume API.
+
+        Args:
+            api_url (string): URL for request
+            query_string (object): query string options
+
+        Yields:
+            Usage alerts in JSON format, or UsageAlertRecord objects.
+
+        Returns:
+            Tuple of has_next and next_page, once the page has been consumed.
+        """
+
+        take_call(self._rate_budget)
         response = self._http_session.request(
             "GET",
             api_url,
             headers=self._flume_auth.authorization_header,
             params=query_string,
-            timeout=self._timeout,
+            timeout=request_timeout(self._timeout),
+            stream=self._stream,
         )
 
-        LOGGER.debug(f"_get_usage_request Response: {response.text}")
+        if self._stream:
+            LOGGER.debug(f"_get_usage_request Streaming: {response.url}")
+        else:
+            LOGGER.debug(f"_get_usage_request Response: {response.text}")
 
         # Check for response errors.
         flume_response_error("Impossible to retrieve usage alert", response)
 
+        if self._stream:
+            response_stream = JsonDataStream(response)
+            yield from self._decode_usage_alerts(response_stream)
+            return self._next_page(response_stream.document)
         response_json = response.json()
+        yield from self._decode_usage_alerts(response_json["data"])
+        return self._next_page(response_json)
+
+    def _next_page(self, response_json):
+        """Return has_next and next_page from the response pagination.
+
+        Args:
+            response_json (Object): Response from API, without data when streamed.
+
+        Returns:
+            Tuple of has_next and the path of the next page.
+        """
         if self._has_next_page(response_json):
-            self.next_page = response_json["pagination"]["next"]
-            self.has_next = True
-            LOGGER.debug(
-                f"Next page for Usage results: {self.next_page}",
-            )
-        else:
-            self.has_next = False
-            self.next_page = None
-            LOGGER.debug("No further pages for Usage results.")
-        return response_json["data"]
+            next_page = response_json["pagination"]["next"]
+            LOGGER.debug(f"Next page for Usage results: {next_page}")
+            return True, next_page
+        LOGGER.debug("No further pages for Usage results.")
+        return False, None
+
+    def _decode_usage_alerts(self, usage_alerts):
+        """Convert usage alerts to records when requested.
+
+        Args:
+            usage_alerts: Iterable of usage alerts in JSON format.
+
+        Yields:
+            Usage alerts in JSON format, or UsageAlertRecord objects.
+        """
+        if not self._records:
+            yield from usage_alerts
+            return
+        yield from (
+            UsageAlertRecord.from_json(usage_alert) for usage_alert in usage_alerts
+        )
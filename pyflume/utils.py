@@ -1,6 +1,6 @@
 """All functions to support Flume App."""
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import logging
 
@@ -15,6 +15,9 @@ def configure_logger(name):
         object: Logger Handler
     """
     logger = logging.getLogger(name)
+    if logger.handlers:
+        # Already configured, ex: the module was reloaded.
+        return logger
     logger.setLevel(logging.INFO)
 
     logger_handler = logging.StreamHandler()
@@ -95,6 +98,25 @@ def format_start_week(time):
     )
 
 
+def parse_timestamp(timestamp):
+    """
+    Parse an API timestamp such as 2020-01-15T16:33:39.000Z to epoch seconds.
+
+    Args:
+        timestamp: ISO 8601 timestamp string, None or epoch seconds.
+
+    Returns:
+        Epoch seconds as int, or None if timestamp is None.
+
+    """
+    if timestamp is None or isinstance(timestamp, int):
+        return timestamp
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
 class FlumeResponseError(Exception):
     """
     Exception raised for errors in the Flume response.
@@ -133,3 +155,21 @@ def flume_response_error(message, response):
             error_message,
         ),
     )
+
+
+class FlumeCircuitOpenError(FlumeResponseError):
+    """
+    Exception raised when a request is refused because its circuit is open.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+
+class FlumeDeadlineError(FlumeResponseError):
+    """
+    Exception raised when a request is not started because the deadline passed.
+
+    Attributes:
+        message -- explanation of the error
+    """
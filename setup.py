@@ -20,9 +20,18 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
+    entry_points={
+        "console_scripts": ["pyflume=pyflume.cli:main"],
+    },
+    extras_require={
+        "parquet": ["pyarrow"],
+        "arrow": ["pyarrow"],
+        "pandas": ["pandas"],
+        "httpx": ["httpx"],
+        "http2": ["httpx[http2]"],
+    },
     install_requires=[
         "pyjwt",
-        "ratelimit",
         "requests",
         'backports.zoneinfo; python_version<"3.9"',
     ],
@@ -0,0 +1,52 @@
+"""Shared fixtures of the Flume tests."""
+
+from unittest import mock as unittest_mock
+
+import pytest
+import requests_mock
+
+import pyflume
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_FLUME_TOKEN,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_TOKEN_FILE,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+@pytest.fixture
+def flume_api(request):
+    """Mock the Flume API for a test case, with an authenticated account.
+
+    Use with `@pytest.mark.usefixtures("flume_api")` on a unittest class.
+    The test case gets `mock`, the requests mock with the token endpoint
+    registered, `acquire`, the patched API limits, and `flume_auth`.
+
+    Args:
+        request: Pytest fixture request.
+
+    Yields:
+        None
+    """
+    with requests_mock.Mocker() as mock:
+        with unittest_mock.patch("pyflume.budget.RateBudget.acquire") as acquire:
+            mock.register_uri(
+                CONST_HTTP_METHOD_POST,
+                pyflume.constants.URL_OAUTH_TOKEN,
+                text=load_fixture(CONST_TOKEN_FILE),
+            )
+            request.instance.mock = mock
+            request.instance.acquire = acquire
+            request.instance.flume_auth = pyflume.FlumeAuth(
+                CONST_USERNAME,
+                CONST_PASSWORD,
+                CONST_CLIENT_ID,
+                CONST_CLIENT_SECRET,
+                CONST_FLUME_TOKEN,
+            )
+            yield
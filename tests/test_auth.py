@@ -1,6 +1,7 @@
 """Basic tests for flume Auth. This module contains unittest classes for testing different functionalities of flume."""
 
 # Standard library imports
+from concurrent.futures import ThreadPoolExecutor
 import unittest
 
 # Third-party imports
@@ -50,3 +51,41 @@ class TestFlumeAuth(unittest.TestCase):
             http_session=Session(),
         )
         assert auth.user_id == CONST_USER_ID  # noqa: S101
+
+        auth.user_id = "other_user"
+        auth.authorization_header = {"authorization": "Bearer other"}
+        assert auth.user_id == "other_user"  # noqa: S101
+        assert auth.authorization_header == {  # noqa: S101
+            "authorization": "Bearer other",
+        }
+        auth.retrieve_token()
+        assert auth.user_id == CONST_USER_ID  # noqa: S101
+
+    @requests_mock.Mocker()
+    def test_concurrent_authentication(self, mock):
+        """Test threads sharing an instance authenticate once.
+
+        Args:
+            mock: Requests mock.
+
+        """
+        token = mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            http_session=Session(),
+            authenticate_on_init=False,
+        )
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            headers = list(
+                executor.map(lambda _: auth.authorization_header, range(32)),  # noqa: WPS432
+            )
+        assert token.call_count == 1  # noqa: S101
+        assert all(header is headers[0] for header in headers)  # noqa: S101
+        assert auth.user_id == CONST_USER_ID  # noqa: S101
@@ -0,0 +1,113 @@
+"""Basic tests for flume circuit breaker. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+import threading
+import unittest
+
+# Third-party imports
+from requests.exceptions import Timeout
+
+# Local application/library-specific imports
+import pyflume
+from pyflume.breaker import STATE_CLOSED, STATE_OPEN
+from pyflume.utils import FlumeCircuitOpenError
+
+CONST_URL = "https://api.flumetech.com/users/1111/devices"
+
+
+class ScriptedResponse:
+    """Minimal response."""
+
+    def __init__(self, status_code):
+        """Initialize the response.
+
+        Args:
+            status_code: HTTP status code.
+        """
+        self.status_code = status_code
+
+    def close(self):
+        """Release the response."""
+
+
+class ScriptedSession:
+    """Session replaying scripted outcomes."""
+
+    def __init__(self, outcomes):
+        """Initialize the session.
+
+        Args:
+            outcomes: Status codes, Timeout or events to wait for.
+        """
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        """Replay the next outcome.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Request arguments.
+
+        Returns:
+            A response like object.
+
+        Raises:
+            Timeout: When the outcome is Timeout.
+        """
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if outcome is Timeout:
+            raise Timeout("Scripted timeout")
+        if isinstance(outcome, threading.Event):
+            outcome.wait(5)
+            return ScriptedResponse(200)  # noqa: WPS432
+        return ScriptedResponse(outcome)
+
+    def close(self):
+        """Close the session."""
+
+
+class TestCircuitBreakerSession(unittest.TestCase):
+    """Test Flume Circuit Breaker Test."""
+
+    def test_open_and_recover(self):
+        """Test the circuit opens after failures and closes after a probe."""
+        scripted = ScriptedSession([Timeout, 503, 200])  # noqa: WPS432
+        session = pyflume.CircuitBreakerSession(
+            scripted,
+            failure_threshold=2,
+            recovery_timeout=0,
+        )
+        with self.assertRaises(Timeout):
+            session.get(CONST_URL)
+        assert session.get(CONST_URL).status_code == 503  # noqa: S101, WPS432
+        assert session.state("GET", CONST_URL) == STATE_OPEN  # noqa: S101
+
+        assert session.get(CONST_URL).status_code == 200  # noqa: S101, WPS432
+        assert session.state("GET", CONST_URL) == STATE_CLOSED  # noqa: S101
+
+    def test_fail_fast(self):
+        """Test requests are refused while the circuit is open."""
+        scripted = ScriptedSession([500])  # noqa: WPS432
+        session = pyflume.CircuitBreakerSession(scripted, failure_threshold=1)
+        session.get(CONST_URL)
+        with self.assertRaises(FlumeCircuitOpenError):
+            session.get("https://api.flumetech.com/users/2222/devices")
+        assert scripted.calls == 1  # noqa: S101
+
+    def test_hedge(self):
+        """Test a slow GET is hedged and the fast copy wins."""
+        stuck = threading.Event()
+        scripted = ScriptedSession([200, stuck, 200])  # noqa: WPS432
+        session = pyflume.CircuitBreakerSession(
+            scripted,
+            hedge=True,
+            hedge_min_samples=1,
+        )
+        session.get(CONST_URL)
+        assert session.get(CONST_URL).status_code == 200  # noqa: S101, WPS432
+        assert session.hedged == 1  # noqa: S101
+        stuck.set()
+        session.close()
@@ -0,0 +1,118 @@
+"""Test the API rate budget and the polling planner."""
+
+from datetime import timedelta
+import unittest
+
+from requests import Session
+import requests_mock
+
+import pyflume
+from pyflume.utils import FlumeDeadlineError, FlumeResponseError
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_FLUME_TOKEN,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_SCAN_INTERVAL,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+class TestRateBudget(unittest.TestCase):
+    """Rate budget Test Case."""
+
+    def test_budget(self):
+        """Test taking calls until the window is used up."""
+        budget = pyflume.RateBudget(calls=2, period=60)  # noqa: WPS432
+        assert budget.remaining() == 2  # noqa: S101
+        assert budget.next_free_in() == 0  # noqa: S101
+        assert budget.acquire()  # noqa: S101
+        assert budget.acquire(blocking=False)  # noqa: S101
+
+        assert not budget.acquire(blocking=False)  # noqa: S101
+        assert 59 < budget.next_free_in() <= 60  # noqa: S101, WPS432
+        status = budget.status()
+        assert status.remaining == 0  # noqa: S101
+        assert status.queue_depth == 0  # noqa: S101
+        assert status.total_calls == 2  # noqa: S101
+
+        with pyflume.Deadline(1):
+            with self.assertRaises(FlumeDeadlineError):
+                budget.acquire()
+
+    def test_wait(self):
+        """Test waiting for the next free slot and backing off."""
+        budget = pyflume.RateBudget(calls=1, period=0.05)  # noqa: WPS432
+        budget.acquire()
+        budget.acquire()
+        assert budget.status().total_wait > 0  # noqa: S101
+
+        budget = pyflume.RateBudget()
+        budget.backoff(30)  # noqa: WPS432
+        assert budget.remaining() == 0  # noqa: S101
+        assert 29 < budget.next_free_in() <= 30  # noqa: S101, WPS432
+
+    @requests_mock.Mocker()
+    def test_too_many_requests(self, mock):
+        """Test a 429 response pushing the next call back.
+
+        Args:
+            mock: Requests mock.
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id="device_id",
+            ),
+            status_code=pyflume.data.HTTP_TOO_MANY_REQUESTS,
+            headers={"Retry-After": "120"},
+            json={"success": False, "message": "Too many requests"},
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+        budget = pyflume.RateBudget()
+        flume = pyflume.FlumeData(
+            flume_auth,
+            "device_id",
+            "America/Los_Angeles",
+            CONST_SCAN_INTERVAL,
+            http_session=Session(),
+            update_on_init=False,
+            rate_budget=budget,
+        )
+        with self.assertRaises(FlumeResponseError):
+            flume.update()
+        assert budget.remaining() == 0  # noqa: S101
+        assert budget.next_free_in() > 60  # noqa: S101, WPS432
+
+    def test_plan(self):
+        """Test the API calls of polling three devices every minute."""
+        plan = pyflume.plan_polling(3, timedelta(minutes=1))
+        assert plan.requests_per_poll == 1  # noqa: S101
+        assert plan.requests_per_hour == 180  # noqa: S101, WPS432
+        assert plan.capacity_per_hour == 120  # noqa: S101, WPS432
+        assert plan.throttled  # noqa: S101
+        assert plan.cycle_wait == 60  # noqa: S101, WPS432
+        assert plan.effective_interval == timedelta(seconds=90)  # noqa: S101, WPS432
+        assert plan.worst_staleness == timedelta(seconds=150)  # noqa: S101, WPS432
+
+        plan = pyflume.plan_polling(1, timedelta(minutes=5), queries=12)  # noqa: WPS432
+        assert plan.requests_per_poll == 2  # noqa: S101
+        assert not plan.throttled  # noqa: S101
+        assert plan.effective_interval == timedelta(minutes=5)  # noqa: S101
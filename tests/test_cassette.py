@@ -0,0 +1,120 @@
+"""Test recording and replaying HTTP exchanges."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock as unittest_mock
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, ReadTimeout
+
+import pyflume
+from pyflume.cassette import Exchange, load_cassette
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+def _usage_alerts(http_session):
+    """Return every usage alert, authenticating on a session.
+
+    Args:
+        http_session: Session or transport performing the calls.
+
+    Returns:
+        List of usage alerts.
+    """
+    flume_auth = pyflume.FlumeAuth(
+        CONST_USERNAME,
+        CONST_PASSWORD,
+        CONST_CLIENT_ID,
+        CONST_CLIENT_SECRET,
+        http_session=http_session,
+    )
+    flume_alerts = pyflume.FlumeUsageAlertList(
+        flume_auth,
+        http_session=http_session,
+        update_on_init=False,
+    )
+    return list(flume_alerts.iter_usage_alerts())
+
+
+def _usage_transport():
+    """Return an in-memory backend answering two pages of usage alerts.
+
+    Returns:
+        MemoryTransport
+    """
+    transport = pyflume.MemoryTransport()
+    transport.add(
+        CONST_HTTP_METHOD_POST,
+        pyflume.constants.URL_OAUTH_TOKEN,
+        body=load_fixture(CONST_TOKEN_FILE).encode(),
+    )
+    first_page = load_fixture("usage.json")
+    transport.add(
+        "get",
+        pyflume.constants.API_USAGE_URL.format(user_id=CONST_USER_ID),
+        body=first_page.encode(),
+    )
+    transport.add(
+        "get",
+        "{0}{1}".format(
+            pyflume.constants.API_BASE_URL,
+            json.loads(first_page)["pagination"]["next"],
+        ),
+        body=load_fixture("usage_next.json").encode(),
+    )
+    return transport
+
+
+class TestCassette(unittest.TestCase):
+    """Record and replay Test Case."""
+
+    def setUp(self):
+        """Create the cassette directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "usage.jsonl.gz")
+
+    def tearDown(self):
+        """Remove the cassette directory."""
+        self.directory.cleanup()
+
+    def test_record_replay(self):
+        """Test replaying a recorded session without network."""
+        transport = _usage_transport()
+        with pyflume.CassetteRecorder(transport, path=self.path) as recorder:
+            recorded = _usage_alerts(recorder)
+        assert len(recorded) == 100  # noqa: S101, WPS432
+        assert len(load_cassette(self.path)) == 3  # noqa: S101
+
+        replay = pyflume.ReplayTransport(self.path, speed=0)
+        assert _usage_alerts(replay) == recorded  # noqa: S101
+        with self.assertRaises(RequestsConnectionError):
+            _usage_alerts(replay)
+
+    @unittest_mock.patch("pyflume.cassette.time.sleep")
+    def test_speed(self, sleep):
+        """Test replaying at accelerated speed.
+
+        Args:
+            sleep: Patched sleep.
+        """
+        url = pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID)
+        exchange = Exchange("GET", url, 200, {}, b'{"data": []}', 2)  # noqa: WPS432
+        replay = pyflume.ReplayTransport([exchange], speed=4, loop=True)
+
+        assert replay.request("GET", url).json() == {"data": []}  # noqa: S101
+        sleep.assert_called_with(0.5)  # noqa: WPS432
+
+        with self.assertRaises(ReadTimeout):
+            replay.request("GET", url, timeout=(1, 0.25))  # noqa: WPS432
+        sleep.assert_called_with(0.25)  # noqa: WPS432
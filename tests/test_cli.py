@@ -0,0 +1,141 @@
+"""Test the pyflume command line interface."""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock as unittest_mock
+
+import pytest
+
+import pyflume
+from pyflume.cli import main
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+DEVICE_ID = "6248148189204194987"
+CREDENTIALS = (
+    "--username",
+    CONST_USERNAME,
+    "--password",
+    CONST_PASSWORD,
+    "--client-id",
+    CONST_CLIENT_ID,
+    "--client-secret",
+    CONST_CLIENT_SECRET,
+)
+
+
+def _query_callback(request, context):
+    """Return one bucket per query, at its since_datetime.
+
+    Args:
+        request: Query request.
+        context: Response context.
+
+    Returns:
+        Query response JSON.
+    """
+    return {
+        "success": True,
+        "data": [
+            {
+                query["request_id"]: [
+                    {"datetime": query["since_datetime"], "value": 1.5},
+                ]
+                for query in request.json()["queries"]
+            },
+        ],
+    }
+
+
+@pytest.mark.usefixtures("flume_api")
+class TestCli(unittest.TestCase):
+    """Command line Test Case."""
+
+    def setUp(self):
+        """Create the output directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, "export")
+
+    def tearDown(self):
+        """Remove the output directory."""
+        self.directory.cleanup()
+
+    def test_export_devices(self):
+        """Test exporting devices as NDJSON."""
+        self._register_devices()
+        main(["export", "devices", "--output", self.output, *CREDENTIALS])
+
+        with open(self.output) as export_file:
+            devices = [json.loads(line) for line in export_file]
+        assert [device["id"] for device in devices] == [DEVICE_ID]  # noqa: S101
+
+    def test_export_usage(self):
+        """Test exporting usage as CSV in several query windows."""
+        self._register_devices()
+        query = self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id=DEVICE_ID,
+            ),
+            json=_query_callback,
+        )
+        main(
+            [
+                "export",
+                "usage",
+                "--format",
+                "csv",
+                "--output",
+                self.output,
+                "--bucket",
+                "MIN",
+                "--since",
+                "2024-01-01",
+                "--until",
+                "2024-01-07",
+                *CREDENTIALS,
+            ],
+        )
+
+        with open(self.output, newline="") as export_file:
+            rows = list(csv.DictReader(export_file))
+        # 12 hour windows over 6 days, at most 10 queries per request.
+        assert len(rows) == 12  # noqa: S101, WPS432
+        assert query.call_count == 2  # noqa: S101
+        assert rows[1]["datetime"] == "2024-01-01 12:00:00"  # noqa: S101
+        assert rows[0]["device_id"] == DEVICE_ID  # noqa: S101
+        assert self.acquire.call_count == 2  # noqa: S101
+
+    @unittest_mock.patch("sys.stdout", new_callable=io.StringIO)
+    def test_plan(self, stdout):
+        """Test planning polling without credentials.
+
+        Args:
+            stdout: Captured standard output.
+        """
+        with unittest_mock.patch.dict(os.environ, clear=True):
+            main(["plan", "--devices", "3", "--scan-interval", "60"])
+        plan = json.loads(stdout.getvalue())
+        assert plan["throttled"]  # noqa: S101
+        assert plan["effective_interval"] == 90  # noqa: S101, WPS432
+
+    def _register_devices(self):
+        """Register the devices URL."""
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            text=load_fixture("devices.json"),
+        )
@@ -0,0 +1,153 @@
+"""Basic tests for flume request coalescing. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import unittest
+from unittest import mock as unittest_mock
+
+# Local application/library-specific imports
+import pyflume
+from pyflume.budget import defer_call
+
+
+class SlowSession:
+    """Session counting calls and blocking until released."""
+
+    def __init__(self):
+        """Initialize the session."""
+        self.calls = 0
+        self.release = threading.Event()
+        self.fail = False
+
+    def request(self, method, url, **kwargs):
+        """Count the call and wait for release.
+
+        Args:
+            method: HTTP method.
+            url: Request URL.
+            kwargs: Request arguments.
+
+        Returns:
+            A response like object.
+
+        Raises:
+            ConnectionError: If the calls fail.
+        """
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("Connection reset")
+        return SlowResponse(url)
+
+
+class SlowResponse:
+    """Minimal response."""
+
+    def __init__(self, url):
+        """Initialize the response.
+
+        Args:
+            url: Request URL.
+        """
+        self.content = url.encode()  # noqa: WPS110
+
+
+class TestCoalescingSession(unittest.TestCase):
+    """Test Flume Request Coalescing Test."""
+
+    def setUp(self):
+        """Create a coalescing session over a slow session."""
+        self.slow_session = SlowSession()
+        self.session = pyflume.CoalescingSession(self.slow_session)
+
+    def test_coalesce(self):
+        """Test identical concurrent requests share one call."""
+
+        def query(payload):  # noqa: WPS430
+            return self.session.post("https://example.com/query", json=payload)
+
+        payloads = [
+            {"a": 1, "b": 2},
+            {"b": 2, "a": 1},
+            {"a": 1, "b": 2},
+            {"a": 2},
+        ]
+        futures = self._call_concurrently(query, payloads, coalesced=2)
+        responses = [future.result() for future in futures]
+        assert self.slow_session.calls == 2  # noqa: S101
+        assert responses[0] is responses[1]  # noqa: S101
+        assert responses[1] is responses[2]  # noqa: S101
+        assert responses[3] is not responses[0]  # noqa: S101
+
+    def test_budget_taken_once(self):
+        """Test coalesced callers take no call from a deferred budget."""
+        rate_budget = pyflume.RateBudget()
+
+        def query(payload):  # noqa: WPS430
+            with defer_call(rate_budget):
+                return self.session.post("https://example.com/query", json=payload)
+
+        with unittest_mock.patch.object(rate_budget, "acquire") as acquire:
+            payloads = [
+                {"a": 1},
+                {"a": 1},
+                {"a": 1},
+                {"a": 2},
+            ]
+            futures = self._call_concurrently(query, payloads, coalesced=2)
+            for future in futures:
+                future.result()
+            assert acquire.call_count == 2  # noqa: S101
+        assert self.slow_session.calls == 2  # noqa: S101
+
+    def test_failure_propagation(self):
+        """Test a failed call raises in every waiting caller, then is retried."""
+        self.slow_session.fail = True
+
+        def query(payload):  # noqa: WPS430
+            return self.session.post("https://example.com/query", json=payload)
+
+        futures = self._call_concurrently(
+            query,
+            [{"a": 1}, {"a": 1}, {"a": 1}],
+            coalesced=2,
+        )
+        errors = [future.exception() for future in futures]
+        assert self.slow_session.calls == 1  # noqa: S101
+        assert isinstance(errors[0], ConnectionError)  # noqa: S101
+        assert all(raised is errors[0] for raised in errors)  # noqa: S101
+
+        self.slow_session.fail = False
+        assert query({"a": 1}).content == b"https://example.com/query"  # noqa: S101
+        assert self.slow_session.calls == 2  # noqa: S101
+
+    def test_stream_not_coalesced(self):
+        """Test streamed requests are always sent and take their deferred call."""
+        self.slow_session.release.set()
+        rate_budget = pyflume.RateBudget()
+        with unittest_mock.patch.object(rate_budget, "acquire") as acquire:
+            for _ in range(2):
+                with defer_call(rate_budget):
+                    self.session.get("https://example.com/devices", stream=True)
+            assert acquire.call_count == 2  # noqa: S101
+        assert self.slow_session.calls == 2  # noqa: S101
+        assert self.session.coalesced == 0  # noqa: S101
+
+    def _call_concurrently(self, query, payloads, coalesced):
+        """Call query with every payload at once, release the calls when coalesced.
+
+        Args:
+            query: Function sending a payload through the session.
+            payloads: Payloads sent concurrently.
+            coalesced: Number of calls expected to wait for an identical one.
+
+        Returns:
+            Completed futures of the calls, in payload order.
+        """
+        with ThreadPoolExecutor(len(payloads)) as executor:
+            futures = [executor.submit(query, payload) for payload in payloads]
+            while self.session.coalesced < coalesced:
+                threading.Event().wait(0.01)  # noqa: WPS432
+            self.slow_session.release.set()
+        return futures
@@ -0,0 +1,75 @@
+"""Test columnar conversion of query responses."""
+
+import importlib.util  # noqa: WPS301
+import json
+import unittest
+from types import SimpleNamespace
+
+from pyflume import columnar
+
+from .utils import load_fixture
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
+TIME_ZONE = "America/Los_Angeles"
+
+
+def _responses():
+    """Return the responses of the query fixture.
+
+    Returns:
+        Dict of request_id to buckets.
+    """
+    return json.loads(load_fixture("query.json"))["data"][0]
+
+
+class TestColumnar(unittest.TestCase):
+    """Columnar conversion Test Case."""
+
+    def setUp(self):
+        """Load the query fixture."""
+        self.responses = _responses()
+        self.rows = sum(len(buckets) for buckets in self.responses.values())
+        self.devices = [
+            SimpleNamespace(
+                responses=self.responses,
+                device_id=device_id,
+                device_tz=TIME_ZONE,
+            )
+            for device_id in ("a", "b")
+        ]
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_to_arrow(self):
+        """Test building an Arrow table with typed columns."""
+        import pyarrow  # noqa: WPS433
+
+        table = columnar.to_arrow(self.responses, "device", TIME_ZONE)
+        assert table.num_rows == self.rows  # noqa: S101
+        assert table.schema.field("value").type == pyarrow.float64()  # noqa: S101
+        assert table.schema.field("datetime").type == pyarrow.timestamp(  # noqa: S101
+            "s",
+            tz=TIME_ZONE,
+        )
+        rows = table.to_pylist()
+        assert rows[0]["request_id"] == "current_interval"  # noqa: S101
+        assert rows[0]["datetime"] is None  # noqa: S101
+        assert rows[0]["device_id"] == "device"  # noqa: S101
+
+        joined = columnar.devices_to_arrow(self.devices)
+        assert joined.num_rows == 2 * self.rows  # noqa: S101
+        assert joined["device_id"].unique().to_pylist() == ["a", "b"]  # noqa: S101
+
+    @unittest.skipUnless(HAS_PANDAS, "pandas is not installed")
+    def test_to_pandas(self):
+        """Test building a DataFrame with datetime64 timestamps."""
+        frame = columnar.to_pandas(self.responses)
+        assert len(frame) == self.rows  # noqa: S101
+        assert str(frame["value"].dtype) == "float64"  # noqa: S101
+        assert frame["datetime"].dtype.kind == "M"  # noqa: S101
+        month = frame[frame["request_id"] == "month_to_date"]
+        assert str(month["datetime"].iloc[0]) == "2020-05-01 00:00:00"  # noqa: S101
+
+        joined = columnar.devices_to_pandas(self.devices)
+        assert len(joined) == 2 * self.rows  # noqa: S101
+        assert str(joined["datetime"].dt.tz) == "UTC"  # noqa: S101
@@ -4,6 +4,7 @@
 import unittest
 
 # Third-party imports
+import pytest
 from requests import Session
 import requests_mock
 
@@ -76,3 +77,54 @@ class TestFlumeData(unittest.TestCase):
             "last_24_hrs": 258.9557672,
             "last_30_days": 5433.56753264,
         }
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_units(self):
+        """Test values converted locally to other units."""
+        query = self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id="device_id",
+            ),
+            text=load_fixture("query.json"),
+        )
+
+        flume = pyflume.FlumeData(
+            self.flume_auth,
+            "device_id",
+            "America/Los_Angeles",
+            CONST_SCAN_INTERVAL,
+            update_on_init=False,
+            units=["LITERS", "CUBIC_FEET"],
+        )
+        flume.update_force()
+        assert query.call_count == 1  # noqa: S101
+        liters = flume.unit_values["LITERS"]
+        self.assertAlmostEqual(liters["today"], 214.5435, places=4)  # noqa: WPS432
+        cubic_feet = flume.values_in("CUBIC_FEET")
+        self.assertAlmostEqual(cubic_feet["today"], 7.5765, places=4)  # noqa: WPS432
+        self.assertAlmostEqual(
+            flume.values_in("CUBIC_METERS")["today"],
+            0.2145,  # noqa: WPS432
+            places=4,
+        )
+        buckets = flume.responses_in("LITERS")["today"]
+        self.assertAlmostEqual(buckets[0]["value"], 214.5435, places=4)  # noqa: WPS432
+        self.assertAlmostEqual(
+            flume.responses["today"][0]["value"],
+            56.6763912,  # noqa: WPS432
+        )
+
+        with self.assertRaises(ValueError):
+            flume.values_in("BARRELS")
+
+        flume.values = {"today": 1}
+        assert flume.state.values == {"today": 1}  # noqa: S101
+        self.assertAlmostEqual(
+            flume.state.unit_values["LITERS"]["today"],
+            3.7854,  # noqa: WPS432
+            places=4,
+        )
+        flume.query_payload = {"queries": [{"request_id": "today", "units": "LITERS"}]}
+        assert flume.unit_values["LITERS"]["today"] == 1  # noqa: S101
@@ -0,0 +1,104 @@
+"""Test deadline propagation across requests."""
+
+import time
+import unittest
+
+import pytest
+import requests_mock
+
+import pyflume
+from pyflume.utils import FlumeDeadlineError
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+DEVICES_URL = pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID)
+
+
+class TestDeadline(unittest.TestCase):
+    """Deadline Test Case."""
+
+    @requests_mock.Mocker()
+    def test_deadline(self, mock):
+        """Test token and device requests sharing one deadline.
+
+        Args:
+            mock: Requests mock.
+        """
+        token = mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        devices = mock.register_uri(
+            "get",
+            DEVICES_URL,
+            text=load_fixture("devices.json"),
+        )
+
+        with pyflume.Deadline(10, connect_timeout=2):
+            with pyflume.Deadline(60) as inner:
+                assert inner.remaining() <= 10  # noqa: S101
+            flume_auth = pyflume.FlumeAuth(
+                CONST_USERNAME,
+                CONST_PASSWORD,
+                CONST_CLIENT_ID,
+                CONST_CLIENT_SECRET,
+            )
+            pyflume.FlumeDeviceList(flume_auth)
+
+        for request in (token.last_request, devices.last_request):
+            assert request.timeout[0] == 2  # noqa: S101
+            assert 0 < request.timeout[1] <= 10  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_expired(self):
+        """Test no request is sent once the deadline has run out."""
+        devices = self.mock.register_uri(
+            "get",
+            DEVICES_URL,
+            text=load_fixture("devices.json"),
+        )
+        with self.assertRaises(FlumeDeadlineError):
+            with pyflume.Deadline(0.01):  # noqa: WPS432
+                time.sleep(0.02)  # noqa: WPS432
+                pyflume.FlumeDeviceList(self.flume_auth)
+        assert devices.call_count == 0  # noqa: S101
+
+        pyflume.FlumeDeviceList(self.flume_auth)
+        default_timeout = pyflume.constants.DEFAULT_TIMEOUT
+        assert devices.last_request.timeout == default_timeout  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_pages(self):
+        """Test following pages stops once the deadline has run out."""
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_NOTIFICATIONS_URL.format(user_id=CONST_USER_ID),
+            json={"data": [{"id": 1}], "pagination": {"next": "/next"}},
+        )
+        next_page = self.mock.register_uri(
+            "get",
+            "{0}/next".format(pyflume.constants.API_BASE_URL),
+            json={"data": [{"id": 2}], "pagination": None},
+        )
+        flume_notifications = pyflume.FlumeNotificationList(
+            self.flume_auth,
+            update_on_init=False,
+        )
+
+        with pyflume.Deadline(0.05):  # noqa: WPS432
+            notifications = flume_notifications.iter_notifications()
+            assert next(notifications) == {"id": 1}  # noqa: S101
+            time.sleep(0.06)  # noqa: WPS432
+            with self.assertRaises(FlumeDeadlineError):
+                next(notifications)
+        assert next_page.call_count == 0  # noqa: S101
@@ -0,0 +1,191 @@
+"""Basic tests for flume leak detector. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+from datetime import datetime, timedelta
+import unittest
+
+# Third-party imports
+import pytest
+
+# Local application/library-specific imports
+import pyflume
+from pyflume.data import MINUTES_REQUEST_ID
+from pyflume.detector import (
+    ANOMALY_CONTINUOUS_FLOW,
+    ANOMALY_OVERNIGHT_USAGE,
+    ANOMALY_SPIKE,
+)
+
+try:
+    from zoneinfo import ZoneInfo  # noqa: WPS433
+except ImportError:  # Python < 3.9
+    from backports.zoneinfo import ZoneInfo  # noqa: WPS433,WPS440
+
+from .constants import CONST_HTTP_METHOD_POST, CONST_USER_ID
+
+DEVICE_TZ = "America/Los_Angeles"
+SPIKE_MINUTE = 20
+
+
+def _spike_minutes(request, context):
+    """Return minutes of 0.1 gallon with a 10 gallon spike, and their sum.
+
+    Args:
+        request: Query request.
+        context: Response context.
+
+    Returns:
+        Query response JSON.
+    """
+    query_results = {}
+    for query in request.json()["queries"]:
+        since = datetime.fromisoformat(query["since_datetime"])
+        minutes = int(
+            (datetime.fromisoformat(query["until_datetime"]) - since).total_seconds(),
+        ) // 60 + 1
+        buckets = [
+            {
+                "datetime": (since + timedelta(minutes=minute)).isoformat(sep=" "),
+                "value": 10 if minute == SPIKE_MINUTE else 0.1,  # noqa: WPS432
+            }
+            for minute in range(minutes)
+        ]
+        if query["request_id"] == MINUTES_REQUEST_ID:
+            query_results[query["request_id"]] = buckets
+        else:
+            query_results[query["request_id"]] = [
+                {"value": sum(bucket["value"] for bucket in buckets)},
+            ]
+    return {"success": True, "data": [query_results]}
+
+
+class TestFlumeLeakDetector(unittest.TestCase):
+    """Test Flume Leak Detector Test."""
+
+    def test_detector(self):
+        """Test continuous flow, spikes and overnight usage are flagged once."""
+        detector = pyflume.FlumeLeakDetector(
+            continuous_flow_minutes=30,  # noqa: WPS432
+            warmup_samples=10,
+        )
+        timestamp = datetime(2023, 1, 1, 12, 0)  # noqa: WPS432
+        kinds = []
+        for minute in range(40):  # noqa: WPS432
+            anomalies = detector.observe(
+                "device_id",
+                10 if minute == 35 else 0.5,  # noqa: WPS432
+                1,
+                timestamp + timedelta(minutes=minute),
+            )
+            kinds.extend(anomaly.kind for anomaly in anomalies)
+        assert kinds == [ANOMALY_CONTINUOUS_FLOW, ANOMALY_SPIKE]  # noqa: S101
+        assert not detector.observe("device_id", None, 1, timestamp)  # noqa: S101
+
+    def test_overnight_usage(self):
+        """Test overnight usage is flagged once per night."""
+        detector = pyflume.FlumeLeakDetector(overnight_threshold=20)  # noqa: WPS432
+        night = datetime(2023, 1, 2, 2, 0)  # noqa: WPS432
+        overnight = [
+            anomaly.kind
+            for minute in range(10)
+            for anomaly in detector.observe(
+                "other_device",
+                3,
+                1,
+                night + timedelta(minutes=minute),
+            )
+        ]
+        assert overnight == [ANOMALY_OVERNIGHT_USAGE]  # noqa: S101
+
+    def test_overnight_across_midnight(self):
+        """Test an overnight window spanning midnight counts as one night."""
+        detector = pyflume.FlumeLeakDetector(
+            overnight_hours=(23, 5),  # noqa: WPS432
+            overnight_threshold=5,
+        )
+
+        def overnight(hour, day=1, gallons=3):  # noqa: WPS430
+            return [
+                anomaly.value
+                for anomaly in detector.observe(
+                    "device_id",
+                    gallons,
+                    1,
+                    datetime(2023, 1, day, hour, 30),  # noqa: WPS432
+                )
+            ]
+
+        assert not overnight(22)  # noqa: S101, WPS432
+        assert not overnight(23)  # noqa: S101, WPS432
+        assert overnight(4, day=2) == [6]  # noqa: S101
+        assert not overnight(5, day=2)  # noqa: S101
+        assert not overnight(23, day=2)  # noqa: S101, WPS432
+        assert overnight(0, day=3) == [6]  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_data_minutes(self):
+        """Test FlumeData feeds each minute of current_interval to the detector."""
+        self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id="device_id",
+            ),
+            json=_spike_minutes,
+        )
+        flume_data = pyflume.FlumeData(
+            self.flume_auth,
+            "device_id",
+            DEVICE_TZ,
+            timedelta(minutes=30),  # noqa: WPS432
+            update_on_init=False,
+            query_keys=["current_interval"],
+            leak_detector=pyflume.FlumeLeakDetector(warmup_samples=10),
+        )
+        until = datetime(2023, 1, 1, 12, 0, tzinfo=ZoneInfo(DEVICE_TZ))  # noqa: WPS432
+        flume_data.update(until)
+
+        since = datetime(2023, 1, 1, 11, 30)  # noqa: WPS432
+        assert [  # noqa: S101
+            (anomaly.kind, anomaly.timestamp) for anomaly in flume_data.anomalies
+        ] == [(ANOMALY_SPIKE, since + timedelta(minutes=SPIKE_MINUTE + 1))]
+        assert self.acquire.call_count == 1  # noqa: S101
+
+    def test_overnight_boundaries(self):
+        """Test the overnight window includes its start hour only."""
+        detector = pyflume.FlumeLeakDetector(overnight_threshold=5)
+        night = datetime(2023, 1, 2, 0, 59)  # noqa: WPS432
+        observed = [
+            detector.observe("device_id", 3, 1, night + timedelta(hours=hours))
+            for hours in (0, 0.5, 4, 4.5)  # noqa: WPS432
+        ]
+        # 00:59 and 05:29 are outside (1, 5), 01:29 and 04:59 are inside.
+        assert [len(anomalies) for anomalies in observed] == [0, 0, 1, 0]  # noqa: S101
+
+    def test_continuous_flow_reset(self):
+        """Test continuous flow alerts again only after the flow stops."""
+        detector = pyflume.FlumeLeakDetector(continuous_flow_minutes=3)
+        timestamp = datetime(2023, 1, 1, 12, 0)  # noqa: WPS432
+        flows = [1, 1, 1, 1, 0, 1, 1, 1]
+        kinds = [
+            [
+                anomaly.kind
+                for anomaly in detector.observe("device_id", flow, 1, timestamp)
+            ]
+            for flow in flows
+        ]
+        assert kinds == [  # noqa: S101
+            [],
+            [],
+            [ANOMALY_CONTINUOUS_FLOW],
+            [],
+            [],
+            [],
+            [],
+            [ANOMALY_CONTINUOUS_FLOW],
+        ]
+
+        assert not detector.observe("device_id", 1, 0, timestamp)  # noqa: S101
+        detector.reset("device_id")
+        detector.reset("unknown_device")
+        assert not detector.observe("device_id", 1, 1, timestamp)  # noqa: S101
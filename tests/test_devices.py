@@ -2,6 +2,7 @@
 
 # Standard library imports
 import unittest
+from unittest import mock as unittest_mock
 
 # Third-party imports
 import requests_mock
@@ -19,7 +20,7 @@ from .constants import (
     CONST_USER_ID,
     CONST_USERNAME,
 )
-from .utils import load_fixture
+from .utils import UPDATES, generation_callback, load_fixture, read_while_updating
 
 
 class TestFlumeDeviceList(unittest.TestCase):
@@ -55,3 +56,40 @@ class TestFlumeDeviceList(unittest.TestCase):
         devices = flume_devices.get_devices()
         assert len(devices) == 1  # noqa: S101
         assert devices[0][CONST_USER_ID] == 1111  # noqa: S101,WPS432
+
+    @unittest_mock.patch("pyflume.devices.time")
+    @requests_mock.Mocker()
+    def test_concurrent_update(self, clock, mock):
+        """Test readers never see devices and update time of different updates.
+
+        Args:
+            clock: Patched time, counting updates.
+            mock: Requests mock.
+
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            json=generation_callback(),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+
+        devices = pyflume.FlumeDeviceList(flume_auth, update_on_init=False)
+        for state in read_while_updating(devices, clock):
+            entries = state.device_list
+            assert len(entries) == (state.last_updated or 0)  # noqa: S101
+            assert all(  # noqa: S101
+                entry["id"] == state.last_updated for entry in entries
+            )
+        assert devices.last_updated == UPDATES  # noqa: S101
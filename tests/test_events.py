@@ -0,0 +1,144 @@
+"""Basic tests for flume events. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+import asyncio
+import unittest
+
+# Third-party imports
+from requests import Session
+import requests_mock
+
+# Local application/library-specific imports
+import pyflume
+from pyflume.events import LeakCleared, LeakDetected, ValueChanged
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_FLUME_TOKEN,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_SCAN_INTERVAL,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+class TestFlumeEventStream(unittest.TestCase):
+    """Test Flume Event Stream Test."""
+
+    @requests_mock.Mocker()
+    def test_value_events(self, mock):
+        """Test that FlumeData only emits changed values.
+
+        Args:
+            mock: Requests mock.
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id="device_id",
+            ),
+            text=load_fixture("query.json"),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+        event_stream = pyflume.FlumeEventStream()
+        events = []
+        event_stream.subscribe(events.append)
+
+        flume = pyflume.FlumeData(
+            flume_auth,
+            "device_id",
+            "America/Los_Angeles",
+            CONST_SCAN_INTERVAL,
+            http_session=Session(),
+            update_on_init=False,
+            event_stream=event_stream,
+        )
+        flume.update_force()
+        assert len(events) == 7  # noqa: S101
+        assert events[0] == ValueChanged(  # noqa: S101
+            "device_id",
+            "current_interval",
+            None,
+            14.38855184,  # noqa: WPS432
+        )
+
+        flume.update_force()
+        assert len(events) == 7  # noqa: S101
+
+    def test_leak_events(self):
+        """Test leak deltas are delivered to async iterators."""
+        event_stream = pyflume.FlumeEventStream()
+
+        async def collect():  # noqa: WPS430
+            iterator = event_stream.__aiter__()  # noqa: WPS609
+            pending = asyncio.ensure_future(iterator.__anext__())  # noqa: WPS609
+            await asyncio.sleep(0)
+            event_stream.publish_leaks("device_id", [{"id": 1}])
+            first = await pending
+            event_stream.publish_leaks("device_id", [{"id": 1}])
+            event_stream.publish_leaks("device_id", [])
+            second = await iterator.__anext__()  # noqa: WPS609
+            await iterator.aclose()
+            return first, second
+
+        first, second = asyncio.run(collect())
+        assert first == LeakDetected("device_id", {"id": 1})  # noqa: S101
+        assert second == LeakCleared("device_id", {"id": 1})  # noqa: S101
+
+    def test_iterator_registered_when_created(self):
+        """Test events emitted before the first __anext__ are delivered."""
+        event_stream = pyflume.FlumeEventStream()
+
+        async def collect():  # noqa: WPS430
+            iterator = event_stream.__aiter__()  # noqa: WPS609
+            event_stream.publish_leaks("device_id", [{"id": 1}])
+            first = await iterator.__anext__()  # noqa: WPS609
+            await iterator.aclose()
+            event_stream.publish_leaks("device_id", [])
+            return first, iterator.queue.empty()
+
+        first, empty = asyncio.run(collect())
+        assert first == LeakDetected("device_id", {"id": 1})  # noqa: S101
+        assert empty  # noqa: S101
+
+    def test_closed_loop_removed(self):
+        """Test an iterator of a closed event loop is removed on emit."""
+        event_stream = pyflume.FlumeEventStream()
+        events = []
+        event_stream.subscribe(events.append)
+
+        async def open_iterator():  # noqa: WPS430
+            return event_stream.__aiter__()  # noqa: WPS609
+
+        asyncio.run(open_iterator())
+        event_stream.publish_leaks("device_id", [{"id": 1}])
+        event_stream.publish_leaks("device_id", [])
+        assert len(events) == 2  # noqa: S101
+        assert not event_stream._subscribers  # noqa: S101, WPS437
+
+    def test_notification_history(self):
+        """Test only the most recent notification ids are remembered."""
+        event_stream = pyflume.FlumeEventStream(notification_history=2)
+        events = event_stream.publish_notifications(
+            [{"id": 1}, {"id": 2}, {"id": 3}],
+        )
+        assert len(events) == 3  # noqa: S101
+        assert list(event_stream._notification_ids) == [2, 3]  # noqa: S101, WPS437
+        assert not event_stream.publish_notifications([{"id": 3}])  # noqa: S101
+        assert len(event_stream.publish_notifications([{"id": 1}])) == 1  # noqa: S101
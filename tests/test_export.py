@@ -0,0 +1,102 @@
+"""Test the export writers and dataset iterators."""
+
+from datetime import datetime, timedelta
+import importlib.util  # noqa: WPS301
+import io
+import unittest
+
+import pytest
+
+import pyflume
+from pyflume.export import (
+    LEAK_COLUMNS,
+    USAGE_ALERT_COLUMNS,
+    ParquetWriter,
+    iter_usage,
+    open_writer,
+)
+
+try:
+    from zoneinfo import ZoneInfo  # noqa: WPS433
+except ImportError:  # Python < 3.9
+    from backports.zoneinfo import ZoneInfo  # noqa: WPS433,WPS440
+
+from .constants import CONST_HTTP_METHOD_POST, CONST_USER_ID
+
+DEVICE_ID = "6248148189204194987"
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+DEVICE_TZ = "America/Los_Angeles"
+
+
+class TestWriters(unittest.TestCase):
+    """Export writers Test Case."""
+
+    def test_csv_columns(self):
+        """Test CSV rows with a key missing from the columns."""
+        output = io.StringIO()
+        writer = open_writer("csv", output)
+        writer.write({"id": 1, "name": "sensor"})
+        writer.write({"id": 2})
+        assert output.getvalue().splitlines() == [  # noqa: S101
+            "id,name",
+            "1,sensor",
+            "2,",
+        ]
+        writer.write({"id": 3, "location": "garden"})
+        assert output.getvalue().splitlines()[-1] == "3,"  # noqa: S101
+
+    def test_csv_dataset_columns(self):
+        """Test CSV rows of a dataset are written in its fixed columns."""
+        output = io.StringIO()
+        writer = open_writer("csv", output, LEAK_COLUMNS)
+        writer.write({"device_id": DEVICE_ID})
+        writer.write({"active": True, "device_id": DEVICE_ID, "extra": 1})
+        assert output.getvalue().splitlines() == [  # noqa: S101
+            "device_id,active",
+            "{0},".format(DEVICE_ID),
+            "{0},True".format(DEVICE_ID),
+        ]
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_parquet_dataset_columns(self):
+        """Test a column that is null in the first row group is typed."""
+        import pyarrow.parquet  # noqa: WPS301,WPS433
+
+        output = io.BytesIO()
+        writer = ParquetWriter(output, USAGE_ALERT_COLUMNS, batch_size=1)
+        writer.write({"id": 1, "device_id": DEVICE_ID, "query": None})
+        writer.write({"id": 2, "device_id": DEVICE_ID, "query": {"bucket": "MIN"}})
+        writer.close()
+        table = pyarrow.parquet.read_table(io.BytesIO(output.getvalue()))
+        assert table.num_rows == 2  # noqa: S101
+        assert table.column("query").to_pylist() == [  # noqa: S101
+            None,
+            '{"bucket": "MIN"}',
+        ]
+        assert table.schema.field("flume_leak").type == pyarrow.bool_()  # noqa: S101
+
+
+@pytest.mark.usefixtures("flume_api")
+class TestIterUsage(unittest.TestCase):
+    """Usage export Test Case."""
+
+    def test_until_now(self):
+        """Test usage ending at the current minute of the device time zone."""
+        query = self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id=DEVICE_ID,
+            ),
+            json={"success": True, "data": [{}]},
+        )
+        device_now = datetime.now(ZoneInfo(DEVICE_TZ)).replace(tzinfo=None)
+        since = device_now.replace(second=0, microsecond=0) - timedelta(hours=1)
+        device = {"id": DEVICE_ID, "type": 2, "location": {"tz": DEVICE_TZ}}
+        list(iter_usage(self.flume_auth, [device], since, None, "MIN"))
+
+        until = datetime.fromisoformat(
+            query.last_request.json()["queries"][0]["until_datetime"],
+        )
+        assert since < until <= device_now  # noqa: S101
+        assert device_now - until < timedelta(minutes=2)  # noqa: S101
@@ -0,0 +1,77 @@
+"""Basic tests for flume lazy import and construction. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+import subprocess  # noqa: S404
+import sys
+import unittest
+
+# Third-party imports
+import requests_mock
+
+# Local application/library-specific imports
+import pyflume
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+class TestFlumeLazy(unittest.TestCase):
+    """Test Flume Lazy Import and Construction Test."""
+
+    def test_lazy_import(self):
+        """Test importing pyflume does not import its dependencies."""
+        imported = subprocess.check_output(  # noqa: S603
+            [
+                sys.executable,
+                "-c",
+                "import sys, pyflume; "
+                + "print(sorted({'requests', 'jwt', 'ratelimit'} & set(sys.modules)))",
+            ],
+            text=True,
+        )
+        assert imported.strip() == "[]"  # noqa: S101
+
+    @requests_mock.Mocker()
+    def test_construct_without_requests(self, mock):
+        """Test objects built without fetching on init only fetch when asked.
+
+        Args:
+            mock: Requests mock.
+        """
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            authenticate_on_init=False,
+        )
+        flume_devices = pyflume.FlumeDeviceList(flume_auth, update_on_init=False)
+        flume_notifications = pyflume.FlumeNotificationList(
+            flume_auth,
+            update_on_init=False,
+        )
+        assert not mock.called  # noqa: S101
+        assert not flume_devices.device_list  # noqa: S101
+        assert not flume_notifications.notification_list  # noqa: S101
+
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            text=load_fixture("devices.json"),
+        )
+        flume_devices.update()
+        assert flume_auth.user_id == CONST_USER_ID  # noqa: S101
+        assert len(flume_devices.device_list) == 1  # noqa: S101
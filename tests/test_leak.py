@@ -1,9 +1,12 @@
 """Basic tests for flume leaks. This module contains unittest classes for testing different functionalities of flume."""
 
 # Standard library imports
+import json
 import unittest
+from unittest import mock as unittest_mock
 
 # Third-party imports
+import pytest
 import requests_mock
 
 # Local application/library-specific imports
@@ -19,7 +22,12 @@ from .constants import (
     CONST_USER_ID,
     CONST_USERNAME,
 )
-from .utils import load_fixture
+from .utils import UPDATES, generation_callback, load_fixture, read_while_updating
+
+LEAK_URL = pyflume.constants.API_LEAK_URL.format(
+    user_id=CONST_USER_ID,
+    device_id="6248148189204194987",
+)
 
 
 class TestFlumeLeakList(unittest.TestCase):
@@ -60,3 +68,86 @@ class TestFlumeLeakList(unittest.TestCase):
         alerts = flume_leaks.get_leaks()
         assert len(alerts) == 1  # noqa: S101
         assert alerts[0]["active"]  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_all_leaks(self):
+        """Test following leak pages one after another without a count."""
+        page = json.loads(load_fixture("leak.json"))
+        page["count"] = None
+        self.mock.register_uri(
+            "get",
+            "{0}?offset=0".format(LEAK_URL),
+            json=dict(
+                page,
+                data=[{"active": True, "id": 1}],
+                pagination={"next": "2"},
+            ),
+        )
+        self.mock.register_uri(
+            "get",
+            "{0}?offset=1".format(LEAK_URL),
+            json=dict(page, data=[{"active": False, "id": 2}]),
+        )
+
+        flume_leaks = pyflume.FlumeLeakList(
+            self.flume_auth,
+            "6248148189204194987",
+            update_on_init=False,
+        )
+        alerts = flume_leaks.get_all_leaks(workers=2)
+        assert [alert["id"] for alert in alerts] == [1, 2]  # noqa: S101
+        assert self.acquire.call_count == 0  # noqa: S101
+
+        flume_leaks = pyflume.FlumeLeakList(
+            self.flume_auth,
+            "6248148189204194987",
+            update_on_init=False,
+            rate_budget=pyflume.RateBudget(),
+        )
+        alerts = flume_leaks.get_all_leaks(workers=2)
+        assert [alert["id"] for alert in alerts] == [1, 2]  # noqa: S101
+        assert self.acquire.call_count == 2  # noqa: S101
+
+    @unittest_mock.patch("pyflume.leak.time")
+    @requests_mock.Mocker()
+    def test_concurrent_update(self, clock, mock):
+        """Test readers never see leaks and update time of different updates.
+
+        Args:
+            clock: Patched time, counting updates.
+            mock: Requests mock.
+
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            "get",
+            pyflume.constants.API_LEAK_URL.format(
+                user_id=CONST_USER_ID,
+                device_id="6248148189204194987",
+            ),
+            json=generation_callback(),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+
+        leaks = pyflume.FlumeLeakList(
+            flume_auth,
+            "6248148189204194987",
+            update_on_init=False,
+        )
+        for state in read_while_updating(leaks, clock):
+            entries = state.leak_alert_list
+            assert len(entries) == (state.last_updated or 0)  # noqa: S101
+            assert all(  # noqa: S101
+                entry["id"] == state.last_updated for entry in entries
+            )
+        assert leaks.last_updated == UPDATES  # noqa: S101
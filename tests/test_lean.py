@@ -0,0 +1,121 @@
+"""Test the bandwidth-lean request mode."""
+
+import gzip
+import json
+import unittest
+
+import pytest
+from requests import exceptions
+
+import pyflume
+
+from .constants import CONST_HTTP_METHOD_POST, CONST_SCAN_INTERVAL, CONST_USER_ID
+from .utils import load_fixture
+
+QUERY_URL = pyflume.constants.API_QUERY_URL.format(
+    user_id=CONST_USER_ID,
+    device_id="device_id",
+)
+DEVICES_URL = pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID)
+
+
+@pytest.mark.usefixtures("flume_api")
+class TestLeanSession(unittest.TestCase):
+    """Lean request mode Test Case."""
+
+    def test_devices(self):
+        """Test compressed responses, metering and device expansions."""
+        devices = self.mock.register_uri(
+            "get",
+            DEVICES_URL,
+            content=gzip.compress(load_fixture("devices.json").encode("utf-8")),
+            headers={"Content-Encoding": "gzip"},
+        )
+        calls = []
+        session = pyflume.LeanSession(on_call=calls.append)
+
+        flume_devices = pyflume.FlumeDeviceList(
+            self.flume_auth,
+            http_session=session,
+            update_on_init=False,
+            user=False,
+        )
+        assert len(flume_devices.get_devices(location=False)) == 1  # noqa: S101
+        assert devices.last_request.qs == {  # noqa: S101
+            "user": ["false"],
+            "location": ["false"],
+        }
+        accept_encoding = devices.last_request.headers["Accept-Encoding"]
+        assert accept_encoding == "gzip, deflate"  # noqa: S101
+        assert calls[0].bytes_received < calls[0].content_bytes  # noqa: S101
+        assert session.bytes_sent == calls[0].bytes_sent  # noqa: S101
+
+    def test_query(self):
+        """Test compressed request bodies and query pruning."""
+        query = self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            QUERY_URL,
+            text=load_fixture("query.json"),
+        )
+        session = pyflume.LeanSession(compress_requests=True, compress_min_size=0)
+
+        flume_data = pyflume.FlumeData(
+            self.flume_auth,
+            "device_id",
+            "America/Los_Angeles",
+            CONST_SCAN_INTERVAL,
+            http_session=session,
+            update_on_init=False,
+            query_keys=["today"],
+        )
+        flume_data.update_force()
+        assert query.last_request.headers["Content-Encoding"] == "gzip"  # noqa: S101
+        payload = json.loads(gzip.decompress(query.last_request.body))
+        request_ids = [query_json["request_id"] for query_json in payload["queries"]]
+        assert request_ids == ["today"]  # noqa: S101
+        assert flume_data.values == {"today": 56.6763912}  # noqa: S101,WPS432
+        assert len(session.calls) == 1  # noqa: S101
+
+    def test_small_and_failed_requests(self):
+        """Test small bodies stay uncompressed and failed calls are not metered."""
+        query = self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            QUERY_URL,
+            text=load_fixture("query.json"),
+        )
+        session = pyflume.LeanSession(compress_requests=True, history=1)
+        for _ in range(2):
+            session.post(
+                QUERY_URL,
+                json={"queries": []},
+                headers={"Accept-Encoding": "identity"},
+            )
+        request = query.last_request
+        assert request.json() == {"queries": []}  # noqa: S101
+        assert "Content-Encoding" not in request.headers  # noqa: S101
+        assert request.headers["Accept-Encoding"] == "identity"  # noqa: S101
+        assert len(session.calls) == 1  # noqa: S101
+        assert session.bytes_sent == 2 * session.calls[0].bytes_sent  # noqa: S101
+
+        self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            QUERY_URL,
+            exc=exceptions.ConnectTimeout,
+        )
+        with self.assertRaises(exceptions.ConnectTimeout):
+            session.post(QUERY_URL, json={"queries": []})
+        assert session.bytes_sent == 2 * session.calls[0].bytes_sent  # noqa: S101
+
+    def test_stream(self):
+        """Test streamed responses are metered from their Content-Length."""
+        self.mock.register_uri(
+            "get",
+            DEVICES_URL,
+            text=load_fixture("devices.json"),
+            headers={"Content-Length": "100"},
+        )
+        session = pyflume.LeanSession()
+        session.get(DEVICES_URL, stream=True)
+        usage = session.calls[0]
+        assert usage.content_bytes is None  # noqa: S101
+        assert usage.bytes_received > 100  # noqa: S101, WPS432
@@ -0,0 +1,195 @@
+"""Test the aggregate of the devices of each location."""
+
+import copy
+import json
+import re
+import unittest
+
+import pytest
+from requests import exceptions
+
+import pyflume
+
+from .constants import CONST_HTTP_METHOD_POST, CONST_SCAN_INTERVAL, CONST_USER_ID
+from .utils import load_fixture
+
+# Device id to the value returned for each of its queries.
+DEVICE_VALUES = {"kitchen": 1.5, "garden": 2.5, "cabin": None}  # noqa: WPS407
+
+
+def _devices():
+    """Return a device list with two devices at home and one at the cabin.
+
+    Returns:
+        Devices response JSON.
+    """
+    devices_json = json.loads(load_fixture("devices.json"))
+    device = devices_json["data"][0]
+    cabin = copy.deepcopy(device)
+    cabin["location"]["id"] = 2
+    devices_json["data"] = [
+        dict(device, id="kitchen"),
+        dict(device, id="garden"),
+        dict(cabin, id="cabin"),
+        dict(device, id="bridge", type=1),
+    ]
+    return devices_json
+
+
+def _only(*device_ids):
+    """Return the device list of _devices with only some of its devices.
+
+    Args:
+        device_ids: Ids of the devices kept.
+
+    Returns:
+        Devices response JSON.
+    """
+    devices_json = _devices()
+    devices_json["data"] = [
+        device for device in devices_json["data"] if device["id"] in device_ids
+    ]
+    return devices_json
+
+
+def _query_callback(request, context):
+    """Return the value of the device for every query.
+
+    Args:
+        request: Query request.
+        context: Response context.
+
+    Returns:
+        Query response JSON.
+    """
+    device_id = request.path.rstrip("/").split("/")[-2]
+    return {
+        "success": True,
+        "data": [
+            {
+                query["request_id"]: [{"value": DEVICE_VALUES[device_id]}]
+                for query in request.json()["queries"]
+            },
+        ],
+    }
+
+
+@pytest.mark.usefixtures("flume_api")
+class TestFlumeLocationData(unittest.TestCase):
+    """Location aggregate Test Case."""
+
+    def test_update(self):
+        """Test totals of every query key from one aligned cycle."""
+        locations, query = self._update_locations()
+        assert locations.location_devices == {  # noqa: S101
+            1: ["kitchen", "garden"],
+            2: ["cabin"],
+        }
+        assert locations.values == {  # noqa: S101
+            1: {"today": 4, "last_60_min": 4},
+            2: {"today": None, "last_60_min": None},
+        }
+        assert query.call_count == 3  # noqa: S101
+        assert self.acquire.call_count == 3  # noqa: S101
+        until_datetimes = {
+            query_json["until_datetime"]
+            for request in query.request_history
+            for query_json in request.json()["queries"]
+        }
+        assert len(until_datetimes) == 1  # noqa: S101
+
+    def test_device_failed(self):
+        """Test a failing device is left out of the totals of its location."""
+        locations, _ = self._update_locations()
+        self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            re.compile("/devices/garden/query"),
+            status_code=500,  # noqa: WPS432
+            json={"success": False, "message": "Server error"},
+        )
+        locations.update()
+        assert locations.state.failed == ("garden",)  # noqa: S101
+        assert locations.values[1] == {  # noqa: S101
+            "today": 1.5,
+            "last_60_min": 1.5,
+        }
+
+    def test_sync_devices(self):
+        """Test devices leaving the account are dropped and the others kept."""
+        locations, query = self._update_locations()
+        kitchen = locations.data["kitchen"]
+        self._register_devices(_only("kitchen", "cabin", "bridge"))
+        locations.device_list.update()
+        locations.sync_devices()
+        assert sorted(locations.data) == ["cabin", "kitchen"]  # noqa: S101
+        assert locations.data["kitchen"] is kitchen  # noqa: S101
+        assert locations.location_devices[1] == ["kitchen"]  # noqa: S101
+
+        query.reset()
+        locations.update()
+        assert sorted(  # noqa: S101
+            request.path.split("/")[-2] for request in query.request_history
+        ) == ["cabin", "kitchen"]
+        assert not locations.state.failed  # noqa: S101
+        assert locations.values[1] == {"today": 1.5, "last_60_min": 1.5}  # noqa: S101
+
+    def test_no_devices(self):
+        """Test an account without sensors has no locations and sends no query."""
+        self._register_devices(_only("bridge"))
+        locations = pyflume.FlumeLocationData(self.flume_auth, CONST_SCAN_INTERVAL)
+        assert not locations.location_devices  # noqa: S101
+        assert not locations.values  # noqa: S101
+        assert locations.last_updated is not None  # noqa: S101
+        assert self.acquire.call_count == 0  # noqa: S101
+
+    def test_location_failed(self):
+        """Test a location whose devices all fail has an empty total."""
+        self._register_devices(_devices())
+        self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            re.compile("/devices/[a-z]+/query"),
+            json=_query_callback,
+        )
+        self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            re.compile("/devices/cabin/query"),
+            exc=exceptions.ConnectionError,
+        )
+        locations = pyflume.FlumeLocationData(
+            self.flume_auth,
+            CONST_SCAN_INTERVAL,
+            query_keys=["today"],
+        )
+        assert locations.values == {1: {"today": 4}, 2: {}}  # noqa: S101
+        assert locations.state.failed == ("cabin",)  # noqa: S101
+
+    def _register_devices(self, devices_json):
+        """Answer the device list of the account.
+
+        Args:
+            devices_json: Devices response JSON.
+        """
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            json=devices_json,
+        )
+
+    def _update_locations(self):
+        """Return the locations of _devices, updated with _query_callback.
+
+        Returns:
+            Tuple of the FlumeLocationData and the query mock.
+        """
+        self._register_devices(_devices())
+        query = self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            re.compile("/devices/[a-z]+/query"),
+            json=_query_callback,
+        )
+        locations = pyflume.FlumeLocationData(
+            self.flume_auth,
+            CONST_SCAN_INTERVAL,
+            query_keys=["today", "last_60_min"],
+        )
+        return locations, query
@@ -1,13 +1,17 @@
 """Basic tests for flume notifications. This module contains unittest classes for testing different functionalities of flume."""
 
 # Standard library imports
+import json
 import unittest
+from unittest import mock as unittest_mock
 
 # Third-party imports
+import pytest
 import requests_mock
 
 # Local application/library-specific imports
 import pyflume
+from pyflume.utils import FlumeResponseError
 
 from .constants import (
     CONST_CLIENT_ID,
@@ -19,7 +23,11 @@ from .constants import (
     CONST_USER_ID,
     CONST_USERNAME,
 )
-from .utils import load_fixture
+from .utils import UPDATES, generation_callback, load_fixture, read_while_updating
+
+NOTIFICATIONS_URL = pyflume.constants.API_NOTIFICATIONS_URL.format(
+    user_id=CONST_USER_ID,
+)
 
 
 class TestFlumeNotificationList(unittest.TestCase):
@@ -80,3 +88,167 @@ class TestFlumeNotificationList(unittest.TestCase):
         assert len(notifications_nopage) == 1  # noqa: S101
         assert notifications_nopage[0][CONST_USER_ID] == 1111  # noqa: S101,WPS432
         assert flume_notifications.has_next is False  # noqa: S101
+
+        flume_notifications.has_next = True
+        flume_notifications.next_page = "/me/notifications?offset=1"
+        assert flume_notifications.state.has_next  # noqa: S101
+        assert (  # noqa: S101
+            flume_notifications.state.next_page == "/me/notifications?offset=1"
+        )
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_acknowledge(self):
+        """Test acknowledging notifications in batches."""
+        self.mock.register_uri(
+            "get",
+            NOTIFICATIONS_URL,
+            text=load_fixture("notification.json"),
+        )
+        acknowledged = [
+            self.mock.register_uri(
+                "patch",
+                f"{NOTIFICATIONS_URL}/{item_id}",
+                json={"success": True},
+            )
+            for item_id in (111111, 222222)  # noqa: WPS432
+        ]
+
+        flume_notifications = pyflume.FlumeNotificationList(self.flume_auth)
+        ids = flume_notifications.acknowledge_notifications(
+            [flume_notifications.notification_list[0], 222222],  # noqa: WPS432
+            batch_size=1,
+        )
+        assert ids == [111111, 222222]  # noqa: S101,WPS432
+        for patch in acknowledged:
+            assert patch.last_request.json() == {"read": True}  # noqa: S101
+        assert not flume_notifications.notification_list  # noqa: S101
+        assert self.acquire.call_count == 0  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_acknowledge_records(self):
+        """Test acknowledged notification records are marked read."""
+        self.mock.register_uri(
+            "get",
+            NOTIFICATIONS_URL,
+            text=load_fixture("notification.json"),
+        )
+        self.mock.register_uri(
+            "patch",
+            f"{NOTIFICATIONS_URL}/111111",
+            json={"success": True},
+        )
+
+        flume_notifications = pyflume.FlumeNotificationList(
+            self.flume_auth,
+            read="true",
+            records=True,
+            rate_budget=pyflume.RateBudget(),
+        )
+        flume_notifications.acknowledge_notifications([111111])  # noqa: WPS432
+        notification = flume_notifications.notification_list[0]
+        assert isinstance(notification, pyflume.NotificationRecord)  # noqa: S101
+        assert notification.read is True  # noqa: S101
+        # The page request and the acknowledgement.
+        assert self.acquire.call_count == 2  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_acknowledge_failed(self):
+        """Test notifications of a failed batch are not marked read."""
+        unread_page = json.loads(load_fixture("notification.json"))
+        unread_page["data"][0]["read"] = False
+        self.mock.register_uri("get", NOTIFICATIONS_URL, json=unread_page)
+        self.mock.register_uri(
+            "patch",
+            f"{NOTIFICATIONS_URL}/111111",
+            json={"success": True},
+        )
+        self.mock.register_uri(
+            "patch",
+            f"{NOTIFICATIONS_URL}/333333",
+            status_code=500,  # noqa: WPS432
+            json={"message": "Server error"},
+        )
+
+        flume_notifications = pyflume.FlumeNotificationList(
+            self.flume_auth,
+            read="true",
+        )
+        with self.assertRaises(FlumeResponseError):
+            flume_notifications.acknowledge_notifications(
+                [111111, 333333],  # noqa: WPS432
+                batch_size=2,
+            )
+        assert flume_notifications.notification_list[0]["read"] is True  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_all_notifications(self):
+        """Test fetching every page of notifications by offset."""
+        page = json.loads(load_fixture("notification.json"))
+        page["count"] = 3
+        for offset in range(3):
+            self.mock.register_uri(
+                "get",
+                "{0}?offset={1}".format(NOTIFICATIONS_URL, offset),
+                json=dict(
+                    page,
+                    data=[dict(page["data"][0], id=offset)],
+                ),
+            )
+
+        flume_notifications = pyflume.FlumeNotificationList(
+            self.flume_auth,
+            update_on_init=False,
+        )
+        notifications = flume_notifications.get_all_notifications(workers=2)
+        assert [entry["id"] for entry in notifications] == [0, 1, 2]  # noqa: S101
+        assert self.acquire.call_count == 0  # noqa: S101
+
+        flume_notifications = pyflume.FlumeNotificationList(
+            self.flume_auth,
+            update_on_init=False,
+            rate_budget=pyflume.RateBudget(),
+        )
+        notifications = flume_notifications.get_all_notifications(workers=2)
+        assert [entry["id"] for entry in notifications] == [0, 1, 2]  # noqa: S101
+        assert self.acquire.call_count == 3  # noqa: S101
+        assert flume_notifications.has_next is False  # noqa: S101
+
+    @unittest_mock.patch("pyflume.notifications.time")
+    @requests_mock.Mocker()
+    def test_concurrent_update(self, clock, mock):
+        """Test readers never see notifications and pages of different updates.
+
+        Args:
+            clock: Patched time, counting updates.
+            mock: Requests mock.
+
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            "get",
+            pyflume.constants.API_NOTIFICATIONS_URL.format(user_id=CONST_USER_ID),
+            json=generation_callback(pagination=True),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+
+        notifications = pyflume.FlumeNotificationList(flume_auth, update_on_init=False)
+        for state in read_while_updating(notifications, clock):
+            entries = state.notification_list
+            assert len(entries) == (state.last_updated or 0)  # noqa: S101
+            assert all(  # noqa: S101
+                entry["id"] == state.last_updated for entry in entries
+            )
+            assert state.next_page == (  # noqa: S101
+                state.last_updated and f"/page/{state.last_updated}"
+            )
+        assert notifications.last_updated == UPDATES  # noqa: S101
@@ -0,0 +1,73 @@
+"""Basic tests for flume records. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+import json
+import sys
+import unittest
+
+# Third-party imports
+import requests_mock
+
+# Local application/library-specific imports
+import pyflume
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_FLUME_TOKEN,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+class TestFlumeRecords(unittest.TestCase):
+    """Test Flume Records Test."""
+
+    @requests_mock.Mocker()
+    def test_usage_records(self, mock):
+        """Test usage alerts decoded into slotted records.
+
+        Args:
+            mock: Requests mock.
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            "get",
+            pyflume.constants.API_USAGE_URL.format(user_id=CONST_USER_ID),
+            text=load_fixture("usage.json"),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+
+        flume_alerts = pyflume.FlumeUsageAlertList(flume_auth, records=True)
+        alerts = flume_alerts.usage_alert_list
+        assert len(alerts) == 50  # noqa: S101, WPS432
+        assert isinstance(alerts[0], pyflume.UsageAlertRecord)  # noqa: S101
+        assert alerts[0]["device_id"] == "6248148189204194987"  # noqa: S101
+        assert alerts[0].event_rule_name == "High Flow Alert"  # noqa: S101
+        assert alerts[0].triggered_datetime == 1655901660  # noqa: S101, WPS432
+        assert alerts[0].event_rule_name is alerts[1].event_rule_name  # noqa: S101
+        with self.assertRaises(AttributeError):
+            alerts[0].unknown_field = None
+
+    def test_device_record(self):
+        """Test a device record keeps every field and uses less memory."""
+        device = json.loads(load_fixture("devices.json"))["data"][0]
+        record = pyflume.DeviceRecord.from_json(device)
+        assert record["id"] == device["id"]  # noqa: S101
+        assert record.get("missing") is None  # noqa: S101
+        assert record.as_dict().keys() == device.keys()  # noqa: S101
+        assert sys.getsizeof(record) < sys.getsizeof(device)  # noqa: S101
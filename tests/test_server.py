@@ -0,0 +1,197 @@
+"""Test the local caching server."""
+
+from datetime import timedelta
+import json
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+from requests import exceptions
+
+import pyflume
+from pyflume.server import FlumeCache, create_server
+
+from .constants import CONST_HTTP_METHOD_POST, CONST_USER_ID
+from .utils import load_fixture
+
+DEVICE_ID = "6248148189204194987"
+
+
+def register_api(mock):
+    """Register the responses of every endpoint polled by the cache.
+
+    The token endpoint is registered by the flume_api fixture.
+
+    Args:
+        mock: Requests mock.
+
+    Returns:
+        Matcher of the device list request.
+    """
+    devices = mock.register_uri(
+        "get",
+        pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+        text=load_fixture("devices.json"),
+    )
+    mock.register_uri(
+        "get",
+        pyflume.constants.API_NOTIFICATIONS_URL.format(user_id=CONST_USER_ID),
+        text=load_fixture("notification_nopage.json"),
+    )
+    mock.register_uri(
+        "get",
+        pyflume.constants.API_USAGE_URL.format(user_id=CONST_USER_ID),
+        text=load_fixture("usage_nopage.json"),
+    )
+    mock.register_uri(
+        "get",
+        pyflume.constants.API_LEAK_URL.format(
+            user_id=CONST_USER_ID,
+            device_id=DEVICE_ID,
+        ),
+        text=load_fixture("leak.json"),
+    )
+    mock.register_uri(
+        CONST_HTTP_METHOD_POST,
+        pyflume.constants.API_QUERY_URL.format(
+            user_id=CONST_USER_ID,
+            device_id=DEVICE_ID,
+        ),
+        text=load_fixture("query.json"),
+    )
+    return devices
+
+
+@pytest.mark.usefixtures("flume_api")
+class TestFlumeCache(unittest.TestCase):
+    """Caching server Test Case."""
+
+    def test_serve(self):
+        """Test serving cached documents after a single refresh."""
+        devices = register_api(self.mock)
+        cache = FlumeCache(self.flume_auth)
+        cache.refresh()
+        cache.refresh()
+        self._start_server(cache)
+
+        document = self._request("/devices/{0}/values".format(DEVICE_ID))[2]
+        leaks = self._request("/devices/{0}/leaks".format(DEVICE_ID))[2]["data"]
+        assert devices.call_count == 1  # noqa: S101
+        assert document["data"]["today"] == pytest.approx(56.6763912)  # noqa: S101,WPS432
+        assert document["last_updated"] is not None  # noqa: S101
+        assert leaks[0]["active"]  # noqa: S101
+        assert self.acquire.call_count == 1  # noqa: S101
+
+    def test_not_modified(self):
+        """Test a document matching the ETag of the client is not sent again."""
+        register_api(self.mock)
+        cache = FlumeCache(self.flume_auth)
+        cache.refresh()
+        self._start_server(cache)
+
+        values_path = "/devices/{0}/values".format(DEVICE_ID)
+        etag = self._request(values_path)[1]
+        status, _, document = self._request(values_path, {"If-None-Match": etag})
+        assert status == 304  # noqa: S101,WPS432
+        assert document is None  # noqa: S101
+
+    def test_device_removed(self):
+        """Test a device removed from the account is no longer served."""
+        devices = register_api(self.mock)
+        cache = FlumeCache(self.flume_auth)
+        cache.refresh()
+        values_path = "/devices/{0}/values".format(DEVICE_ID)
+        assert cache.get(values_path) is not None  # noqa: S101
+
+        no_devices = json.loads(load_fixture("devices.json"))
+        no_devices["data"] = []
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            text=json.dumps(no_devices),
+        )
+        cache.device_list.last_updated = None
+        cache.refresh()
+
+        assert devices.call_count == 1  # noqa: S101
+        assert not cache.data  # noqa: S101
+        assert not cache.leak_lists  # noqa: S101
+        assert cache.get(values_path) is None  # noqa: S101
+        assert cache.get("/devices/{0}/leaks".format(DEVICE_ID)) is None  # noqa: S101
+
+    def test_failed_update(self):
+        """Test documents of a failed update keep their previous content."""
+        register_api(self.mock)
+        cache = FlumeCache(
+            self.flume_auth,
+            scan_interval=timedelta(0),
+            list_interval=timedelta(0),
+        )
+        cache.refresh()
+        values_path = "/devices/{0}/values".format(DEVICE_ID)
+        cached = cache.get(values_path)
+
+        self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id=DEVICE_ID,
+            ),
+            status_code=500,  # noqa: WPS432
+            json={"success": False, "message": "Server error"},
+        )
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_NOTIFICATIONS_URL.format(user_id=CONST_USER_ID),
+            exc=exceptions.ConnectionError,
+        )
+        cache.refresh()
+
+        assert cache.get(values_path) == cached  # noqa: S101
+        notifications = json.loads(cache.get("/notifications")[0])
+        assert len(notifications["data"]) == 1  # noqa: S101
+
+    def test_no_devices(self):
+        """Test an account without sensors serves empty lists only."""
+        register_api(self.mock)
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            json={"success": True, "data": [], "count": 0, "pagination": None},
+        )
+        cache = FlumeCache(self.flume_auth)
+        cache.refresh()
+        assert not json.loads(cache.get("/devices/")[0])["data"]  # noqa: S101
+        assert cache.get("/devices/{0}/values".format(DEVICE_ID)) is None  # noqa: S101
+        assert self.acquire.call_count == 0  # noqa: S101
+
+    def _start_server(self, cache):
+        """Serve a cache on a free port until the end of the test.
+
+        Args:
+            cache: FlumeCache to serve.
+        """
+        server = create_server(cache, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = "http://127.0.0.1:{0}".format(server.server_address[1])
+
+    def _request(self, path, headers=None):
+        """Send a GET request to the test server.
+
+        Args:
+            path: Request path.
+            headers: Request headers.
+
+        Returns:
+            Tuple of (status, ETag, JSON document or None).
+        """
+        request = Request(self.base_url + path, headers=headers or {})
+        try:
+            with urlopen(request) as page:  # noqa: S310
+                return page.status, page.headers["ETag"], json.load(page)
+        except HTTPError as error:
+            return error.code, error.headers["ETag"], None
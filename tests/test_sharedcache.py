@@ -0,0 +1,109 @@
+"""Test the cross-process shared cache."""
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock as unittest_mock
+
+import requests_mock
+
+import pyflume
+from pyflume.sharedcache import FlumeSharedCache
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_FLUME_TOKEN,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_SCAN_INTERVAL,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+DEVICE_ID = "device_id"
+
+
+class TestFlumeSharedCache(unittest.TestCase):
+    """Shared cache Test Case."""
+
+    def setUp(self):
+        """Create the cache file."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.db")
+
+    def tearDown(self):
+        """Remove the cache file."""
+        self.directory.cleanup()
+
+    @unittest_mock.patch("pyflume.budget.RateBudget.acquire")
+    @requests_mock.Mocker()
+    def test_shared_update(self, acquire, mock):
+        """Test a second worker reading the update of the first one.
+
+        Args:
+            acquire: Patched API limits.
+            mock: Requests mock.
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        query = mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id=DEVICE_ID,
+            ),
+            text=load_fixture("query.json"),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+
+        with FlumeSharedCache(self.path, max_age=60) as first_cache:
+            with FlumeSharedCache(self.path, max_age=60) as second_cache:
+                workers = [
+                    pyflume.FlumeData(
+                        flume_auth,
+                        DEVICE_ID,
+                        "America/Los_Angeles",
+                        CONST_SCAN_INTERVAL,
+                        update_on_init=False,
+                        shared_cache=shared_cache,
+                    )
+                    for shared_cache in (first_cache, second_cache)
+                ]
+                workers[0].update()
+                workers[1].update()
+                assert query.call_count == 1  # noqa: S101
+                assert workers[1].values == workers[0].values  # noqa: S101
+
+                second_cache.max_age = 0
+                workers[1].update()
+                assert query.call_count == 2  # noqa: S101
+        assert acquire.call_count == 2  # noqa: S101
+
+    def test_lease(self):
+        """Test a single owner of a refresh lease at a time."""
+        with FlumeSharedCache(self.path, lease=60) as shared_cache:
+            assert shared_cache.acquire("key")  # noqa: S101
+            acquired = []
+            thread = threading.Thread(
+                target=lambda: acquired.append(shared_cache.acquire("key")),
+            )
+            thread.start()
+            thread.join()
+            assert acquired == [False]  # noqa: S101
+
+            shared_cache.release("key")
+            shared_cache.put("key", {"value": 1})
+            assert shared_cache.get("key").state == {"value": 1}  # noqa: S101
@@ -0,0 +1,135 @@
+"""Basic tests for flume snapshots. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+import gzip
+import os
+import tempfile
+import unittest
+
+# Third-party imports
+import pytest
+from requests import Session
+
+# Local application/library-specific imports
+import pyflume
+
+from .constants import CONST_HTTP_METHOD_POST, CONST_SCAN_INTERVAL, CONST_USER_ID
+from .utils import load_fixture
+
+
+@pytest.mark.usefixtures("flume_api")
+class TestFlumeSnapshot(unittest.TestCase):
+    """Test Flume Snapshot Test."""
+
+    def setUp(self):
+        """Create a directory for the snapshot files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "flume.snapshot")
+
+    def tearDown(self):
+        """Remove the snapshot files."""
+        self.directory.cleanup()
+
+    def test_snapshot(self):
+        """Test state is restored without API calls after a restart."""
+        self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id="device_id",
+            ),
+            text=load_fixture("query.json"),
+        )
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            text=load_fixture("devices.json"),
+        )
+        saved = self._clients(update_on_init=True)
+        pyflume.save_snapshot(self.path, saved)
+        call_count = self.mock.call_count
+
+        restored = self._clients(update_on_init=False)
+        ages = pyflume.load_snapshot(self.path, restored)
+        assert self.mock.call_count == call_count  # noqa: S101
+        assert ages["data"] < 60  # noqa: S101, WPS432
+        assert restored["data"].values == saved["data"].values  # noqa: S101
+        assert (  # noqa: S101
+            restored["devices"].device_list == saved["devices"].device_list
+        )
+
+        stale = self._clients(update_on_init=False)
+        ages = pyflume.load_snapshot(self.path, stale, max_age=-1)
+        assert ages == {"data": None, "devices": None}  # noqa: S101
+        assert stale["data"].values == {}  # noqa: S101, WPS520
+
+        assert pyflume.load_snapshot(  # noqa: S101
+            os.path.join(self.directory.name, "none"),
+            stale,
+        ) == {"data": None, "devices": None}
+
+    def test_corrupt_snapshot(self):
+        """Test unreadable or foreign snapshots restore nothing."""
+        flume_data = self._flume_data("device_id")
+        documents = [
+            b"not a snapshot",
+            gzip.compress(b'{"version": 1, "objects"')[:-4],
+            gzip.compress(b"[]"),
+            gzip.compress(b'{"version": 2, "objects": {}}'),
+            gzip.compress(b'{"version": 1, "saved_at": 0}'),
+        ]
+        for document in documents:
+            with open(self.path, "wb") as snapshot_file:
+                snapshot_file.write(document)
+            ages = pyflume.load_snapshot(self.path, {"data": flume_data})
+            assert ages == {"data": None}  # noqa: S101
+        assert flume_data.last_updated is None  # noqa: S101
+
+    def test_other_device(self):
+        """Test restoring the state of another device raises."""
+        pyflume.save_snapshot(self.path, {"data": self._flume_data("device_id")})
+        with self.assertRaises(ValueError):
+            pyflume.load_snapshot(self.path, {"data": self._flume_data("other")})
+
+    def _clients(self, update_on_init):
+        """Return the objects saved to and restored from the snapshot.
+
+        Args:
+            update_on_init: Fetch the state from the API.
+
+        Returns:
+            Dict of FlumeData and FlumeDeviceList by name.
+        """
+        return {
+            "data": pyflume.FlumeData(
+                self.flume_auth,
+                "device_id",
+                "America/Los_Angeles",
+                CONST_SCAN_INTERVAL,
+                http_session=Session(),
+                update_on_init=update_on_init,
+            ),
+            "devices": pyflume.FlumeDeviceList(
+                self.flume_auth,
+                records=True,
+                update_on_init=update_on_init,
+            ),
+        }
+
+    def _flume_data(self, device_id):
+        """Return a FlumeData that is not updated.
+
+        Args:
+            device_id: Flume device id.
+
+        Returns:
+            FlumeData
+        """
+        return pyflume.FlumeData(
+            self.flume_auth,
+            device_id,
+            "America/Los_Angeles",
+            CONST_SCAN_INTERVAL,
+            http_session=Session(),
+            update_on_init=False,
+        )
@@ -0,0 +1,71 @@
+"""Basic tests for flume alert store. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+from datetime import datetime, timezone
+import json
+import os
+import tempfile
+import unittest
+
+# Third-party imports
+import pytest
+
+# Local application/library-specific imports
+import pyflume
+from pyflume.records import NotificationRecord
+
+from .constants import CONST_USER_ID
+from .utils import load_fixture
+
+
+class TestFlumeAlertStore(unittest.TestCase):
+    """Test Flume Alert Store Test."""
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_store(self):
+        """Test usage alerts are synchronized, queried and kept across restarts."""
+        self.mock.register_uri(
+            "get",
+            pyflume.constants.API_USAGE_URL.format(user_id=CONST_USER_ID),
+            text=load_fixture("usage.json"),
+        )
+        self.mock.register_uri(
+            "get",
+            "{0}/users/1111/usage-alerts?offset=50&limit=50".format(
+                pyflume.constants.API_BASE_URL,
+            ),
+            text=load_fixture("usage_next.json"),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "alerts.db")
+            with pyflume.FlumeAlertStore(path) as store:
+                assert store.sync_usage_alerts(  # noqa: S101
+                    pyflume.FlumeUsageAlertList(self.flume_auth),
+                ) == 100  # noqa: WPS432
+
+            with pyflume.FlumeAlertStore(path) as reopened:
+                alerts = reopened.query_usage_alerts(
+                    device_id="6248148189204194987",
+                    event_rule_name="High Flow Alert",
+                    since=datetime(2022, 6, 23, tzinfo=timezone.utc),  # noqa: WPS432
+                    limit=5,
+                )
+                assert len(alerts) == 5  # noqa: S101
+                assert (  # noqa: S101
+                    alerts[0]["triggered_datetime"] >= "2022-06-23"
+                )
+                assert not reopened.query_usage_alerts(device_id="other")  # noqa: S101
+
+    def test_records(self):
+        """Test records and JSON dicts of a notification read back the same."""
+        notification = json.loads(load_fixture("notification_nopage.json"))["data"][0]
+        record = NotificationRecord.from_json(notification)
+        with pyflume.FlumeAlertStore() as store:
+            store.add_notifications([notification])
+            from_json = store.query_notifications()
+            store.add_notifications([record])
+            from_record = store.query_notifications()
+        assert from_record == from_json  # noqa: S101
+        assert (  # noqa: S101
+            from_record[0]["created_datetime"] == notification["created_datetime"]
+        )
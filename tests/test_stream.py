@@ -0,0 +1,171 @@
+"""Basic tests for flume streaming decode. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+import json
+import time
+import unittest
+
+# Third-party imports
+import requests_mock
+
+# Local application/library-specific imports
+import pyflume
+from pyflume.stream import JsonDataStream
+from pyflume.utils import FlumeDeadlineError
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_FLUME_TOKEN,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+class ChunkedResponse:
+    """Response returning its body in fixed size chunks."""
+
+    encoding = "utf-8"
+
+    def __init__(self, body, delay=0):
+        """Initialize the response.
+
+        Args:
+            body: Response body text.
+            delay: Seconds waited before each chunk.
+        """
+        self._body = body.encode("utf-8")
+        self._delay = delay
+
+    def iter_content(self, chunk_size):
+        """Yield the body in chunks.
+
+        Args:
+            chunk_size: Size of each chunk.
+
+        Yields:
+            Body chunks.
+        """
+        for offset in range(0, len(self._body), chunk_size):
+            if self._delay:
+                time.sleep(self._delay)
+            yield self._body[offset : offset + chunk_size]  # noqa: E203
+
+
+class TestJsonDataStream(unittest.TestCase):
+    """Test Flume Streaming Decode Test."""
+
+    def test_chunked_decode(self):
+        """Test items and pagination are decoded across chunk boundaries."""
+        body = load_fixture("usage.json")
+        expected = json.loads(body)
+        for chunk_size in (1, 7, 4096):  # noqa: WPS432
+            response_stream = JsonDataStream(ChunkedResponse(body), chunk_size)
+            assert list(response_stream) == expected["data"]  # noqa: S101
+            assert response_stream.document["count"] == 122  # noqa: S101, WPS432
+            assert (  # noqa: S101
+                response_stream.document["pagination"] == expected["pagination"]
+            )
+
+    def test_every_chunk_size(self):
+        """Test every fixture decodes the same at every chunk size.
+
+        Chunk sizes of usage.json stop at 512 bytes, longer than any of its
+        items, to keep the test fast.
+        """
+        fixtures = [
+            "devices.json",
+            "leak.json",
+            "notification.json",
+            "notification_nopage.json",
+            "query.json",
+            "token.json",
+        ]
+        for fixture in fixtures:
+            body = load_fixture(fixture)
+            self._assert_chunk_sizes(body, len(body.encode("utf-8")))
+        self._assert_chunk_sizes(load_fixture("usage.json"), 512)  # noqa: WPS432
+
+    def test_number_at_chunk_end(self):
+        """Test a number ending at a chunk boundary is not cut short."""
+        for body in ('{"data":[1.25]}', '{"data":[1.5E3, -2]}', '{"count":12}'):
+            expected = json.loads(body)
+            for chunk_size in range(1, len(body) + 1):
+                response_stream = JsonDataStream(ChunkedResponse(body), chunk_size)
+                assert list(response_stream) == expected.get("data", [])  # noqa: S101
+                assert (  # noqa: S101
+                    response_stream.document.get("count") == expected.get("count")
+                )
+
+    def test_deadline(self):
+        """Test a body arriving slower than the deadline stops between chunks."""
+        response = ChunkedResponse(
+            load_fixture("usage.json"),
+            delay=0.01,  # noqa: WPS432
+        )
+        started = time.monotonic()
+        with self.assertRaises(FlumeDeadlineError):
+            with pyflume.Deadline(0.05):  # noqa: WPS432
+                list(JsonDataStream(response, chunk_size=64))  # noqa: WPS432
+        assert time.monotonic() - started < 1  # noqa: S101
+
+    @requests_mock.Mocker()
+    def test_stream_notifications(self, mock):
+        """Test streamed notifications follow every page.
+
+        Args:
+            mock: Requests mock.
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            "get",
+            pyflume.constants.API_NOTIFICATIONS_URL.format(user_id=CONST_USER_ID),
+            text=load_fixture("notification.json"),
+        )
+        mock.register_uri(
+            "get",
+            "{0}/users/1111/notifications?offset=1&limit=1".format(
+                pyflume.constants.API_BASE_URL,
+            ),
+            text=load_fixture("notification_next.json"),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+
+        flume_notifications = pyflume.FlumeNotificationList(
+            flume_auth,
+            records=True,
+            stream=True,
+        )
+        assert flume_notifications.has_next  # noqa: S101
+        notifications = list(flume_notifications.iter_notifications())
+        assert len(notifications) == 2  # noqa: S101
+        assert notifications[1].user_id == 1111  # noqa: S101, WPS432
+        assert flume_notifications.has_next is False  # noqa: S101
+
+    def _assert_chunk_sizes(self, body, max_chunk_size):
+        """Assert a body decodes the same at every chunk size up to a maximum.
+
+        Args:
+            body: Response body text.
+            max_chunk_size: Largest chunk size in bytes.
+        """
+        expected = json.loads(body)
+        array = expected.pop("data")
+        for chunk_size in range(1, max_chunk_size + 1):
+            response_stream = JsonDataStream(ChunkedResponse(body), chunk_size)
+            assert list(response_stream) == array  # noqa: S101
+            assert response_stream.document == expected  # noqa: S101
@@ -0,0 +1,324 @@
+"""Basic tests for flume time series store. This module contains unittest classes for testing different functionalities of flume."""
+
+# Standard library imports
+from datetime import datetime, timedelta
+import os
+import tempfile
+import unittest
+from unittest import mock as unittest_mock
+
+# Third-party imports
+import pytest
+
+# Local application/library-specific imports
+import pyflume
+from pyflume.data import MINUTES_REQUEST_ID
+from pyflume.timeseries import RESOLUTION_DAY, RESOLUTION_HOUR
+
+try:
+    from zoneinfo import ZoneInfo  # noqa: WPS433
+except ImportError:  # Python < 3.9
+    from backports.zoneinfo import ZoneInfo  # noqa: WPS433,WPS440
+
+from .constants import CONST_HTTP_METHOD_POST, CONST_USER_ID
+
+DEVICE_TZ = "America/Los_Angeles"
+GAPS_START = datetime(2023, 1, 1, 8, 0, tzinfo=ZoneInfo(DEVICE_TZ))  # noqa: WPS432
+
+
+def _minute_buckets(request, context):
+    """Return one bucket of 1 gallon per minute of every query.
+
+    Args:
+        request: Query request.
+        context: Response context.
+
+    Returns:
+        Query response JSON.
+    """
+    query_results = {}
+    for query in request.json()["queries"]:
+        minute = datetime.fromisoformat(query["since_datetime"])
+        until = datetime.fromisoformat(query["until_datetime"])
+        query_results[query["request_id"]] = []
+        while minute <= until:
+            query_results[query["request_id"]].append(
+                {"datetime": minute.strftime("%Y-%m-%d %H:%M:%S"), "value": 1},
+            )
+            minute += timedelta(minutes=1)
+    return {"success": True, "data": [query_results]}
+
+
+def _without_first_minute(request, context):
+    """Return the minutes of every query but the first one.
+
+    Args:
+        request: Query request.
+        context: Response context.
+
+    Returns:
+        Query response JSON.
+    """
+    response_json = _minute_buckets(request, context)
+    for buckets in response_json["data"][0].values():
+        buckets.pop(0)
+    return response_json
+
+
+def _interval_buckets(request, context):
+    """Return the 1 gallon minutes of current_interval and their sum.
+
+    Args:
+        request: Query request.
+        context: Response context.
+
+    Returns:
+        Query response JSON.
+    """
+    minutes = _minute_buckets(request, context)["data"][0]
+    query_results = {
+        request_id: [{"value": len(buckets)}]
+        for request_id, buckets in minutes.items()
+    }
+    query_results[MINUTES_REQUEST_ID] = minutes[MINUTES_REQUEST_ID]
+    return {"success": True, "data": [query_results]}
+
+
+def _epoch(start, minutes=0):
+    """Return the epoch seconds of a minute after start.
+
+    Args:
+        start: Time zone aware datetime.
+        minutes: Minutes after start.
+
+    Returns:
+        Epoch seconds.
+    """
+    return int((start + timedelta(minutes=minutes)).timestamp())
+
+
+def _readings(start, minutes):
+    """Return 1 gallon readings of minutes after start.
+
+    Args:
+        start: Time zone aware datetime.
+        minutes: Minutes after start.
+
+    Returns:
+        List of (datetime, gallons).
+    """
+    return [(start + timedelta(minutes=minute), 1) for minute in minutes]
+
+
+def _gallons(store, resolution):
+    """Return the gallons of every stored bucket of device_id.
+
+    Args:
+        store: FlumeTimeSeriesStore.
+        resolution: minute, hour or day.
+
+    Returns:
+        List of gallons, oldest first.
+    """
+    return [gallons for _, gallons in store.read("device_id", resolution)]
+
+
+def _store_fetched(store, start, minutes):
+    """Store 1 gallon minutes after start and mark them fetched.
+
+    Args:
+        store: FlumeTimeSeriesStore.
+        start: Time zone aware datetime.
+        minutes: Minutes after start.
+    """
+    for minute_start, gallons in _readings(start, minutes):
+        store.write("device_id", minute_start, gallons)
+        store.mark_fetched(
+            "device_id",
+            minute_start,
+            minute_start + timedelta(minutes=1),
+        )
+
+
+class TestFlumeTimeSeriesStore(unittest.TestCase):
+    """Test Flume Time Series Store Test."""
+
+    def test_rollups_and_retention(self):
+        """Test minute writes roll up into local hours and days."""
+        start = datetime(2023, 1, 1, 23, 0, tzinfo=ZoneInfo(DEVICE_TZ))  # noqa: WPS432
+        with tempfile.TemporaryDirectory() as directory:
+            store = pyflume.FlumeTimeSeriesStore(directory)
+            store.write_many("device_id", _readings(start, range(90)))  # noqa: WPS432
+            store.write("device_id", start, 3)
+            store.write("device_id", start - timedelta(minutes=5), 2)
+
+            assert len(store.read("device_id", since=start)) == 90  # noqa: S101, WPS432
+            assert store.read("device_id")[1] == (_epoch(start), 3)  # noqa: S101
+            assert _gallons(store, RESOLUTION_HOUR) == [2, 62, 30]  # noqa: S101
+            assert _gallons(store, RESOLUTION_DAY) == [64, 30]  # noqa: S101
+
+            retained = pyflume.FlumeTimeSeriesStore(
+                directory,
+                retention={"minute": timedelta(minutes=30)},  # noqa: WPS432
+            )
+            retained.apply_retention(start + timedelta(minutes=90))  # noqa: WPS432
+            assert len(retained.read("device_id")) == 30  # noqa: S101, WPS432
+            assert len(retained.read("device_id", RESOLUTION_DAY)) == 2  # noqa: S101
+
+    def test_failed_rewrite(self):
+        """Test a failed rewrite of older minutes leaves the series unchanged."""
+        start = datetime(2023, 1, 1, 12, 0, tzinfo=ZoneInfo(DEVICE_TZ))  # noqa: WPS432
+        with tempfile.TemporaryDirectory() as directory:
+            store = pyflume.FlumeTimeSeriesStore(directory)
+            store.write_many("device_id", _readings(start, range(0, 10, 2)))
+            with unittest_mock.patch(
+                "pyflume.timeseries.os.replace",
+                side_effect=OSError,
+            ):
+                with self.assertRaises(OSError):
+                    store.write_many("device_id", _readings(start, range(1, 10, 2)))
+            assert len(store.read("device_id")) == 5  # noqa: S101, WPS432
+
+    def test_write_many_out_of_order(self):
+        """Test a batch of older minutes is inserted with a single rewrite."""
+        start = datetime(2023, 1, 1, 12, 0, tzinfo=ZoneInfo(DEVICE_TZ))  # noqa: WPS432
+        with tempfile.TemporaryDirectory() as directory:
+            store = pyflume.FlumeTimeSeriesStore(directory)
+            store.write_many("device_id", _readings(start, range(0, 10, 2)))
+            with unittest_mock.patch(
+                "pyflume.timeseries.os.replace",
+                wraps=os.replace,
+            ) as replace:
+                store.write_many(
+                    "device_id",
+                    [*_readings(start, range(1, 10, 2)), (start, 2)],
+                )
+                assert replace.call_count == 1  # noqa: S101
+            assert store.read("device_id") == [  # noqa: S101
+                (_epoch(start), 2),
+                *((_epoch(start, minute), 1) for minute in range(1, 10)),
+            ]
+            assert _gallons(store, RESOLUTION_HOUR) == [11]  # noqa: S101
+
+    def test_gaps(self):
+        """Test gaps closer than merge_within are merged."""
+        with tempfile.TemporaryDirectory() as directory:
+            store = pyflume.FlumeTimeSeriesStore(directory)
+            _store_fetched(store, GAPS_START, [10, 12, *range(30, 40)])  # noqa: WPS432
+            assert len(store.fetched("device_id")) == 3  # noqa: S101
+            assert store.gaps(  # noqa: S101
+                "device_id",
+                GAPS_START,
+                GAPS_START + timedelta(minutes=60),  # noqa: WPS432
+                timedelta(minutes=5),
+            ) == [
+                (_epoch(GAPS_START), _epoch(GAPS_START, 30)),  # noqa: WPS432
+                (_epoch(GAPS_START, 40), _epoch(GAPS_START, 60)),  # noqa: WPS432
+            ]
+
+
+@pytest.mark.usefixtures("flume_api")
+class TestFlumeDataTimeSeries(unittest.TestCase):
+    """Test Flume Data Time Series Test."""
+
+    def test_fill_gaps(self):
+        """Test missing minutes fetched with merged queries."""
+        query = self._register_query(_minute_buckets)
+        until = GAPS_START + timedelta(minutes=60)  # noqa: WPS432
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = pyflume.FlumeTimeSeriesStore(directory)
+            _store_fetched(store, GAPS_START, [10, 12, *range(30, 40)])  # noqa: WPS432
+            flume_data = self._flume_data(store)
+            self.acquire.return_value = False
+            assert not flume_data.fill_gaps(GAPS_START, until)  # noqa: S101
+            assert query.call_count == 0  # noqa: S101
+
+            self.acquire.return_value = True
+            assert flume_data.fill_gaps(GAPS_START, until) == [  # noqa: S101
+                (_epoch(GAPS_START), _epoch(GAPS_START, 30)),  # noqa: WPS432
+                (_epoch(GAPS_START, 40), _epoch(until)),  # noqa: WPS432
+            ]
+            assert len(query.last_request.json()["queries"]) == 2  # noqa: S101
+            assert "operation" not in query.last_request.text  # noqa: S101
+            assert not store.gaps("device_id", GAPS_START, until)  # noqa: S101
+            assert len(store.read("device_id", since=GAPS_START)) == 60  # noqa: S101, WPS432
+            assert sum(_gallons(store, RESOLUTION_HOUR)) == 60  # noqa: S101, WPS432
+
+    def test_fill_gaps_missing_minute(self):
+        """Test minutes the API does not return are not marked fetched."""
+        self._register_query(_without_first_minute)
+        until = GAPS_START + timedelta(minutes=10)
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = pyflume.FlumeTimeSeriesStore(directory)
+            self._flume_data(store).fill_gaps(GAPS_START, until)
+            assert store.gaps("device_id", GAPS_START, until) == [  # noqa: S101
+                (_epoch(GAPS_START), _epoch(GAPS_START, 1)),
+            ]
+
+    def test_update_minutes(self):
+        """Test updates store each minute of a 5 minute scan interval once."""
+        self._register_query(_interval_buckets)
+        first_minute = datetime(2023, 1, 1, 23, 53, tzinfo=ZoneInfo(DEVICE_TZ))  # noqa: WPS432
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = pyflume.FlumeTimeSeriesStore(directory)
+            flume_data = self._flume_data(
+                store,
+                scan_interval=timedelta(minutes=5),
+                query_keys=["current_interval"],
+            )
+            flume_data.update(first_minute + timedelta(minutes=5, seconds=30))  # noqa: WPS432
+            flume_data.update(first_minute + timedelta(minutes=10, seconds=30))  # noqa: WPS432
+            # The API sums current_interval including its last minute.
+            assert flume_data.values == {"current_interval": 6}  # noqa: S101
+            assert MINUTES_REQUEST_ID not in flume_data.responses  # noqa: S101
+
+            assert store.read("device_id") == [  # noqa: S101
+                (_epoch(first_minute, minute), 1) for minute in range(10)
+            ]
+            assert _gallons(store, RESOLUTION_HOUR) == [7, 3]  # noqa: S101
+            assert _gallons(store, RESOLUTION_DAY) == [7, 3]  # noqa: S101
+            assert store.fetched("device_id") == [  # noqa: S101
+                (_epoch(first_minute), _epoch(first_minute, 10)),
+            ]
+
+    def _register_query(self, callback):
+        """Register the query endpoint of device_id.
+
+        Args:
+            callback: Returns the query response JSON.
+
+        Returns:
+            The registered matcher.
+        """
+        return self.mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.API_QUERY_URL.format(
+                user_id=CONST_USER_ID,
+                device_id="device_id",
+            ),
+            json=callback,
+        )
+
+    def _flume_data(self, store, scan_interval=None, query_keys=None):
+        """Return FlumeData of device_id writing to a time series store.
+
+        Args:
+            store: FlumeTimeSeriesStore.
+            scan_interval: Scan interval, defaults to a minute.
+            query_keys: Queried keys, defaults to all.
+
+        Returns:
+            FlumeData.
+        """
+        return pyflume.FlumeData(
+            self.flume_auth,
+            "device_id",
+            DEVICE_TZ,
+            scan_interval or timedelta(minutes=1),
+            update_on_init=False,
+            timeseries_store=store,
+            query_keys=query_keys,
+        )
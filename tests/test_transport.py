@@ -0,0 +1,150 @@
+"""Test the pluggable HTTP backends."""
+
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import importlib.util  # noqa: WPS301
+import json
+import threading
+import unittest
+
+import requests
+
+import pyflume
+from pyflume.stream import JsonDataStream
+
+from .constants import (
+    CONST_CLIENT_ID,
+    CONST_CLIENT_SECRET,
+    CONST_HTTP_METHOD_POST,
+    CONST_PASSWORD,
+    CONST_TOKEN_FILE,
+    CONST_USER_ID,
+    CONST_USERNAME,
+)
+from .utils import load_fixture
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """Answer every request with its path and body, gzip compressed."""
+
+    def do_GET(self):  # noqa: N802
+        """Answer a GET request."""
+        self._echo(None)
+
+    def do_POST(self):  # noqa: N802
+        """Answer a POST request."""
+        length = int(self.headers["Content-Length"])
+        self._echo(json.loads(self.rfile.read(length)))
+
+    def log_message(self, *args):  # noqa: WPS110
+        """Silence the request log.
+
+        Args:
+            args: Log arguments.
+        """
+
+    def _echo(self, payload):
+        """Send the request path and payload.
+
+        Args:
+            payload: Decoded request body.
+        """
+        body = gzip.compress(
+            json.dumps({"data": [{"path": self.path, "payload": payload}]}).encode(),
+        )
+        self.send_response(200)  # noqa: WPS432
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestTransport(unittest.TestCase):
+    """HTTP backends Test Case."""
+
+    def setUp(self):
+        """Start the echo server."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        self.url = "http://127.0.0.1:{0}/users".format(self.server.server_port)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        """Stop the echo server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_urllib3(self):
+        """Test the urllib3 backend."""
+        self._check_transport(pyflume.create_transport("urllib3"))
+
+        closed_server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        closed_url = "http://127.0.0.1:{0}".format(closed_server.server_port)
+        closed_server.server_close()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            pyflume.Urllib3Transport().request("GET", closed_url, timeout=1)
+
+    @unittest.skipUnless(importlib.util.find_spec("httpx"), "httpx not installed")
+    def test_httpx(self):
+        """Test the httpx backend."""
+        self._check_transport(pyflume.create_transport("httpx"))
+
+    def test_memory(self):
+        """Test pyflume classes on the in-memory backend."""
+        transport = pyflume.MemoryTransport()
+        transport.add(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            body=load_fixture(CONST_TOKEN_FILE).encode(),
+        )
+        transport.add(
+            "get",
+            pyflume.constants.API_DEVICES_URL.format(user_id=CONST_USER_ID),
+            payload=json.loads(load_fixture("devices.json")),
+        )
+
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            http_session=transport,
+        )
+        flume_devices = pyflume.FlumeDeviceList(flume_auth, http_session=transport)
+        assert len(flume_devices.device_list) == 1  # noqa: S101
+        devices_request = transport.requests[-1]
+        assert devices_request.url.endswith("?user=true&location=true")  # noqa: S101
+        authorization = devices_request.headers["Authorization"]
+        assert authorization.startswith("Bearer ")  # noqa: S101
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            pyflume.FlumeLeakList(flume_auth, "device_id", http_session=transport)
+
+    def test_abstract(self):
+        """Test backends must implement send."""
+        with self.assertRaises(TypeError):
+            pyflume.transport.Transport()
+
+    def _check_transport(self, transport):
+        """Check requests, decompression and streaming of a backend.
+
+        Args:
+            transport: Backend under test.
+        """
+        response = transport.request("GET", self.url, params={"limit": "50"})
+        assert response.json()["data"][0]["path"] == "/users?limit=50"  # noqa: S101
+
+        response = transport.request(
+            "POST",
+            self.url,
+            json={"queries": []},
+            timeout=(2, 5),
+        )
+        assert response.json()["data"][0]["payload"] == {  # noqa: S101
+            "queries": [],
+        }
+
+        response = transport.request("GET", self.url, stream=True)
+        response_stream = JsonDataStream(response)
+        assert list(response_stream)[0]["path"] == "/users"  # noqa: S101
+        transport.close()
@@ -2,8 +2,10 @@
 
 # Standard library imports
 import unittest
+from unittest import mock as unittest_mock
 
 # Third-party imports
+import pytest
 import requests_mock
 
 # Local application/library-specific imports
@@ -19,7 +21,9 @@ from .constants import (
     CONST_USER_ID,
     CONST_USERNAME,
 )
-from .utils import load_fixture
+from .utils import UPDATES, generation_callback, load_fixture, read_while_updating
+
+USAGE_URL = pyflume.constants.API_USAGE_URL.format(user_id=CONST_USER_ID)
 
 
 class TestFlumeUsageAlerts(unittest.TestCase):
@@ -83,3 +87,68 @@ class TestFlumeUsageAlerts(unittest.TestCase):
         assert alerts_nopage[0]["device_id"] == "6248148189204194987"  # noqa: S101
         assert alerts_nopage[0]["event_rule_name"] == "High Flow Alert"  # noqa: S101
         assert flume_alerts.has_next is False  # noqa: S101
+
+    @pytest.mark.usefixtures("flume_api")
+    def test_all_usage_alerts(self):
+        """Test fetching every page of usage alerts concurrently."""
+        pages = [
+            self.mock.register_uri("get", USAGE_URL, text=load_fixture("usage.json")),
+        ] + [
+            self.mock.register_uri(
+                "get",
+                f"{USAGE_URL}?offset={offset}",
+                text=load_fixture("usage_next.json"),
+            )
+            for offset in (50, 100)  # noqa: WPS432
+        ]
+
+        flume_alerts = pyflume.FlumeUsageAlertList(
+            self.flume_auth,
+            update_on_init=False,
+            rate_budget=pyflume.RateBudget(),
+        )
+        alerts = flume_alerts.get_all_usage_alerts(workers=2)
+        assert len(alerts) == 150  # noqa: S101, WPS432
+        assert [page.call_count for page in pages] == [1, 1, 1]  # noqa: S101
+        assert self.acquire.call_count == 3  # noqa: S101
+        assert flume_alerts.has_next is False  # noqa: S101
+
+    @unittest_mock.patch("pyflume.usage.time")
+    @requests_mock.Mocker()
+    def test_concurrent_update(self, clock, mock):
+        """Test readers never see usage alerts and update time of different updates.
+
+        Args:
+            clock: Patched time, counting updates.
+            mock: Requests mock.
+
+        """
+        mock.register_uri(
+            CONST_HTTP_METHOD_POST,
+            pyflume.constants.URL_OAUTH_TOKEN,
+            text=load_fixture(CONST_TOKEN_FILE),
+        )
+        mock.register_uri(
+            "get",
+            pyflume.constants.API_USAGE_URL.format(user_id=CONST_USER_ID),
+            json=generation_callback(pagination=True),
+        )
+        flume_auth = pyflume.FlumeAuth(
+            CONST_USERNAME,
+            CONST_PASSWORD,
+            CONST_CLIENT_ID,
+            CONST_CLIENT_SECRET,
+            CONST_FLUME_TOKEN,
+        )
+
+        usage_alerts = pyflume.FlumeUsageAlertList(flume_auth, update_on_init=False)
+        for state in read_while_updating(usage_alerts, clock):
+            entries = state.usage_alert_list
+            assert len(entries) == (state.last_updated or 0)  # noqa: S101
+            assert all(  # noqa: S101
+                entry["id"] == state.last_updated for entry in entries
+            )
+            assert state.next_page == (  # noqa: S101
+                state.last_updated and f"/page/{state.last_updated}"
+            )
+        assert usage_alerts.last_updated == UPDATES  # noqa: S101
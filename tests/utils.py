@@ -1,6 +1,11 @@
 """Utils to support Flume tests."""
 
+import itertools
 import os
+import threading
+
+# Updates made while the states of a list object are read.
+UPDATES = 20
 
 
 def load_fixture(filename):
@@ -16,3 +21,64 @@ def load_fixture(filename):
     path = os.path.join(os.path.dirname(__file__), "fixtures", filename)
     with open(path) as fptr:
         return fptr.read()
+
+
+def generation_callback(pagination=False):
+    """Return a response callback answering each request with a new generation.
+
+    The response of generation n holds n items of id n, and links to the next
+    page /page/n with pagination.
+
+    Args:
+        pagination: Include a next page.
+
+    Returns:
+        Requests mock JSON callback.
+
+    """
+    generations = itertools.count(1)
+
+    def callback(request, context):  # noqa: WPS430
+        generation = next(generations)
+        return {
+            "success": True,
+            "count": generation,
+            "data": [{"id": generation} for _ in range(generation)],
+            "pagination": {"next": f"/page/{generation}"} if pagination else None,
+        }
+
+    return callback
+
+
+def read_while_updating(flume_list, clock, updates=UPDATES):
+    """Return the states read while another thread updates a list object.
+
+    The patched clock returns the generation of the update, and reads the
+    state too, while the update is in progress.
+
+    Args:
+        flume_list: Object with update and state.
+        clock: Patched time module of the list object.
+        updates: Number of updates.
+
+    Returns:
+        List of the states read.
+
+    """
+    generations = itertools.count(1)
+    states = []
+
+    def tick():  # noqa: WPS430
+        states.append(flume_list.state)
+        return next(generations)
+
+    clock.time.side_effect = tick
+    updater = threading.Thread(
+        target=lambda: [flume_list.update() for _ in range(updates)],
+    )
+    updater.start()
+    while updater.is_alive():
+        states.append(flume_list.state)
+    updater.join()
+    states.append(flume_list.state)
+    return states